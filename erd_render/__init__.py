@@ -1,3 +1,59 @@
 from erd_render.modules.obj import Attribute, Entity, Relation, ATTR, COUNT
 from erd_render.modules.helpers import parse_attribute, parse_attributes, quick_entity
-from erd_render.style.chen import render as render_chen
+from erd_render.validation import ModelError, validate
+
+# everything else is imported on first use, so building models does not pay for importing graphviz, asyncio and the
+# styles. exported name -> (module, name in the module)
+_LAZY = {
+    "render_chen": ("erd_render.style.chen", "render"),
+    "render_chen_async": ("erd_render.style.chen", "render_async"),
+    "pipe_chen": ("erd_render.style.chen", "pipe"),
+    "render_many": ("erd_render.modules.batch", "render_many"),
+    "RenderResult": ("erd_render.modules.batch", "RenderResult"),
+    "RenderCache": ("erd_render.modules.cache", "RenderCache"),
+    "partition": ("erd_render.modules.partition", "partition"),
+    "render_partitioned": ("erd_render.modules.partition", "render_partitioned"),
+    "RenderStats": ("erd_render.modules.render", "RenderStats"),
+    "save_model": ("erd_render.serialize", "save"),
+    "load_model": ("erd_render.serialize", "load"),
+    "diff_schemas": ("erd_render.diff", "diff"),
+    "render_diff": ("erd_render.diff", "render_diff"),
+    "SchemaDiff": ("erd_render.diff", "SchemaDiff"),
+    "adjacency": ("erd_render.modules.adjacency", "adjacency"),
+    "neighbourhood": ("erd_render.modules.adjacency", "neighbourhood"),
+    "render_crowsfoot": ("erd_render.style.crowsfoot", "render"),
+    "pipe_crowsfoot": ("erd_render.style.crowsfoot", "pipe"),
+    "render_uml": ("erd_render.style.uml", "render"),
+    "pipe_uml": ("erd_render.style.uml", "pipe"),
+    "EnginePool": ("erd_render.modules.pool", "EnginePool"),
+}
+
+__all__ = [
+    "Attribute",
+    "Entity",
+    "Relation",
+    "ATTR",
+    "COUNT",
+    "parse_attribute",
+    "parse_attributes",
+    "quick_entity",
+    "validate",
+    "ModelError",
+    *_LAZY,
+]
+
+
+def __getattr__(name: str):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    module_name, attr = _LAZY[name]
+    value = getattr(importlib.import_module(module_name), attr)
+    # cache it, so later lookups skip this function
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,3 @@
+from erd_render.cli import main
+
+raise SystemExit(main())
@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import runpy
+import sys
+import time
+from typing import Iterable, Sequence, Union
+
+from erd_render import importers, serialize
+from erd_render.modules.cache import RenderCache
+from erd_render.modules.obj import Entity, Relation
+from erd_render.modules.render import RenderStats
+from erd_render.style import chen, crowsfoot, uml
+
+# --style -> the style module that renders it
+_STYLES = {"chen": chen, "crowsfoot": crowsfoot, "uml": uml}
+
+# file extension -> how the model is loaded
+_LOADERS = {
+    ".py": "python",
+    ".json": "serialized",
+    ".pickle": "serialized",
+    ".pkl": "serialized",
+    ".msgpack": "serialized",
+    ".sql": "ddl",
+    ".sqlite": "sqlite",
+    ".sqlite3": "sqlite",
+    ".db": "sqlite",
+}
+
+
+def load_model(path: str) -> tuple[list[Entity], list[Relation]]:
+    """
+    load a model file, the kind of file is taken from its extension:
+
+    - `.py`: a script that defines the module level variables `entities`, a list of `Entity`, and `relations`, a
+      list of `Relation`, like `tests/dependent.py`. it is run with `__name__` set to something other than "__main__",
+      so a `render` call guarded by `if __name__ == "__main__":` is skipped, anything unguarded still runs
+    - `.json`, `.pickle`, `.pkl`, `.msgpack`: a model saved by `erd_render.serialize.save`
+    - `.sql`: the `CREATE TABLE` statements of a schema, see `erd_render.importers.from_ddl`
+    - `.sqlite`, `.sqlite3`, `.db`: a SQLite database, see `erd_render.importers.from_sqlite`
+
+    :return: the entities and relations of the model
+    """
+    kind = _LOADERS.get(os.path.splitext(path)[1].lower())
+    if kind == "python":
+        namespace = runpy.run_path(path, run_name="erd_render_model")
+        entities = _model_variable(path, namespace, "entities", Entity)
+        return entities, _model_variable(path, namespace, "relations", Relation)
+    if kind == "serialized":
+        return serialize.load(path)
+    if kind == "ddl":
+        with open(path, encoding="utf-8") as f:
+            return importers.from_ddl(f)
+    if kind == "sqlite":
+        return importers.from_sqlite(path)
+    raise ValueError(f"Unknown kind of model file: {path}")
+
+
+def _model_variable(path: str, namespace: dict, name: str, cls: type) -> list:
+    """the list of `cls` objects a model script defines as `name`"""
+    if name not in namespace:
+        raise ValueError(
+            f"{path} does not define `{name}`: a model script must define the module level variables `entities` and "
+            f"`relations`, the lists of its Entity and Relation objects"
+        )
+    value = namespace[name]
+    if isinstance(value, (str, bytes)) or not isinstance(value, Iterable):
+        raise ValueError(f"`{name}` of {path} must be a list of {cls.__name__}, not {type(value).__name__}")
+    items = list(value)
+    for item in items:
+        if not isinstance(item, cls):
+            raise ValueError(f"`{name}` of {path} must only contain {cls.__name__} objects, not {type(item).__name__}")
+    return items
+
+
+def render_model(path: str, args: argparse.Namespace, cache: Union[RenderCache, None]) -> str:
+    """load a model file then render it, returning the path of the diagram"""
+    entities, relations = load_model(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    directory = args.output if args.output is not None else os.path.dirname(path)
+    stats = RenderStats()
+    output = _STYLES[args.style].render(
+        entities,
+        relations,
+        filename=os.path.join(directory, f"{stem}.gv"),
+        format=args.format,
+        use_neato=args.neato,
+        engine=args.engine,
+        cache=cache,
+        stats=stats,
+        focus=args.focus,
+        depth=args.depth,
+    )
+    if args.stats:
+        print(json.dumps({"model": path, "output": output, **stats.as_dict()}), file=sys.stderr)
+    return output
+
+
+def render_all(paths: Sequence[str], args: argparse.Namespace, cache: Union[RenderCache, None]) -> bool:
+    """render each model file, reporting errors without stopping. return whether all of them succeeded"""
+    ok = True
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            output = render_model(path, args, cache)
+        except Exception as e:
+            ok = False
+            print(f"{path}: error: {e}", file=sys.stderr)
+            continue
+        if not args.quiet:
+            print(f"{path} -> {output} ({time.perf_counter() - start:.2f}s)", file=sys.stderr)
+    return ok
+
+
+def _mtime(path: str) -> Union[float, None]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def watch(paths: Sequence[str], args: argparse.Namespace, cache: Union[RenderCache, None]):
+    """poll the model files, re-rendering each one when it changes, until interrupted"""
+    mtimes = {path: _mtime(path) for path in paths}
+    if not args.quiet:
+        print(f"watching {len(paths)} file(s), press Ctrl+C to stop", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(args.interval)
+            changed = []
+            for path in paths:
+                mtime = _mtime(path)
+                if mtime != mtimes[path]:
+                    mtimes[path] = mtime
+                    # deleted files are picked up again when they come back
+                    if mtime is not None:
+                        changed.append(path)
+            if changed:
+                render_all(changed, args, cache)
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="erd-render", description="render ER diagrams of model files")
+    parser.add_argument("models", nargs="+", help="model files: .py, .json, .pickle, .msgpack, .sql or .sqlite")
+    parser.add_argument("-o", "--output", help="the directory to write diagrams to, defaults to next to each model")
+    parser.add_argument("-f", "--format", default="pdf", help="the output format, like png, svg or pdf")
+    parser.add_argument("--style", choices=sorted(_STYLES), default="chen", help="the notation of the diagram")
+    parser.add_argument(
+        "--engine",
+        help='the layout engine, like sfdp or neato. "auto" picks one by size, "builtin" needs no graphviz (svg only)',
+    )
+    parser.add_argument("--neato", action="store_true", help="use the neato engine")
+    parser.add_argument("--focus", action="append", help="only draw the part around this entity, can be repeated")
+    parser.add_argument("--depth", type=int, default=1, help="with --focus, the number of relations to follow")
+    parser.add_argument("--cache", help="reuse unchanged diagrams from this render cache directory")
+    parser.add_argument("-w", "--watch", action="store_true", help="re-render models when their files change")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between checks in watch mode")
+    parser.add_argument("--stats", action="store_true", help="print the timings of each render as JSON")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print errors")
+    args = parser.parse_args(argv)
+
+    cache = None if args.cache is None else RenderCache(args.cache)
+    ok = render_all(args.models, args, cache)
+    if args.watch:
+        watch(args.models, args, cache)
+        return 0
+    return 0 if ok else 1
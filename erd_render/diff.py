@@ -0,0 +1,338 @@
+from typing import Sequence
+
+from erd_render.modules.cache import RenderCache
+from erd_render.modules.obj import ATTR, Attribute, Entity, Relation
+from erd_render.modules.render import ObjGraph, RenderStats
+from erd_render.style.chen import ATTR_STYLES, draw_entity, draw_relation
+from erd_render.style.common import attribute_path, new_graph, select_engine, walk_attributes
+from erd_render.validation import validate
+
+ADDED = "added"
+REMOVED = "removed"
+MODIFIED = "modified"
+UNCHANGED = "unchanged"
+
+# the colour of each kind of change, unchanged parts are drawn in the default colour
+DIFF_COLORS = {
+    ADDED: "darkgreen",
+    REMOVED: "red",
+    MODIFIED: "darkorange",
+    UNCHANGED: None,
+}
+
+
+class AttributeDiff:
+    """an attribute in the old model, the new model, or both. `subattrs` holds the diffs of its subattributes"""
+
+    __slots__ = ("name", "status", "old", "new", "subattrs")
+
+    def __init__(self, name: str, status: str, old: Attribute = None, new: Attribute = None):
+        self.name = name
+        self.status = status
+        self.old = old
+        self.new = new
+        self.subattrs: list[AttributeDiff] = []
+
+    def __repr__(self) -> str:
+        return f"AttributeDiff({self.name!r}, {self.status}, {self.subattrs})"
+
+    @property
+    def type(self) -> ATTR:
+        """the type in the new model, or in the old model for removed attributes"""
+        return (self.new or self.old).type
+
+
+class EntityDiff:
+    """an entity in the old model, the new model, or both, matched by name"""
+
+    __slots__ = ("name", "status", "old", "new", "attrs")
+
+    def __init__(self, name: str, status: str, old: Entity, new: Entity, attrs: list[AttributeDiff]):
+        self.name = name
+        self.status = status
+        self.old = old
+        self.new = new
+        self.attrs = attrs
+
+    def __repr__(self) -> str:
+        return f"EntityDiff({self.name!r}, {self.status}, <{len(self.attrs)} attributes>)"
+
+    @property
+    def entity(self) -> Entity:
+        """the entity in the new model, or in the old model if it was removed"""
+        return self.new or self.old
+
+
+class RelationDiff:
+    """a relation in the old model, the new model, or both, matched by name and the names of its entities"""
+
+    __slots__ = ("key", "status", "old", "new", "attrs")
+
+    def __init__(self, key: tuple, status: str, old: Relation, new: Relation, attrs: list[AttributeDiff]):
+        self.key = key
+        self.status = status
+        self.old = old
+        self.new = new
+        self.attrs = attrs
+
+    def __repr__(self) -> str:
+        return f"RelationDiff({self.relation.name!r}, {self.status}, <{len(self.attrs)} attributes>)"
+
+    @property
+    def relation(self) -> Relation:
+        """the relation in the new model, or in the old model if it was removed"""
+        return self.new or self.old
+
+
+class SchemaDiff:
+    """the differences between two versions of a model, see `diff`"""
+
+    def __init__(self, entities: list[EntityDiff], relations: list[RelationDiff]):
+        self.entities = entities
+        self.relations = relations
+
+    def __repr__(self) -> str:
+        return f"SchemaDiff({self.summary()})"
+
+    def summary(self) -> dict[str, dict[str, int]]:
+        """the number of entities and relations with each status"""
+        counts = {"entities": {}, "relations": {}}
+        for key, diffs in (("entities", self.entities), ("relations", self.relations)):
+            for d in diffs:
+                counts[key][d.status] = counts[key].get(d.status, 0) + 1
+        return counts
+
+    def has_changes(self) -> bool:
+        return any(d.status != UNCHANGED for d in [*self.entities, *self.relations])
+
+
+def diff(
+    old_entities: Sequence[Entity],
+    old_relations: Sequence[Relation],
+    new_entities: Sequence[Entity],
+    new_relations: Sequence[Relation],
+) -> SchemaDiff:
+    """
+    compare two versions of a model. entities are matched by name, relations by name and the names of their entities,
+    and attributes by name within their entity, relation or composite attribute. the models are indexed by name, so
+    this takes linear time.
+
+    an entity or relation is modified if any of its attributes were added, removed or changed type. entities are also
+    modified when they become weak or strong, relations when they change whether they identify an entity or change
+    the count or role of an entity
+
+    :return: the diffs of the new entities and relations in their order, followed by the removed ones
+    """
+    old_by_name = {e.name: e for e in old_entities}
+    new_names = {e.name for e in new_entities}
+
+    entities = []
+    for new in new_entities:
+        old = old_by_name.get(new.name)
+        if old is None:
+            entities.append(EntityDiff(new.name, ADDED, None, new, _diff_attributes((), new.attrs)))
+            continue
+        attrs = _diff_attributes(old.attrs, new.attrs)
+        changed = old.is_weak() != new.is_weak() or _any_changed(attrs)
+        entities.append(EntityDiff(new.name, MODIFIED if changed else UNCHANGED, old, new, attrs))
+    for old in old_entities:
+        if old.name not in new_names:
+            entities.append(EntityDiff(old.name, REMOVED, old, None, _diff_attributes(old.attrs, ())))
+
+    old_by_key = _index_relations(old_relations)
+    new_by_key = _index_relations(new_relations)
+    relations = []
+    for key, new in new_by_key.items():
+        old = old_by_key.get(key)
+        if old is None:
+            relations.append(RelationDiff(key, ADDED, None, new, _diff_attributes((), new.attrs)))
+            continue
+        attrs = _diff_attributes(old.attrs, new.attrs)
+        changed = (
+            old.is_identifying != new.is_identifying
+            or _participation(old) != _participation(new)
+            or _any_changed(attrs)
+        )
+        relations.append(RelationDiff(key, MODIFIED if changed else UNCHANGED, old, new, attrs))
+    for key, old in old_by_key.items():
+        if key not in new_by_key:
+            relations.append(RelationDiff(key, REMOVED, old, None, _diff_attributes(old.attrs, ())))
+
+    return SchemaDiff(entities, relations)
+
+
+def _index_relations(relations: Sequence[Relation]) -> dict[tuple, Relation]:
+    """index relations by name and entity names. relations with the same key are told apart by their position"""
+    index = {}
+    for rel in relations:
+        base = (rel.name, tuple(sorted(e_info.entity.name for e_info in rel.entity_infos)))
+        key = (*base, 0)
+        while key in index:
+            key = (*base, key[-1] + 1)
+        index[key] = rel
+    return index
+
+
+def _participation(rel: Relation) -> list:
+    return sorted(
+        (e_info.entity.name, str(e_info.count), e_info.role or "") for e_info in rel.entity_infos
+    )
+
+
+def _any_changed(attrs: list[AttributeDiff]) -> bool:
+    return any(a.status != UNCHANGED for a in attrs)
+
+
+def _diff_attributes(old: Sequence[Attribute], new: Sequence[Attribute]) -> list[AttributeDiff]:
+    """match two lists of attributes by name, then their subattributes in the same way"""
+    result = []
+    # every diff in creation order, parents always come before their subattributes
+    created: list[AttributeDiff] = []
+    stack = [(old, new, result)]
+    while stack:
+        old, new, out = stack.pop()
+        old_by_name = {a.name: a for a in old}
+        new_names = {a.name for a in new}
+        for n in new:
+            o = old_by_name.get(n.name)
+            if o is None:
+                d = AttributeDiff(n.name, ADDED, new=n)
+                stack.append(((), n.subattrs, d.subattrs))
+            else:
+                d = AttributeDiff(n.name, MODIFIED if o.type != n.type else UNCHANGED, old=o, new=n)
+                stack.append((o.subattrs, n.subattrs, d.subattrs))
+            out.append(d)
+            created.append(d)
+        for o in old:
+            if o.name not in new_names:
+                d = AttributeDiff(o.name, REMOVED, old=o)
+                stack.append((o.subattrs, (), d.subattrs))
+                out.append(d)
+                created.append(d)
+
+    # a composite attribute is modified when any of its subattributes changed
+    for d in reversed(created):
+        if d.status == UNCHANGED and _any_changed(d.subattrs):
+            d.status = MODIFIED
+    return result
+
+
+def build_diff(
+    schema_diff: SchemaDiff,
+    collapse=True,
+    k=0.3,
+    repulsive_force=1.0,
+    overlap_scaling=-4,
+    use_neato=False,
+    engine: str = None,
+) -> ObjGraph:
+    """
+    draw a `SchemaDiff` as one diagram in Chen's notation, coloured by `DIFF_COLORS`: added parts are green, removed
+    parts red and modified parts orange. see `render_diff` for a description of the parameters
+    """
+    changed_entities = {d.name for d in schema_diff.entities if d.status != UNCHANGED}
+    if collapse:
+        # the changed relations, and the unchanged relations of changed entities for context
+        relations = [
+            d
+            for d in schema_diff.relations
+            if d.status != UNCHANGED or any(e.entity.name in changed_entities for e in d.relation.entity_infos)
+        ]
+        # their entities, the unchanged ones are collapsed into stubs
+        shown = set(changed_entities)
+        for d in relations:
+            shown.update(e_info.entity.name for e_info in d.relation.entity_infos)
+        entities = [d for d in schema_diff.entities if d.name in shown]
+    else:
+        relations = schema_diff.relations
+        entities = schema_diff.entities
+
+    g = new_graph(
+        k=k,
+        repulsive_force=repulsive_force,
+        overlap_scaling=overlap_scaling,
+        use_neato=use_neato,
+        engine=engine,
+    )
+    id_map = {}
+
+    g.node_style(shape="box")
+    for d in entities:
+        stub = collapse and d.status == UNCHANGED
+        draw_entity(g, id_map, d.entity, stub=stub, color=DIFF_COLORS[d.status])
+        # relations of either model can refer to this entity
+        for entity in (d.old, d.new):
+            if entity is not None:
+                id_map[entity] = id_map[d.entity]
+
+    g.node_style(shape="diamond")
+    for d in relations:
+        draw_relation(g, id_map, d.relation, color=DIFF_COLORS[d.status])
+
+    g.node_style(shape="oval")
+    for d in entities:
+        if collapse and d.status == UNCHANGED:
+            continue
+        for attr in d.attrs:
+            draw_attribute_diff(g, id_map[d.entity], attr)
+    for d in relations:
+        for attr in d.attrs:
+            draw_attribute_diff(g, id_map[d.relation], attr)
+
+    select_engine(g, engine)
+    return g
+
+
+def draw_attribute_diff(graph: ObjGraph, parent_id: str, attr: AttributeDiff):
+    """draw an attribute diff and its subattributes like `chen.draw_attribute`, coloured by their status"""
+    parents = [parent_id]
+    for depth, attr in walk_attributes((attr,)):
+        del parents[depth + 1 :]
+        make_label, kwargs = ATTR_STYLES[attr.type]
+        label = attr.name if make_label is None else make_label(attr.name)
+        color = DIFF_COLORS[attr.status]
+        if color is not None:
+            kwargs = {**kwargs, "color": color, "fontcolor": color}
+
+        a_id = graph.node(label, path=attribute_path(parents[depth], attr), **kwargs)
+        graph.edge(a_id, parents[depth], color=color)
+        parents.append(a_id)
+
+
+def render_diff(
+    old_entities: Sequence[Entity],
+    old_relations: Sequence[Relation],
+    new_entities: Sequence[Entity],
+    new_relations: Sequence[Relation],
+    filename=None,
+    format="pdf",
+    collapse=True,
+    cache: RenderCache = None,
+    stats: RenderStats = None,
+    check=True,
+    **kwargs,
+) -> str:
+    """
+    render the differences between two versions of a model as one diagram, see `diff` and `build_diff`
+
+    :param filename: the path to output the generated graphviz source and diagram
+    :param format: the output format, like "png" or "pdf"
+    :param collapse: only draw what changed, with the unchanged entities it is related to as stubs (dashed and without
+           their attributes). when False, the whole model is drawn
+    :param cache: a `RenderCache` to reuse diagrams that have been rendered before
+    :param stats: a `RenderStats` to fill in with the timings and size of this render
+    :param check: check both models with `erd_render.validation.validate` before comparing them
+    :param kwargs: the layout settings of `erd_render.style.chen.render`: `k`, `repulsive_force`, `overlap_scaling`,
+           `use_neato` and `engine`
+    :return: the path of the rendered diagram
+    """
+    if stats is None:
+        stats = RenderStats()
+    if check:
+        with stats.measure("validate"):
+            validate(old_entities, old_relations)
+            validate(new_entities, new_relations)
+    with stats.measure("build"):
+        schema_diff = diff(old_entities, old_relations, new_entities, new_relations)
+        g = build_diff(schema_diff, collapse=collapse, **kwargs)
+    return g.render(filename=filename, format=format, cache=cache, stats=stats)
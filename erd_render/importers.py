@@ -0,0 +1,185 @@
+import re
+import sqlite3
+from typing import Iterable, Iterator, TextIO, Union
+
+from erd_render.modules.obj import ATTR, COUNT, Attribute, Entity, EntityInfo, Relation
+
+# a `CREATE TABLE` statement, possibly preceded by comments
+_CREATE_TABLE_REGEX = re.compile(
+    r"(?:\s|--[^\n]*(?:\n|$)|/\*.*?\*/)*CREATE\s+(?:TEMP\s+|TEMPORARY\s+)?TABLE\b",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+class _ForeignKey:
+    __slots__ = ("table", "columns", "ref_table", "not_null", "unique", "identifying")
+
+    def __init__(self, table, columns, ref_table, not_null, unique, identifying):
+        self.table = table
+        self.columns = columns
+        self.ref_table = ref_table
+        self.not_null = not_null
+        self.unique = unique
+        self.identifying = identifying
+
+
+def from_sqlite(path: str) -> tuple[list[Entity], list[Relation]]:
+    """import the tables of a SQLite database file, which is opened read-only. see `from_connection` for how tables
+    are converted
+
+    :return: the entities and relations of the schema
+    """
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return from_connection(conn)
+    finally:
+        conn.close()
+
+
+def from_ddl(ddl: Union[str, TextIO]) -> tuple[list[Entity], list[Relation]]:
+    """import the `CREATE TABLE` statements of a SQL script, other statements are skipped.
+
+    the statements are run in an in-memory SQLite database, so they must be written in a dialect that SQLite accepts
+
+    :param ddl: the SQL script, or an open file containing it. files are read one statement at a time
+    :return: the entities and relations of the schema
+    """
+    conn = sqlite3.connect(":memory:")
+    try:
+        for statement in _iter_statements(ddl):
+            if _CREATE_TABLE_REGEX.match(statement):
+                conn.execute(statement)
+        return from_connection(conn)
+    finally:
+        conn.close()
+
+
+def from_connection(conn: sqlite3.Connection) -> tuple[list[Entity], list[Relation]]:
+    """import the tables of an open SQLite connection.
+
+    - primary key columns become key attributes
+    - foreign keys become relations, the counts are taken from the nullability and uniqueness of the columns
+    - foreign key columns are dropped, as foreign keys do not exist in an ER model
+    - a table identified by a foreign key becomes a weak entity, its other primary key columns become weak keys
+    - a junction table (its primary key is made of 2 or more foreign keys) becomes a many-to-many relation
+
+    the catalog is read one table at a time, only the foreign keys are kept until all entities are known.
+    foreign keys to tables that are not in the catalog are skipped
+
+    :return: the entities and relations of the schema
+    """
+    entities: dict[str, Entity] = {}
+    foreign_keys: list[_ForeignKey] = []
+    junctions: list[tuple[str, list[_ForeignKey], list[Attribute]]] = []
+
+    tables = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY rowid"
+    )
+    for (table,) in tables:
+        attrs, fks, is_junction = _read_table(conn, table)
+        if is_junction:
+            junctions.append((table, fks, attrs))
+        else:
+            entities[table] = Entity(table, attributes=attrs)
+            foreign_keys.extend(fks)
+
+    rows = []
+    for fk in foreign_keys:
+        if fk.ref_table not in entities:
+            # references a table that is missing from the catalog, or a junction table
+            continue
+        # a self-referencing relation needs roles to tell both sides apart
+        is_self = fk.table == fk.ref_table
+        child = EntityInfo(
+            entities[fk.table],
+            count=COUNT.ZERO_OR_ONE if fk.unique else COUNT.ANY,
+            role=", ".join(fk.columns) if is_self else None,
+        )
+        parent = EntityInfo(
+            entities[fk.ref_table],
+            count=1 if fk.not_null else COUNT.ZERO_OR_ONE,
+            role="referenced" if is_self else None,
+        )
+        rows.append(([child, parent], "_".join(fk.columns), fk.identifying))
+
+    for table, fks, attrs in junctions:
+        if not all(fk.ref_table in entities for fk in fks):
+            continue
+        infos = [EntityInfo(entities[fk.ref_table], count=COUNT.ANY) for fk in fks]
+        rows.append((infos, table, False, attrs))
+
+    return list(entities.values()), Relation.from_rows(rows)
+
+
+def _iter_statements(ddl: Union[str, TextIO]) -> Iterator[str]:
+    """split a SQL script into statements"""
+    lines: Iterable[str] = ddl.splitlines(keepends=True) if isinstance(ddl, str) else ddl
+    statement = []
+    for line in lines:
+        statement.append(line)
+        if sqlite3.complete_statement("".join(statement)):
+            yield "".join(statement)
+            statement = []
+    if "".join(statement).strip():
+        yield "".join(statement)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _read_table(conn: sqlite3.Connection, table: str):
+    """read the attributes and foreign keys of a table, and whether it is a junction table"""
+    # (cid, name, type, notnull, dflt_value, pk)
+    columns = conn.execute(f"PRAGMA table_info({_quote(table)})").fetchall()
+    primary_key = {c[1] for c in columns if c[5] > 0}
+    not_null = {c[1] for c in columns if c[3] or c[5] > 0}
+
+    unique_sets = [frozenset(primary_key)] if primary_key else []
+    # (seq, name, unique, origin, partial)
+    for index in conn.execute(f"PRAGMA index_list({_quote(table)})").fetchall():
+        if index[2] and not index[4]:
+            # (seqno, cid, name)
+            info = conn.execute(f"PRAGMA index_info({_quote(index[1])})").fetchall()
+            unique_sets.append(frozenset(i[2] for i in info))
+
+    # (id, seq, table, from, to, on_update, on_delete, match), grouped by id
+    grouped: dict[int, list] = {}
+    for row in conn.execute(f"PRAGMA foreign_key_list({_quote(table)})"):
+        grouped.setdefault(row[0], []).append(row)
+
+    fks = []
+    fk_columns = set()
+    for rows in grouped.values():
+        rows.sort(key=lambda r: r[1])
+        cols = tuple(r[3] for r in rows)
+        fk_columns.update(cols)
+        fks.append(
+            _ForeignKey(
+                table,
+                cols,
+                rows[0][2],
+                not_null=all(c in not_null for c in cols),
+                unique=frozenset(cols) in unique_sets,
+                identifying=bool(primary_key) and set(cols) <= primary_key,
+            )
+        )
+
+    # SQLite lists foreign keys in reverse order of declaration, put them back in the order of their columns
+    position = {c[1]: c[0] for c in columns}
+    fks.sort(key=lambda fk: position[fk.columns[0]])
+
+    is_junction = len(fks) >= 2 and primary_key == fk_columns
+    is_weak = any(fk.identifying for fk in fks)
+    key_type = ATTR.WEAK_KEY_ATTRIBUTE if is_weak else ATTR.KEY_ATTRIBUTE
+
+    attrs = []
+    for c in columns:
+        name = c[1]
+        if name in fk_columns:
+            continue
+        if name in primary_key and not is_junction:
+            attrs.append(Attribute(name, type=key_type))
+        else:
+            attrs.append(Attribute(name))
+    return attrs, fks, is_junction
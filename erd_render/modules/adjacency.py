@@ -0,0 +1,85 @@
+from typing import Iterable, Sequence, Union
+
+from erd_render.modules.obj import Entity, Relation
+
+
+def adjacency(
+    entities: Sequence[Entity], relations: Sequence[Relation]
+) -> dict[Entity, list[Relation]]:
+    """map each entity to the relations it takes part in"""
+    index: dict[Entity, list[Relation]] = {entity: [] for entity in entities}
+    for rel in relations:
+        seen = set()
+        for e_info in rel.entity_infos:
+            entity = e_info.entity
+            if entity not in seen:
+                seen.add(entity)
+                index.setdefault(entity, []).append(rel)
+    return index
+
+
+def _neighbours(entity: Entity, index: dict[Entity, list[Relation]]):
+    for rel in index.get(entity, ()):
+        for e_info in rel.entity_infos:
+            yield e_info.entity
+
+
+def neighbourhood(
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    focus: Iterable[Union[Entity, str]],
+    depth: int = 1,
+    index: dict[Entity, list[Relation]] = None,
+) -> tuple[list[Entity], list[Relation], list[Entity]]:
+    """
+    extract the part of a schema within `depth` relations of the focus entities.
+
+    entities closer than `depth` are drawn in full, the ones exactly `depth` away are the boundary and become stubs.
+    the focus entities are never stubs. a relation is kept when all of its entities are kept and at least one of them
+    is not a stub, so relations among boundary entities are left out
+
+    :param focus: the entities to centre on, or their names
+    :param depth: the number of relations to follow from the focus entities, 0 for just the focus entities
+    :param index: the `adjacency` index of the schema. building it takes a pass over every relation, so give it when
+           extracting many neighbourhoods of the same schema
+    :return: the entities (in breadth-first order, focus first), the relations, and the entities among them that are
+             stubs. these can be given straight to `render_chen`
+    """
+    if depth < 0:
+        raise ValueError("depth must be at least 0")
+    if index is None:
+        index = adjacency(entities, relations)
+
+    by_name = None
+    distance: dict[Entity, int] = {}
+    for entity in focus:
+        if isinstance(entity, str):
+            if by_name is None:
+                by_name = {e.name: e for e in entities}
+            if entity not in by_name:
+                raise ValueError(f"Unknown focus entity {entity!r}")
+            entity = by_name[entity]
+        distance.setdefault(entity, 0)
+
+    frontier = list(distance)
+    for d in range(1, depth + 1):
+        next_frontier = []
+        for entity in frontier:
+            for other in _neighbours(entity, index):
+                if other not in distance:
+                    distance[other] = d
+                    next_frontier.append(other)
+        frontier = next_frontier
+
+    kept = list(distance)
+    stubs = [e for e in kept if 0 < distance[e] == depth]
+    kept_relations = []
+    seen = set()
+    for entity in kept:
+        if 0 < distance[entity] == depth:
+            continue
+        for rel in index.get(entity, ()):
+            if rel not in seen and all(e_info.entity in distance for e_info in rel.entity_infos):
+                seen.add(rel)
+                kept_relations.append(rel)
+    return kept, kept_relations, stubs
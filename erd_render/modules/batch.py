@@ -0,0 +1,76 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Mapping, Sequence, Union
+
+from erd_render.modules.pool import EnginePool
+from erd_render.style import chen
+
+
+class RenderResult:
+    """the outcome of a single job given to `render_many`"""
+
+    def __init__(
+        self,
+        job: Mapping[str, Any],
+        path: Union[str, None] = None,
+        error: Union[Exception, None] = None,
+    ):
+        self.job = job
+        self.path = path
+        self.error = error
+
+    def __repr__(self) -> str:
+        path = self.path
+        error = self.error
+        return f"RenderResult({path=}, {error=})"
+
+    def ok(self):
+        return self.error is None
+
+
+def render_many(
+    jobs: Sequence[Mapping[str, Any]],
+    max_workers: Union[int, None] = None,
+    pool: EnginePool = None,
+) -> list[RenderResult]:
+    """
+    render many diagrams at once. each graphviz source is built in this process, while the layout engine subprocesses
+    run concurrently in a bounded pool.
+
+    a failing job does not abort the batch, its exception is stored in its `RenderResult` instead
+
+    ```
+    results = render_many([
+        {"entities": [staff], "relations": [], "filename": "staff.gv"},
+        {"entities": [staff, project], "relations": [rel], "filename": "project.gv", "format": "png"},
+    ])
+    ```
+
+    :param jobs: a list of dicts, each containing the keyword arguments for `erd_render.style.chen.render`.
+           give each job a different `filename`, otherwise they will overwrite each other
+    :param max_workers: the maximum number of layout engines running at the same time, defaults to the number of CPUs
+    :param pool: an `EnginePool` to run the layout engines in, for jobs that do not give their own. its workers stay
+           warm between diagrams, so they skip the start up cost of the engine
+    :return: a `RenderResult` for each job, in the same order as `jobs`
+    """
+    results = [RenderResult(job) for job in jobs]
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    # each worker thread builds a graph then waits on its engine subprocess. node ids are allocated per graph, so
+    # building in parallel is safe, and the waiting does not hold the GIL
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(chen.render, **_with_pool(result.job, pool)) for result in results]
+        for future, result in zip(futures, results):
+            try:
+                result.path = future.result()
+            except Exception as e:
+                result.error = e
+
+    return results
+
+
+def _with_pool(job: Mapping[str, Any], pool: Union[EnginePool, None]) -> Mapping[str, Any]:
+    if pool is None or "pool" in job:
+        return job
+    return {**job, "pool": pool}
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Union
+
+
+class RenderCache:
+    """
+    an on-disk cache of rendered diagrams, keyed on the graphviz source together with the engine, output format and
+    graph attributes. on a hit the earlier output is copied into place and the layout engine is not run at all. when
+    the cache grows past `max_bytes`, the least recently used diagrams are evicted.
+    """
+
+    def __init__(self, directory: str = ".erd-cache", max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self) -> str:
+        return f"RenderCache({self.directory!r}, max_bytes={self.max_bytes})"
+
+    def key(self, graph, format: str) -> str:
+        """compute the cache key of an `ObjGraph` rendered to the given format"""
+        h = hashlib.sha256()
+        parts = [graph.engine, format]
+        parts.extend(f"{k}={v}" for k, v in sorted(graph.graph_attr.items()))
+        parts.append(graph.source)
+        for part in parts:
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def path(self, key: str, format: str) -> str:
+        return os.path.join(self.directory, f"{key}.{format}")
+
+    def get(self, key: str, format: str) -> Union[str, None]:
+        """return the path of a cached diagram, or None if it is not in the cache"""
+        path = self.path(key, format)
+        try:
+            # the modification time is used as the "last used" time for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, format: str, output: str) -> str:
+        """store a rendered diagram in the cache, then evict old diagrams if the cache is too large"""
+        path = self.path(key, format)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.copyfile(output, tmp)
+            # atomic, so other processes sharing the cache never see a partial file
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict()
+        return path
+
+    def put_bytes(self, key: str, format: str, data: bytes) -> str:
+        """store the bytes of a rendered diagram in the cache, see `put`"""
+        path = self.path(key, format)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict()
+        return path
+
+    def evict(self):
+        """remove the least recently used diagrams until the cache is no larger than `max_bytes`"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(".tmp-") or not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def render(self, graph, filename=None, format: str = None, stats=None, timeout=None) -> str:
+        """render an `ObjGraph` like `ObjGraph.render`, skipping the layout engine on a cache hit"""
+        if format is None:
+            format = graph.format
+        key = self.key(graph, format)
+        cached = self.get(key, format)
+
+        if cached is None:
+            output = graph.render(filename=filename, format=format, stats=stats, timeout=timeout)
+            self.put(key, format, output)
+            return output
+
+        # always write the source file, like graphviz does
+        source_path = graph.save(filename, stats=stats)
+        output = f"{source_path}.{format}"
+        # a copy, not a hard link, so later renders to the same path without the cache cannot change the cached file
+        if os.path.exists(output):
+            os.remove(output)
+        shutil.copyfile(cached, output)
+        if stats is not None:
+            stats.cached = True
+        return output
+
+    def pipe(self, graph, format: str = None, stats=None, timeout=None) -> bytes:
+        """render an `ObjGraph` to bytes like `ObjGraph.pipe`, skipping the layout engine on a cache hit"""
+        if format is None:
+            format = graph.format
+        key = self.key(graph, format)
+        cached = self.get(key, format)
+
+        if cached is None:
+            data = graph.pipe(format=format, stats=stats, timeout=timeout)
+            self.put_bytes(key, format, data)
+            return data
+        if stats is not None:
+            stats.cached = True
+            graph.record(stats, len(graph.source.encode("utf-8")))
+        with open(cached, "rb") as f:
+            return f.read()
+
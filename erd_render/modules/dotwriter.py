@@ -0,0 +1,146 @@
+import os
+from typing import BinaryIO, Union
+
+from graphviz.quoting import attr_list, quote, quote_edge
+
+# the write buffer of files opened by path, large enough that most graphs take few system calls
+BUFFER_SIZE = 1 << 16
+
+
+class DotWriter:
+    """
+    a minimal stand-in for graphviz.Graph that writes each statement as soon as it is made, instead of keeping every
+    line of the source in memory until the graph is rendered. it has the parts of the graphviz.Graph API that `ObjGraph`
+    uses, and writes the same statements in the same order.
+
+    the graph attributes are only written by `close`, at the end of the source, so the engine and its attributes can
+    still be changed after drawing. when writing to a path they can even be changed after closing, the end of the file
+    is then rewritten by the next `close`
+    """
+
+    def __init__(
+        self,
+        file: Union[str, BinaryIO],
+        name: str = None,
+        engine: str = "dot",
+        format: str = "pdf",
+        graph_attr=None,
+        node_attr=None,
+        edge_attr=None,
+        encoding: str = "utf-8",
+        filename: str = None,
+        directory: str = "",
+    ):
+        """
+        :param file: the path to write the source to, or a binary file object like the stdin of a layout engine. file
+               objects are flushed but not closed by `close`
+        """
+        self.name = name
+        self.engine = engine
+        self.format = format
+        self.graph_attr = dict(graph_attr or ())
+        self.encoding = encoding
+        self.filename = filename
+        self.directory = directory
+        # the number of bytes of source written so far
+        self.bytes_written = 0
+
+        if isinstance(file, (str, os.PathLike)):
+            self.path = os.fspath(file)
+            dirname = os.path.dirname(self.path)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            self._file = open(self.path, "wb", buffering=BUFFER_SIZE)
+        else:
+            self.path = None
+            self._file = file
+        # where the graph attributes start, and the ones that were written there
+        self._footer_offset = None
+        self._written_attrs = None
+
+        self._write(f"graph {quote(name) + ' ' if name else ''}{{\n")
+        if node_attr:
+            self.attr("node", **dict(node_attr))
+        if edge_attr:
+            self.attr("edge", **dict(edge_attr))
+
+    def __repr__(self) -> str:
+        target = self.path if self.path is not None else self._file
+        return f"DotWriter({target!r}, {self.name!r}, engine={self.engine!r}, <{self.bytes_written} bytes>)"
+
+    @property
+    def filepath(self) -> str:
+        if self.path is not None:
+            return self.path
+        return os.path.join(self.directory or "", self.filename or f"{self.name}.gv")
+
+    @property
+    def closed(self) -> bool:
+        return self._footer_offset is not None
+
+    @property
+    def source(self) -> str:
+        """the source, read back from the file. only available when writing to a path, once closed"""
+        if self.path is None:
+            raise ValueError("The source was streamed to a file object, it cannot be read back")
+        self.close()
+        with open(self.path, "r", encoding=self.encoding) as f:
+            return f.read()
+
+    def _write(self, line: str):
+        if self.closed:
+            raise ValueError("Cannot add to a graph that has been closed")
+        data = line.encode(self.encoding)
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    def node(self, name: str, label=None, **attrs):
+        self._write(f"\t{quote(name)}{attr_list(label, kwargs=attrs)}\n")
+
+    def edge(self, tail_name: str, head_name: str, label=None, **attrs):
+        self._write(f"\t{quote_edge(tail_name)} -- {quote_edge(head_name)}{attr_list(label, kwargs=attrs)}\n")
+
+    def attr(self, kw: str, **attrs):
+        if kw not in ("graph", "node", "edge"):
+            raise ValueError(f"attr statement must target graph, node, or edge: {kw!r}")
+        if attrs:
+            self._write(f"\t{kw}{attr_list(kwargs=attrs)}\n")
+
+    def _footer(self) -> bytes:
+        graph_attr = f"\tgraph{attr_list(kwargs=self.graph_attr)}\n" if self.graph_attr else ""
+        return (graph_attr + "}\n").encode(self.encoding)
+
+    def close(self):
+        """write the graph attributes and the end of the graph. does nothing if they are already up to date"""
+        if not self.closed:
+            footer = self._footer()
+            self._file.write(footer)
+            if self.path is not None:
+                self._file.close()
+            else:
+                self._file.flush()
+            self._footer_offset = self.bytes_written
+            self._written_attrs = dict(self.graph_attr)
+            self.bytes_written += len(footer)
+            return
+
+        if self._written_attrs == self.graph_attr:
+            return
+        if self.path is None:
+            raise ValueError("The graph attributes cannot be changed after streaming the source to a file object")
+        footer = self._footer()
+        with open(self.path, "r+b") as f:
+            f.seek(self._footer_offset)
+            f.write(footer)
+            f.truncate()
+        self._written_attrs = dict(self.graph_attr)
+        self.bytes_written = self._footer_offset + len(footer)
+
+    def save(self, filename=None) -> str:
+        """close the graph then return the path of its source, like graphviz.Graph.save"""
+        if self.path is None:
+            raise ValueError("The source was streamed to a file object, it cannot be saved")
+        if filename is not None and os.path.abspath(filename) != os.path.abspath(self.path):
+            raise ValueError(f"The source was streamed to {self.path!r}, it cannot be saved to {filename!r}")
+        self.close()
+        return self.path
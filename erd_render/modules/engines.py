@@ -0,0 +1,81 @@
+import time
+from typing import Callable, TypeVar, Union
+
+T = TypeVar("T")
+
+# graphs up to this many nodes are laid out with `neato`, it looks best but is quadratic
+NEATO_MAX_NODES = 150
+# the fewest iterations neato is given, for the largest graphs it lays out
+NEATO_MIN_ITERATIONS = 100
+# graphs above this many nodes use a cheaper `sfdp` configuration
+SFDP_FAST_MIN_NODES = 3000
+# a fixed seed, so the same graph always gets the same layout
+SEED = "1"
+
+
+def auto_engine(nodes: int, edges: int, pinned=False) -> tuple[str, dict[str, str]]:
+    """
+    choose a layout engine and its graph attributes for a graph of the given size
+
+    :param pinned: whether some nodes have pinned positions, `sfdp` ignores them so `fdp` is used instead
+    :return: the engine name and its graph attributes
+    """
+    if nodes <= NEATO_MAX_NODES:
+        return "neato", {
+            "overlap": "false",
+            "mode": "major",
+            # stop early on larger graphs: the iterations go down from graphviz's default of 200 as the graph grows,
+            # and the convergence threshold is 10 times looser than the default of 0.0001 for mode=major
+            "maxiter": str(max(NEATO_MIN_ITERATIONS, min(200, 250 - nodes))),
+            "epsilon": "0.001",
+            "start": SEED,
+        }
+
+    attrs = {
+        "overlap": "prism",
+        "overlap_scaling": "-4",
+        "K": "0.3",
+        "repulsiveforce": "1.0",
+        "start": SEED,
+    }
+    # sparse graphs converge quickly, dense ones need the iterations bounded
+    if nodes >= SFDP_FAST_MIN_NODES or edges > 3 * nodes:
+        attrs.update(fast_engine(pinned)[1])
+    return ("fdp" if pinned else "sfdp"), attrs
+
+
+def fast_engine(pinned=False) -> tuple[str, dict[str, str]]:
+    """the cheapest engine configuration, used when a layout runs out of time"""
+    return ("fdp" if pinned else "sfdp"), {
+        "overlap": "scale",
+        "maxiter": "100",
+        "quadtree": "fast",
+        "start": SEED,
+    }
+
+
+def run_with_budget(
+    attempts: list[tuple[str, dict[str, str]]],
+    budget: Union[float, None],
+    run: Callable[[str, dict[str, str], Union[float, None]], T],
+) -> T:
+    """
+    try each engine configuration in turn until one finishes within the remaining time budget.
+    the last attempt always runs to completion, so there is always a result
+
+    :param attempts: engine names and graph attributes, slowest (best looking) first
+    :param budget: the total number of seconds for all attempts, None for no limit
+    :param run: called with the engine, graph attributes and timeout, should raise `TimeoutError` when it runs out
+    """
+    deadline = None if budget is None else time.monotonic() + budget
+    for i, (engine, attrs) in enumerate(attempts):
+        if deadline is None or i == len(attempts) - 1:
+            return run(engine, attrs, None)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            continue
+        try:
+            return run(engine, attrs, remaining)
+        except TimeoutError:
+            continue
+    raise ValueError("At least one engine configuration must be given")
@@ -0,0 +1,155 @@
+from typing import Mapping, Sequence
+
+# the number of steps of the force simulation
+ITERATIONS = 200
+# the pull of every node towards the centre of the graph, relative to its distance from the centre
+GRAVITY = 1.0
+# the most passes made to push overlapping nodes apart once the simulation has finished, whatever still overlaps after
+# them is spread out by scaling the whole layout
+OVERLAP_PASSES = 20
+# the space left between nodes by the overlap removal, in points
+NODE_GAP = 6.0
+# a fixed seed, so the same graph always gets the same layout
+SEED = 1
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("The builtin layout engine needs the `numpy` package: pip install erd_render[builtin]") from e
+    return numpy
+
+
+def force_layout(
+    sizes: Sequence[tuple[float, float]],
+    edges: Sequence[tuple[int, int]],
+    k: float,
+    repulsive_force=1.0,
+    pinned: Mapping[int, tuple[float, float]] = None,
+    gravity=GRAVITY,
+    iterations=ITERATIONS,
+    seed=SEED,
+):
+    """
+    place nodes with a Fruchterman-Reingold force simulation, then push apart the nodes that still overlap. every step
+    works on all pairs of nodes at once with NumPy, which takes O(n²) time and memory per step, so this suits graphs of
+    up to a few thousand nodes
+
+    :param sizes: the width and height of each node, in points
+    :param edges: the indexes of the 2 nodes of each edge
+    :param k: the ideal length of an edge, in points
+    :param repulsive_force: the strength of the repulsion between nodes relative to the attraction along edges
+    :param pinned: the fixed position of some nodes by index, they are never moved
+    :param gravity: the pull of every node towards the centre, which keeps unconnected parts of the graph together
+    :return: an array of the centre of each node in points, with y pointing up like graphviz
+    """
+    np = _numpy()
+    n = len(sizes)
+    if n == 0:
+        return np.zeros((0, 2))
+    sizes = np.asarray(sizes, dtype=float).reshape(n, 2)
+
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(0.0, k * np.sqrt(n), size=(n, 2))
+    fixed = np.zeros(n, dtype=bool)
+    if pinned:
+        index = np.fromiter(pinned.keys(), dtype=np.intp, count=len(pinned))
+        pos[index] = np.asarray(list(pinned.values()), dtype=float)
+        fixed[index] = True
+
+    edges = np.asarray(edges, dtype=np.intp).reshape(-1, 2)
+    tails, heads = edges[:, 0], edges[:, 1]
+    loops = tails == heads
+    tails, heads = tails[~loops], heads[~loops]
+
+    # the largest step a node can take, it cools down to nothing by the last step
+    temperature = k * np.sqrt(n) / 10
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        # squared distances from |a|² + |b|² - 2a·b, a matrix product instead of an n×n×2 array of differences
+        sq = np.einsum("ij,ij->i", pos, pos)
+        dist2 = sq[:, None] + sq[None, :] - 2.0 * (pos @ pos.T)
+        # nodes on top of each other push apart hard but not infinitely
+        np.maximum(dist2, 0.01, out=dist2)
+        np.fill_diagonal(dist2, np.inf)
+        # repulsion of k²/d along the unit vector (a - b)/d, summed over b
+        w = 1.0 / dist2
+        disp = repulsive_force * k * k * (w.sum(axis=1)[:, None] * pos - w @ pos)
+
+        # attraction of d²/k along each edge
+        d = pos[tails] - pos[heads]
+        pull = d * (np.sqrt(np.einsum("ij,ij->i", d, d)) / k)[:, None]
+        np.subtract.at(disp, tails, pull)
+        np.add.at(disp, heads, pull)
+        # gravity towards the centre, which keeps unconnected parts of the graph from drifting apart
+        disp -= gravity * (pos - pos.mean(axis=0))
+
+        disp[fixed] = 0.0
+        length = np.sqrt(np.einsum("ij,ij->i", disp, disp))[:, None]
+        pos += disp / np.maximum(length, 1e-9) * np.minimum(length, temperature)
+        temperature -= cooling
+
+    remove_overlaps(pos, sizes, fixed)
+    return pos
+
+
+def remove_overlaps(pos, sizes, fixed=None, gap=NODE_GAP, passes=OVERLAP_PASSES):
+    """
+    move overlapping nodes apart in place, each pair along the axis that needs the smaller move. nodes that overlap
+    several others are moved by the sum of the overlaps, so this repeats until nothing overlaps or `passes` runs out.
+    then the layout is scaled up just enough that no nodes overlap, like graphviz's overlap=scale
+    """
+    np = _numpy()
+    n = len(pos)
+    half = np.asarray(sizes, dtype=float) / 2 + gap / 2
+    movable = np.ones(n) if fixed is None else (~fixed).astype(float)
+    for _ in range(passes):
+        dx = pos[:, 0, None] - pos[None, :, 0]
+        dy = pos[:, 1, None] - pos[None, :, 1]
+        overlap_x = half[:, 0, None] + half[None, :, 0] - np.abs(dx)
+        overlap_y = half[:, 1, None] + half[None, :, 1] - np.abs(dy)
+        # each pair once, i < j
+        i, j = np.nonzero(np.triu((overlap_x > 0) & (overlap_y > 0), 1))
+        if len(i) == 0:
+            break
+        ox, oy = overlap_x[i, j], overlap_y[i, j]
+        along_x = ox <= oy
+        # which way to move nodes at the same coordinate: the later node goes up or right
+        sx = np.where(dx[i, j] > 0, 1.0, -1.0)
+        sy = np.where(dy[i, j] > 0, 1.0, -1.0)
+        step = np.zeros((len(i), 2))
+        step[:, 0] = np.where(along_x, ox * sx, 0.0)
+        step[:, 1] = np.where(along_x, 0.0, oy * sy)
+        # each node of a pair moves half of the overlap, or all of it when the other one is pinned
+        share_i = movable[i] / np.maximum(movable[i] + movable[j], 1.0)
+        share_j = movable[j] / np.maximum(movable[i] + movable[j], 1.0)
+        np.add.at(pos, i, step * share_i[:, None])
+        np.subtract.at(pos, j, step * share_j[:, None])
+    else:
+        scale_apart(pos, half * 2, fixed)
+    return pos
+
+
+def scale_apart(pos, sizes, fixed=None):
+    """scale the layout in place, about its centre, by the least factor that leaves no 2 nodes overlapping"""
+    np = _numpy()
+    dx = np.abs(pos[:, 0, None] - pos[None, :, 0])
+    dy = np.abs(pos[:, 1, None] - pos[None, :, 1])
+    need_x = (sizes[:, 0, None] + sizes[None, :, 0]) / 2
+    need_y = (sizes[:, 1, None] + sizes[None, :, 1]) / 2
+    with np.errstate(divide="ignore"):
+        # a pair stops overlapping once it is far enough apart along either axis
+        factor = np.minimum(need_x / dx, need_y / dy)
+    np.fill_diagonal(factor, 1.0)
+    scale = factor.max()
+    if not 1.0 < scale < np.inf:
+        return pos
+    if fixed is not None and fixed.any():
+        # pinned nodes stay where they are, the others move away from them
+        centre = pos[fixed].mean(axis=0)
+        pos[~fixed] = centre + (pos[~fixed] - centre) * scale
+    else:
+        centre = pos.mean(axis=0)
+        pos[:] = centre + (pos - centre) * scale
+    return pos
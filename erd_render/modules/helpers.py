@@ -1,29 +1,34 @@
 import re
-from typing import Sequence
+from functools import lru_cache
+from typing import Sequence, Union
 
 from erd_render.modules.obj import Entity, Attribute, ATTR
 
-_ATTR_TYPE_REGEX = re.compile(r"\s*([*+~]*)\s*(.+?)\s*(\[\s*\])?\s*")
+# a whole attribute definition: prefix, name, "[]" postfix, then the subattributes after a ":"
+_ATTR_REGEX = re.compile(r"\s*([*+~]*)\s*([^:]*?)\s*(\[\s*\])?\s*(?::(.*))?", re.DOTALL)
+# a single subattribute, which cannot contain whitespace
+_SUBATTR_REGEX = re.compile(r"([*+~]*)(.*?)(\[\])?", re.DOTALL)
+_WORD_REGEX = re.compile(r"\S+")
 
+# the maximum number of distinct definitions remembered by `parse_attribute`
+PARSE_CACHE_SIZE = 4096
 
-def _split_attribute_type(name: str) -> tuple[str, ATTR]:
-    """Given an attribute string (without subcomponents), determine then return the attribute name and type"""
-    match = _ATTR_TYPE_REGEX.fullmatch(name)
-    prefix, name, postfix = match.groups()
 
+def _attribute_type(prefix: str, postfix: Union[str, None]) -> ATTR:
+    """determine the attribute type from the prefix and postfix of a definition"""
     if "*" in prefix:
-        return name, ATTR.KEY_ATTRIBUTE
+        return ATTR.KEY_ATTRIBUTE
     elif "+" in prefix:
-        return name, ATTR.WEAK_KEY_ATTRIBUTE
+        return ATTR.WEAK_KEY_ATTRIBUTE
     elif postfix is not None:
-        return name, ATTR.MULTIVALUE
+        return ATTR.MULTIVALUE
     elif "~" in prefix:
-        return name, ATTR.DERIVED
+        return ATTR.DERIVED
     else:
-        return name, ATTR.NORMAL
+        return ATTR.NORMAL
 
 
-def parse_attribute(definition: str):
+def parse_attribute(definition: str) -> Attribute:
     """Parse a string to an `Attribute`. Supported string formats:
 
     - `*name`: key attribute
@@ -40,30 +45,55 @@ def parse_attribute(definition: str):
     Attribute.parse("addresses[]")
     ```
 
+    results are memoized, so parsing the same definition again returns the same (immutable) `Attribute`
+
     :param definition: a string to parse
     :return: an Attribute
+    :raises ValueError: if the definition is invalid, the message includes the position of the problem
     """
-    name = definition
-    subattrs = None
+    return _parse_attribute(definition)
+
+
+def clear_parse_cache():
+    """forget the definitions memoized by `parse_attribute`, e.g. to time parsing from a cold start"""
+    _parse_attribute.cache_clear()
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_attribute(definition: str) -> Attribute:
+    match = _ATTR_REGEX.fullmatch(definition)
+    prefix, name, postfix, subattrs = match.groups()
+    if not name:
+        pos = match.start(2)
+        raise ValueError(f"Missing attribute name at position {pos}: {definition!r}")
+
+    components = None
+    if subattrs is not None:
+        offset = definition.index(":") + 1
+        if ":" in subattrs:
+            pos = offset + subattrs.index(":")
+            msg = f"Unexpected ':' at position {pos}, subattributes cannot have subattributes: {definition!r}"
+            raise ValueError(msg)
+        # split subattributes by whitespace then parse each of them
+        components = [
+            _parse_subattribute(word.group(), definition, offset + word.start())
+            for word in _WORD_REGEX.finditer(subattrs)
+        ]
 
-    # check if it has subattributes
-    if ":" in name:
-        # this will error if there are multiple ":"'s in the name
-        name, subattrs = name.split(":")
-        name = name.strip()
-        # split attributes by space then parse each string
-        subattrs = subattrs.split()
-        subattrs = [parse_attribute(x) for x in subattrs]
+    return Attribute(name, type=_attribute_type(prefix, postfix), components=components)
 
-    # check if it starts with * or +
-    name, type = _split_attribute_type(name)
 
-    return Attribute(name, type=type, components=subattrs)
+def _parse_subattribute(word: str, definition: str, pos: int) -> Attribute:
+    prefix, name, postfix = _SUBATTR_REGEX.fullmatch(word).groups()
+    if not name:
+        raise ValueError(f"Missing attribute name at position {pos}: {definition!r}")
+    return Attribute(name, type=_attribute_type(prefix, postfix))
 
 
-def parse_attributes(definitions: Sequence[str]):
-    """Parse a list of strings to `Attributes`, see documentation for `parse_attribute`"""
-    return [parse_attribute(d) for d in definitions]
+def parse_attributes(definitions: Sequence[str]) -> list[Attribute]:
+    """Parse a list of strings to `Attributes`, see documentation for `parse_attribute`.
+    repeated definitions are only parsed once"""
+    return [_parse_attribute(d) for d in definitions]
 
 
 def quick_entity(name: str, attrs: Sequence[str]):
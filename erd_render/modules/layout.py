@@ -0,0 +1,66 @@
+import json
+from typing import Union
+
+# bump this when the file format changes, old files are then ignored instead of misread
+LAYOUT_VERSION = 1
+
+
+class Layout:
+    """
+    node positions from an earlier render. give it to the next `ObjGraph` to pin the nodes that have not changed since,
+    so the layout engine only has to place new or changed nodes
+    """
+
+    def __init__(self, nodes: dict[str, tuple[str, str]] = None):
+        # node id -> (position in points as "x,y", signature of the node's label and attributes)
+        self.nodes = {} if nodes is None else nodes
+
+    def __repr__(self) -> str:
+        return f"Layout(<{len(self.nodes)} nodes>)"
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def pin(self, node_id: str, signature: str) -> Union[str, None]:
+        """return the pinned position of a node, or None if the node is new or has changed since the earlier render"""
+        entry = self.nodes.get(node_id)
+        if entry is None or entry[1] != signature:
+            return None
+        return f"{entry[0]}!"
+
+    @classmethod
+    def from_json(cls, data: bytes, signatures: dict[str, str]) -> "Layout":
+        """
+        read the node positions from graphviz's `-Tjson` output
+
+        :param data: the json output of graphviz
+        :param signatures: the signature of each node, see `ObjGraph.signatures`
+        """
+        nodes = {}
+        for obj in json.loads(data).get("objects", []):
+            name = obj.get("name")
+            pos = obj.get("pos")
+            if pos is None or name not in signatures:
+                continue
+            nodes[name] = (pos.rstrip("!"), signatures[name])
+        return cls(nodes)
+
+    @classmethod
+    def load(cls, path: str) -> "Layout":
+        """load a layout saved by `save`. a missing or outdated file gives an empty layout"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        if data.get("version") != LAYOUT_VERSION:
+            return cls()
+        return cls({k: (pos, sig) for k, (pos, sig) in data["nodes"].items()})
+
+    def save(self, path: str):
+        data = {
+            "version": LAYOUT_VERSION,
+            "nodes": {k: list(v) for k, v in sorted(self.nodes.items())},
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=0)
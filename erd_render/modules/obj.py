@@ -1,5 +1,5 @@
 from enum import Enum, auto
-from typing import Union, Sequence
+from typing import Iterable, Union, Sequence
 
 
 class ATTR(Enum):
@@ -19,30 +19,117 @@ class COUNT(Enum):
     ANY = auto()  # 0..*
 
 
+# shared by all attributes without subattributes
+_NO_COMPONENTS: "tuple[Attribute, ...]" = ()
+
+
 class Attribute:
-    """represents an attribute, only instantiated internally"""
+    """
+    represents an attribute, only instantiated internally.
+    attributes are immutable, so the same attribute can safely appear in many entities
+    """
+
+    __slots__ = ("name", "type", "subattrs")
 
     def __init__(
-        self, name: str, type: ATTR = ATTR.NORMAL, components: "list[Attribute]" = None
+        self,
+        name: str,
+        type: ATTR = ATTR.NORMAL,
+        components: "Sequence[Attribute]" = None,
     ):
-        if components is None:
-            components = []
+        components = tuple(components) if components else _NO_COMPONENTS
 
-        self.name = name
-        self.type = type
-        self.subattrs = components
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "type", type)
+        object.__setattr__(self, "subattrs", components)
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"Attribute is immutable, cannot set {key!r}")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"Attribute is immutable, cannot delete {key!r}")
+
+    def __reduce__(self):
+        return Attribute, (self.name, self.type, self.subattrs)
 
     def __repr__(self) -> str:
-        return f"""Attribute({self.name.__repr__()}, {self.type}, {self.subattrs})"""
+        return f"""Attribute({self.name.__repr__()}, {self.type}, {list(self.subattrs)})"""
 
     def is_composite(self):
         return len(self.subattrs) != 0
 
 
+class AttributeList(list):
+    """
+    the attributes of an entity. a plain list that remembers how many of them are keys, so `Entity.is_weak` does not
+    scan them every time. changing the list forgets the count, it is counted again on the next `key_count`
+    """
+
+    __slots__ = ("_key_count",)
+
+    def __init__(self, attributes: Iterable[Attribute] = ()):
+        super().__init__(attributes)
+        self._key_count = None
+
+    def key_count(self) -> int:
+        """the number of key attributes"""
+        if self._key_count is None:
+            self._key_count = sum(1 for attr in self if attr.type == ATTR.KEY_ATTRIBUTE)
+        return self._key_count
+
+    def _changed(self):
+        self._key_count = None
+
+    def append(self, attr: Attribute):
+        super().append(attr)
+        self._changed()
+
+    def extend(self, attributes: Iterable[Attribute]):
+        super().extend(attributes)
+        self._changed()
+
+    def insert(self, index: int, attr: Attribute):
+        super().insert(index, attr)
+        self._changed()
+
+    def remove(self, attr: Attribute):
+        super().remove(attr)
+        self._changed()
+
+    def pop(self, index: int = -1) -> Attribute:
+        self._changed()
+        return super().pop(index)
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._changed()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, attributes: Iterable[Attribute]):
+        self._changed()
+        return super().__iadd__(attributes)
+
+    def __imul__(self, n: int):
+        self._changed()
+        return super().__imul__(n)
+
+    def __reduce__(self):
+        return AttributeList, (list(self),)
+
+
 class Entity:
     """represents an entity, can be strong or weak"""
 
-    def __init__(self, name: str, attributes: list[Attribute] = None) -> None:
+    __slots__ = ("name", "_attrs")
+
+    def __init__(self, name: str, attributes: Sequence[Attribute] = None) -> None:
         if attributes is None:
             attributes = []
         self.name = name
@@ -51,13 +138,22 @@ class Entity:
     def __repr__(self) -> str:
         return f"""Entity({self.name}, {self.attrs})"""
 
+    @property
+    def attrs(self) -> AttributeList:
+        """the attributes of this entity, a list that can be changed in place"""
+        return self._attrs
+
+    @attrs.setter
+    def attrs(self, attributes: Sequence[Attribute]):
+        self._attrs = attributes if attributes.__class__ is AttributeList else AttributeList(attributes)
+
+    def add_attribute(self, *attributes: Attribute):
+        """add attributes to this entity"""
+        self._attrs.extend(attributes)
+
     def is_weak(self):
         """check if an entity is weak (has no key attributes)"""
-        for attr in self.attrs:
-            if attr.type == ATTR.KEY_ATTRIBUTE:
-                return False
-        else:  # no break
-            return True
+        return self._attrs.key_count() == 0
 
 
 class EntityInfo:
@@ -77,6 +173,8 @@ class EntityInfo:
     (doctor, 1),
     """
 
+    __slots__ = ("entity", "count", "role")
+
     def __init__(
         self, entity: Entity, count: Union[COUNT, int, None] = None, role: str = None
     ):
@@ -89,6 +187,8 @@ class EntityInfo:
 
 
 class Relation:
+    __slots__ = ("entity_infos", "name", "is_identifying", "attrs")
+
     def __init__(
         self,
         *entities: Union[Entity, EntityInfo, Sequence],
@@ -117,6 +217,49 @@ class Relation:
 
         self.raise_for_count()
 
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> "list[Relation]":
+        """create many relations at once, validating all of them in a single pass.
+
+        each row is a tuple of `(entities, name, is_identifying, attributes)` where only `entities` is required, e.g.
+        `([(staff, 1), (branch, COUNT.ANY)], "Manages")`. instead of stopping at the first invalid row, every problem is
+        collected and reported in one ValueError
+
+        :param rows: the relations to create, see `Relation.__init__` for the meaning of each field
+        :return: the created relations, in the same order as `rows`
+        """
+        relations = []
+        errors = []
+        parse_entity = cls.parse_entity
+        for i, row in enumerate(rows):
+            try:
+                if not isinstance(row, Sequence) or not 1 <= len(row) <= 4:
+                    raise ValueError(f"Invalid row, it must be a sequence of 1 to 4 fields: {row!r}")
+                entities, *rest = row
+                # fill in the defaults of the missing optional fields
+                name, is_identifying, attributes = [*rest, *(None, False, None)[len(rest) :]]
+                if not isinstance(entities, Sequence):
+                    raise ValueError(f"The entities must be a sequence, not {type(entities).__name__}")
+                if len(entities) < 2:
+                    raise ValueError("There must be at least 2 entities involved in a relation")
+                entity_infos = [parse_entity(x) for x in entities]
+                _check_counts(entity_infos)
+            except ValueError as e:
+                errors.append(f"row {i}: {e}")
+                continue
+
+            # skip __init__, the row has already been validated
+            rel = cls.__new__(cls)
+            rel.entity_infos = entity_infos
+            rel.name = name
+            rel.is_identifying = is_identifying
+            rel.attrs = [] if attributes is None else attributes
+            relations.append(rel)
+
+        if errors:
+            raise ValueError("Invalid relations:\n" + "\n".join(errors))
+        return relations
+
     def __repr__(self) -> str:
         entities = ", ".join(str(entity_info) for entity_info in self.entity_infos)
         name = self.name
@@ -148,13 +291,15 @@ class Relation:
 
     def raise_for_count(self):
         """check if all entities have / don't have a count, raise error if not"""
-        has_cardinality = self.has_cardinality()
-        for entity_count in self.entity_infos:
-            if (has_cardinality and entity_count.count is None) or (
-                not has_cardinality and entity_count.count is not None
-            ):
-                msg = "Entity count must be provided for either all entities or no entities"
-                raise ValueError(msg)
+        _check_counts(self.entity_infos)
 
     def has_cardinality(self):
         return self.entity_infos[0].count is not None
+
+
+def _check_counts(entity_infos: Sequence[EntityInfo]):
+    has_cardinality = entity_infos[0].count is not None
+    for entity_count in entity_infos:
+        if has_cardinality != (entity_count.count is not None):
+            msg = "Entity count must be provided for either all entities or no entities"
+            raise ValueError(msg)
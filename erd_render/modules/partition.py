@@ -0,0 +1,174 @@
+import html
+import os
+from collections import deque
+from typing import Any, Sequence, Union
+
+from erd_render.modules.adjacency import _neighbours, adjacency
+from erd_render.modules.batch import RenderResult, render_many
+from erd_render.modules.obj import Entity, Relation
+from erd_render.validation import validate
+
+
+class Cluster:
+    """a part of a schema that is rendered as its own diagram"""
+
+    def __init__(self, entities: list[Entity]):
+        # the entities that belong to this cluster
+        self.members = entities
+        self.relations: list[Relation] = []
+        # entities of other clusters that relations of this cluster connect to
+        self.stubs: list[Entity] = []
+
+    def __repr__(self) -> str:
+        names = ", ".join(e.name for e in self.members)
+        return f"Cluster({names}, <{len(self.relations)} relations>, <{len(self.stubs)} stubs>)"
+
+    @property
+    def entities(self) -> list[Entity]:
+        """the members then the stubs, i.e. every entity that is drawn"""
+        return [*self.members, *self.stubs]
+
+
+def partition(
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    max_size: Union[int, None] = 50,
+) -> list[Cluster]:
+    """
+    split a schema into clusters of at most `max_size` entities.
+
+    each connected group of entities is kept together when it fits. larger groups are split into pieces grown
+    breadth-first, so related entities stay together, and small groups are packed together to avoid lots of tiny
+    diagrams. a relation belongs to the cluster holding most of its entities, the others become stubs of that cluster
+
+    :param max_size: the maximum number of entities in a cluster (not counting stubs), None for no limit
+    """
+    if max_size is not None and max_size < 1:
+        raise ValueError("max_size must be at least 1")
+    index = adjacency(entities, relations)
+
+    # find the connected components, splitting those that are too large
+    pieces: list[list[Entity]] = []
+    assigned = set()
+    for seed in entities:
+        if seed in assigned:
+            continue
+        component = []
+        assigned.add(seed)
+        queue = deque([seed])
+        while queue:
+            entity = queue.popleft()
+            component.append(entity)
+            for other in _neighbours(entity, index):
+                if other not in assigned:
+                    assigned.add(other)
+                    queue.append(other)
+        if max_size is None or len(component) <= max_size:
+            pieces.append(component)
+        else:
+            pieces.extend(_split(component, index, max_size))
+
+    # pack the pieces into clusters, first fit in order
+    clusters: list[Cluster] = []
+    for piece in pieces:
+        for cluster in clusters:
+            if max_size is None or len(cluster.members) + len(piece) <= max_size:
+                cluster.members.extend(piece)
+                break
+        else:  # no break
+            clusters.append(Cluster(piece))
+
+    cluster_of = {entity: i for i, cluster in enumerate(clusters) for entity in cluster.members}
+    stub_sets = [set() for _ in clusters]
+    for rel in relations:
+        votes: dict[int, int] = {}
+        for e_info in rel.entity_infos:
+            i = cluster_of[e_info.entity]
+            votes[i] = votes.get(i, 0) + 1
+        # most entities wins, ties go to the cluster of the earliest entity
+        i = max(votes, key=votes.get)
+        cluster = clusters[i]
+        cluster.relations.append(rel)
+        for e_info in rel.entity_infos:
+            entity = e_info.entity
+            if cluster_of[entity] != i and entity not in stub_sets[i]:
+                stub_sets[i].add(entity)
+                cluster.stubs.append(entity)
+
+    return clusters
+
+
+def _split(component: list[Entity], index, max_size: int) -> list[list[Entity]]:
+    """split a connected component into pieces of at most `max_size` entities, each grown breadth-first"""
+    remaining = set(component)
+    pieces = []
+    for seed in component:
+        if seed not in remaining:
+            continue
+        piece = []
+        remaining.discard(seed)
+        queue = deque([seed])
+        while queue and len(piece) < max_size:
+            entity = queue.popleft()
+            piece.append(entity)
+            for other in _neighbours(entity, index):
+                if other in remaining:
+                    remaining.discard(other)
+                    queue.append(other)
+        # entities queued but not taken go back to the pool
+        remaining.update(queue)
+        pieces.append(piece)
+    return pieces
+
+
+def render_partitioned(
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    directory: str,
+    max_size: Union[int, None] = 50,
+    format="svg",
+    max_workers: Union[int, None] = None,
+    **kwargs: Any,
+) -> tuple[str, list[RenderResult]]:
+    """
+    split a large schema with `partition`, render each cluster as its own diagram in parallel with `render_many`,
+    then write an `index.html` that links to every part
+
+    :param directory: the directory to write the diagrams and index to
+    :param kwargs: other keyword arguments for `erd_render.style.chen.render`
+    :return: the path of the index page, and the result of rendering each cluster
+    """
+    # the whole schema is checked once here, instead of once per cluster
+    if kwargs.pop("check", True):
+        validate(entities, relations)
+    os.makedirs(directory, exist_ok=True)
+    clusters = partition(entities, relations, max_size=max_size)
+    jobs = [
+        {
+            **kwargs,
+            "entities": cluster.entities,
+            "relations": cluster.relations,
+            "stubs": cluster.stubs,
+            "filename": os.path.join(directory, f"part-{i + 1}.gv"),
+            "format": format,
+            "check": False,
+        }
+        for i, cluster in enumerate(clusters)
+    ]
+    results = render_many(jobs, max_workers=max_workers)
+
+    items = []
+    for i, (cluster, result) in enumerate(zip(clusters, results)):
+        names = html.escape(", ".join(e.name for e in cluster.members))
+        if result.ok():
+            link = html.escape(os.path.relpath(result.path, directory))
+            items.append(f'<li><a href="{link}">Part {i + 1}</a>: {names}</li>')
+        else:
+            error = html.escape(str(result.error))
+            items.append(f"<li>Part {i + 1} (failed: {error}): {names}</li>")
+
+    index_path = os.path.join(directory, "index.html")
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.write("<!DOCTYPE html>\n<html>\n<head><meta charset=\"utf-8\"><title>ER diagram</title></head>\n<body>\n")
+        f.write("<ul>\n" + "\n".join(items) + "\n</ul>\n</body>\n</html>\n")
+    return index_path, results
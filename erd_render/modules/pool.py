@@ -0,0 +1,209 @@
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import Sequence, Union
+
+from erd_render.modules.render import engine_command, run_engine
+
+# the engines each worker lays out a tiny graph with when it starts, so their plugins are loaded before the first job
+WARM_ENGINES = ("sfdp", "neato")
+
+# sent by a worker process once it has loaded the graphviz library
+READY = "ready"
+
+_shared: "Union[EnginePool, None]" = None
+_shared_lock = threading.Lock()
+
+
+def has_pygraphviz() -> bool:
+    """whether the graphviz C bindings (the `pygraphviz` package) can be imported"""
+    try:
+        import pygraphviz  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _warm_up(engines: Sequence[str]):
+    import pygraphviz
+
+    for engine in engines:
+        pygraphviz.AGraph(string="graph { a -- b }").draw(format="svg", prog=engine)
+
+
+def _layout_subprocess(source: bytes, engine: str, format: str, timeout: Union[float, None]) -> bytes:
+    return run_engine(engine_command(engine, format), input=source, timeout=timeout)[0]
+
+
+def _serve(conn: Connection, engines: Sequence[str]):
+    """the main loop of a worker process: lay out each graph it is sent with the graphviz library, until it gets None"""
+    import pygraphviz
+
+    _warm_up(engines)
+    # the parent waits for this before giving the worker its first job, so the warm up is not part of its timeout
+    conn.send(READY)
+    while True:
+        job = conn.recv()
+        if job is None:
+            return
+        source, engine, format = job
+        try:
+            data = pygraphviz.AGraph(string=source.decode("utf-8")).draw(format=format, prog=engine)
+        except Exception as e:
+            try:
+                conn.send((False, e))
+            except Exception:
+                # the exception cannot be pickled
+                conn.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+        else:
+            conn.send((True, data))
+
+
+class _Worker:
+    """a process that has loaded the graphviz library, and lays out one graph at a time"""
+
+    def __init__(self, engines: Sequence[str]):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve, args=(child, engines), daemon=True)
+        self.process.start()
+        child.close()
+        try:
+            message = self.conn.recv()
+        except EOFError:
+            self.process.join()
+            raise RuntimeError(f"The layout worker stopped with exit code {self.process.exitcode}") from None
+        if message != READY:
+            self.kill()
+            raise RuntimeError(f"The layout worker sent {message!r} instead of starting")
+
+    def run(self, source: bytes, engine: str, format: str, timeout: Union[float, None]) -> bytes:
+        try:
+            self.conn.send((source, engine, format))
+            finished = self.conn.poll(timeout)
+            if finished:
+                ok, value = self.conn.recv()
+        except (EOFError, OSError):
+            # the process died, e.g. graphviz crashed on this graph
+            self.kill()
+            raise RuntimeError(f"The layout worker stopped with exit code {self.process.exitcode}") from None
+        if not finished:
+            self.kill()
+            raise TimeoutError(f"{engine} did not finish within {timeout} seconds")
+        if not ok:
+            raise value
+        return value
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+        self.process.join()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class EnginePool:
+    """
+    a pool of long-lived workers that run layout engines. give it to `render_chen(..., pool=...)` or `render_many` to
+    pay the start up cost of the layout engine once per worker instead of once per diagram.
+
+    when `pygraphviz` is installed (`pip install erd_render[pool]`), each worker is a process that has loaded the
+    graphviz library and its plugins, and lays out graphs by calling it directly. otherwise the workers are threads
+    that each start a graphviz process per diagram, like rendering without a pool.
+
+    the timeout of a job starts when a worker picks it up, not while it waits in the queue or for a new worker process
+    to load graphviz. a layout that runs past its timeout cannot be stopped inside a worker process, so that worker
+    process is killed and replaced, and the jobs running in the other workers carry on
+    """
+
+    def __init__(self, max_workers: int = None, in_process: bool = None, warm_engines: Sequence[str] = WARM_ENGINES):
+        """
+        :param max_workers: the number of workers, defaults to the number of CPUs
+        :param in_process: whether to lay out graphs with `pygraphviz` in worker processes, defaults to whether it is
+               installed
+        :param warm_engines: the engines each worker process loads when it starts
+        """
+        if in_process is None:
+            in_process = has_pygraphviz()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.in_process = in_process
+        self.warm_engines = tuple(warm_engines)
+        # a thread per worker takes the jobs from the queue. in process mode, each one drives a worker process
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="erd-engine")
+        self._idle: "queue.SimpleQueue[_Worker]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __repr__(self) -> str:
+        kind = "processes" if self.in_process else "threads"
+        return f"EnginePool(<{self.max_workers} {kind}>)"
+
+    def __enter__(self) -> "EnginePool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, source: bytes, engine: str, format: str, timeout: float = None) -> Future:
+        """queue a graph to be laid out, see `run`"""
+        if self.in_process:
+            return self._executor.submit(self._layout_in_process, source, engine, format, timeout)
+        return self._executor.submit(_layout_subprocess, source, engine, format, timeout)
+
+    def run(self, source: bytes, engine: str, format: str, timeout: float = None) -> bytes:
+        """
+        lay out and render the DOT source of a graph in a worker, then return the rendered bytes
+
+        :param timeout: the number of seconds the layout may take once a worker has picked it up, before it is stopped
+               and `TimeoutError` is raised
+        """
+        return self.submit(source, engine, format, timeout).result()
+
+    def _layout_in_process(self, source: bytes, engine: str, format: str, timeout: Union[float, None]) -> bytes:
+        """lay out and render a graph with the graphviz library loaded in a worker process, instead of starting one"""
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            # there are never more worker processes than threads, so they are started as they are first needed
+            worker = _Worker(self.warm_engines)
+        try:
+            return worker.run(source, engine, format, timeout)
+        finally:
+            with self._lock:
+                if worker.alive() and not self._closed:
+                    self._idle.put(worker)
+                elif worker.alive():
+                    worker.stop()
+
+    def close(self, wait=True):
+        """stop the workers. jobs that are already queued are finished first when `wait` is True"""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    self._idle.get_nowait().stop()
+                except queue.Empty:
+                    break
+
+    @classmethod
+    def shared(cls) -> "EnginePool":
+        """a pool shared by the whole program with the default settings, created on first use and closed at exit"""
+        global _shared
+        with _shared_lock:
+            if _shared is None:
+                _shared = cls()
+                atexit.register(_shared.close, wait=False)
+            return _shared
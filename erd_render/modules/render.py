@@ -1,27 +1,587 @@
-from graphviz import Graph
+import asyncio
+import hashlib
+import os
+import subprocess
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import BinaryIO, Union
 
-from erd_render.modules.uid import new as uid
+from graphviz import ExecutableNotFound, Graph
+
+from erd_render.modules import svg
+from erd_render.modules.dotwriter import DotWriter
+from erd_render.modules.layout import Layout
+from erd_render.modules.svg import BUILTIN_ENGINE, Recorder
+from erd_render.modules.uid import UidAllocator
+
+# the default number of layout engines that `ObjGraph.pipe_async` runs at the same time, per event loop
+MAX_CONCURRENT_RENDERS = os.cpu_count() or 1
+
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _default_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENT_RENDERS)
+    return semaphore
+
+
+class RenderStats:
+    """
+    timings and size metrics of a single render. pass one to `render_chen(..., stats=...)` to have it filled in
+
+    - `phases`: the wall time in seconds of each phase, e.g. "validate" (checking the model), "build" (drawing the
+      nodes and edges), "serialize" (generating the DOT source) and "layout" (running the layout engine)
+    - `nodes`, `edges`, `dot_bytes`: the size of the graph
+    - `engine`: the layout engine that was used
+    - `peak_rss`: the peak resident set size of the engine subprocess in bytes, None if it is unknown
+    - `cached`: whether the diagram came from a `RenderCache`, so the engine was not run
+    """
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.nodes = 0
+        self.edges = 0
+        self.dot_bytes = 0
+        self.engine: Union[str, None] = None
+        self.peak_rss: Union[int, None] = None
+        self.cached = False
+
+    def __repr__(self) -> str:
+        return f"RenderStats({self.as_dict()})"
+
+    def as_dict(self) -> dict:
+        return {
+            "phases": dict(self.phases),
+            "nodes": self.nodes,
+            "edges": self.edges,
+            "dot_bytes": self.dot_bytes,
+            "engine": self.engine,
+            "peak_rss": self.peak_rss,
+            "cached": self.cached,
+        }
+
+    def add_phase(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def measure(self, name: str):
+        """time the body of a `with` block as the given phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+
+
+def engine_command(engine: str, format: str) -> list[str]:
+    """the command line that renders a source given on stdin to the given format on stdout"""
+    return ["dot", f"-K{engine}", f"-T{format}"]
+
+
+class EngineProcess:
+    """
+    a running graphviz command. its stdout and stderr are read in the background, so the source can be written to
+    `stdin` a bit at a time (e.g. by an `ObjGraph` streaming into it) without filling the pipes and deadlocking
+    """
+
+    def __init__(self, cmd: list[str], timeout: float = None):
+        """
+        :param timeout: the number of seconds from now to wait before killing the command, see `wait`
+        """
+        self.cmd = cmd
+        try:
+            self.proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except FileNotFoundError as e:
+            raise ExecutableNotFound(cmd) from e
+        self.stdin = self.proc.stdin
+
+        self._outputs = {}
+        self._readers = [
+            threading.Thread(target=self._drain, args=("out", self.proc.stdout), daemon=True),
+            threading.Thread(target=self._drain, args=("err", self.proc.stderr), daemon=True),
+        ]
+        for reader in self._readers:
+            reader.start()
+        self._timer = None
+        self._expired = False
+        self._timeout = None
+        if timeout is not None:
+            self.start_timer(timeout)
+
+    def __repr__(self) -> str:
+        return f"EngineProcess({self.cmd!r}, pid={self.proc.pid})"
+
+    def _drain(self, name, stream):
+        self._outputs[name] = stream.read()
+        stream.close()
+
+    def _expire(self):
+        self._expired = True
+        self.proc.kill()
+
+    def start_timer(self, timeout: float):
+        """kill the command if it is still running after `timeout` seconds"""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timeout = timeout
+        self._timer = threading.Timer(timeout, self._expire)
+        self._timer.start()
+
+    def write(self, data: bytes):
+        """write to stdin, ignoring a closed pipe, as the engine's error is then on stderr"""
+        try:
+            self.stdin.write(data)
+        except BrokenPipeError:
+            pass
+
+    def kill(self):
+        """stop the command without waiting for its output"""
+        if self._timer is not None:
+            self._timer.cancel()
+        self.proc.kill()
+        self._close_stdin()
+        self.proc.wait()
+
+    def _close_stdin(self):
+        try:
+            self.stdin.close()
+        except BrokenPipeError:
+            pass
+
+    def wait(self, timeout: float = None) -> tuple[bytes, Union[int, None]]:
+        """
+        close stdin, wait for the command to finish, then return its stdout and its peak resident set size in bytes.
+        the peak is None on platforms without `os.wait4`
+
+        :param timeout: the number of seconds from now to wait before killing the command and raising `TimeoutError`
+        :raises subprocess.CalledProcessError: if the command fails
+        """
+        if timeout is not None:
+            self.start_timer(timeout)
+        try:
+            self._close_stdin()
+            if hasattr(os, "wait4"):
+                _, status, usage = os.wait4(self.proc.pid, 0)
+                self.proc.returncode = os.waitstatus_to_exitcode(status)
+                # linux reports kilobytes, macOS reports bytes
+                peak_rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+            else:
+                self.proc.wait()
+                peak_rss = None
+        finally:
+            if self._timer is not None:
+                self._timer.cancel()
+
+        for reader in self._readers:
+            reader.join()
+        out = self._outputs.get("out", b"")
+        err = self._outputs.get("err", b"")
+        if self._expired:
+            raise TimeoutError(f"{self.cmd} did not finish within {self._timeout} seconds")
+        if self.proc.returncode != 0:
+            raise subprocess.CalledProcessError(self.proc.returncode, self.cmd, output=out, stderr=err)
+        return out, peak_rss
+
+
+def run_engine(
+    cmd: list[str], input: bytes = None, timeout: float = None
+) -> tuple[bytes, Union[int, None]]:
+    """
+    run a graphviz command then return its stdout and its peak resident set size in bytes. the peak is None on
+    platforms without `os.wait4`
+
+    :param input: the bytes to write to stdin
+    :param timeout: the number of seconds to wait before killing the command and raising `TimeoutError`
+    :raises subprocess.CalledProcessError: if the command fails
+    """
+    process = EngineProcess(cmd, timeout=timeout)
+    if input:
+        process.write(input)
+    return process.wait()
+
+
+def _signature(label, *attrs: dict) -> str:
+    """a short hash of a node's label and attributes, used to tell whether a node changed between renders"""
+    parts = [repr(label)]
+    for a in attrs:
+        parts.extend(f"{k}={v}" for k, v in sorted(a.items()))
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()[:16]
 
 
 class ObjGraph:
     """a wrapper for graphviz.Graph that uses a unique id for all nodes to avoid name conflicts"""
 
-    def __init__(self, *args, **kwargs):
-        self.graph = Graph(*args, **kwargs)
-        self.render = self.graph.render
-        self.view = self.graph.view
-        self.save = self.graph.save
+    def __init__(self, *args, layout: Layout = None, file: Union[str, EngineProcess, BinaryIO] = None, **kwargs):
+        """
+        takes the same arguments as graphviz.Graph
+
+        :param layout: the `Layout` of an earlier render. nodes whose label and attributes have not changed since are
+               pinned to their earlier position. this also records the signature of every node, so the new layout
+               can be obtained with `render_layout`
+        :param file: stream the source as it is drawn instead of keeping it in memory, see `DotWriter`. either the path
+               of the source file, a binary file object, or an `EngineProcess` to write straight into the engine. a
+               graph streamed into an engine can only be rendered with `pipe`, to the format the engine was started
+               with
+
+        with engine="builtin" the graph is kept in memory by a `Recorder`, then laid out and drawn as SVG in this
+        process instead of by graphviz, see `erd_render.modules.svg`
+        """
+        self.process: Union[EngineProcess, None] = None
+        if kwargs.get("engine") == BUILTIN_ENGINE:
+            if file is not None:
+                raise ValueError(f"The {BUILTIN_ENGINE} engine lays out the graph in memory, it cannot be streamed")
+            self.graph = Recorder(*args, **kwargs)
+        elif file is None:
+            self.graph = Graph(*args, **kwargs)
+            self.view = self.graph.view
+        else:
+            if isinstance(file, EngineProcess):
+                self.process = file
+                file = file.stdin
+            self.graph = DotWriter(file, *args, **kwargs)
+        self.ids = UidAllocator()
+        # an `erd_render.modules.pool.EnginePool` to run the layout engine in, instead of starting a process per render
+        self.pool = None
+        self.layout = layout
+        self.signatures: dict[str, str] = {}
+        self._node_style = {}
+        self.node_count = 0
+        self.edge_count = 0
+
+    @property
+    def streamed(self) -> bool:
+        """whether the source is written as it is drawn, by a `DotWriter`"""
+        return isinstance(self.graph, DotWriter)
+
+    @property
+    def builtin(self) -> bool:
+        """whether the graph is laid out by the builtin engine instead of graphviz"""
+        return self.graph.engine == BUILTIN_ENGINE
+
+    @property
+    def source(self) -> str:
+        return self.graph.source
+
+    @property
+    def engine(self) -> str:
+        return self.graph.engine
+
+    @property
+    def format(self) -> str:
+        return self.graph.format
+
+    @property
+    def graph_attr(self) -> dict[str, str]:
+        return self.graph.graph_attr
+
+    def set_engine(self, engine: str, graph_attr: dict[str, str]):
+        """change the layout engine, replacing the graph attributes with the given ones"""
+        if self.process is not None and engine != self.graph.engine:
+            raise ValueError("Cannot change the engine of a graph that is streamed into a running engine")
+        self.graph.engine = engine
+        self.graph.graph_attr.clear()
+        self.graph.graph_attr.update(graph_attr)
+
+    def save(self, filename=None, stats: RenderStats = None) -> str:
+        """write the graphviz source to a file then return its path, like graphviz.Graph.save"""
+        if self.streamed:
+            path = self.graph.save(filename)
+            if stats is not None:
+                self.record(stats, self.graph.bytes_written)
+            return path
+        data = self._serialize(stats)
+        if filename is not None:
+            self.graph.filename = filename
+        path = self.graph.filepath
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def render(
+        self,
+        filename=None,
+        format=None,
+        cache=None,
+        stats: RenderStats = None,
+        timeout: float = None,
+    ) -> str:
+        """
+        render the graph to a file then return the path of the rendered file
+
+        :param cache: an optional `RenderCache`, the layout engine is skipped if the same graph was rendered before
+        :param stats: an optional `RenderStats` to record timings and sizes in
+        :param timeout: the number of seconds to wait for the layout engine before killing it and raising
+               `TimeoutError`. the builtin engine runs in this process and cannot be stopped, so it ignores the timeout
+        """
+        if cache is not None:
+            return cache.render(self, filename=filename, format=format, stats=stats, timeout=timeout)
+        if format is None:
+            format = self.format
+
+        source_path = self.save(filename, stats=stats)
+        output = f"{source_path}.{format}"
+        if self.builtin:
+            with open(output, "wb") as f:
+                f.write(self._run_builtin(format, stats)[0])
+            return output
+        if self.pool is not None:
+            with open(source_path, "rb") as f:
+                source = f.read()
+            data = self._run_pool(source, format, stats, timeout)
+            with open(output, "wb") as f:
+                f.write(data)
+            return output
+        self._run([*self.command(format), "-o", output, source_path], stats=stats, timeout=timeout)
+        return output
+
+    def render_layout(
+        self,
+        filename=None,
+        format=None,
+        stats: RenderStats = None,
+        timeout: float = None,
+    ) -> tuple[str, Layout]:
+        """
+        render the graph to a file like `render`, then return the path of the rendered file and the computed `Layout`.
+        the layout is written by the same engine run, using graphviz's `-Tjson` output, so this never uses the `pool`
+        """
+        if self.layout is None:
+            raise ValueError("The graph must be created with a `layout` to record its layout")
+        if format is None:
+            format = self.format
+
+        source_path = self.save(filename, stats=stats)
+        output = f"{source_path}.{format}"
+        if self.builtin:
+            data, positions = self._run_builtin(format, stats)
+            with open(output, "wb") as f:
+                f.write(data)
+            nodes = {k: (f"{x:.2f},{y:.2f}", self.signatures[k]) for k, (x, y) in positions.items()}
+            return output, Layout(nodes)
+
+        layout_output = f"{source_path}.json"
+        cmd = [*self.command(format), "-o", output, "-Tjson", "-o", layout_output, source_path]
+        self._run(cmd, stats=stats, timeout=timeout)
+
+        try:
+            with open(layout_output, "rb") as f:
+                layout = Layout.from_json(f.read(), self.signatures)
+        finally:
+            os.remove(layout_output)
+        return output, layout
+
+    def pipe(
+        self,
+        format=None,
+        cache=None,
+        stats: RenderStats = None,
+        timeout: float = None,
+    ) -> bytes:
+        """
+        render the graph then return the rendered bytes, without writing any files
+
+        :param cache: an optional `RenderCache`, the layout engine is skipped if the same graph was rendered before
+        :param stats: an optional `RenderStats` to record timings and sizes in
+        :param timeout: the number of seconds to wait for the layout engine before killing it and raising `TimeoutError`
+        """
+        if cache is not None:
+            return cache.pipe(self, format=format, stats=stats, timeout=timeout)
+        if format is None:
+            format = self.format
+        if self.builtin:
+            if stats is not None:
+                # no DOT source is generated
+                self.record(stats, 0)
+            return self._run_builtin(format, stats)[0]
+        if self.process is not None:
+            return self._finish_process(format, stats, timeout)
+        if self.pool is not None:
+            if self.streamed:
+                with open(self.save(stats=stats), "rb") as f:
+                    source = f.read()
+            else:
+                source = self._serialize(stats)
+            return self._run_pool(source, format, stats, timeout)
+        if self.streamed:
+            # let the engine read the source file, instead of reading it back
+            source_path = self.save(stats=stats)
+            return self._run([*self.command(format), source_path], stats=stats, timeout=timeout)
+        data = self._serialize(stats)
+        return self._run(self.command(format), input=data, stats=stats, timeout=timeout)
+
+    def _finish_process(self, format: str, stats: Union[RenderStats, None], timeout: Union[float, None]) -> bytes:
+        """end the source streamed into the engine, then wait for its output"""
+        if f"-T{format}" not in self.process.cmd:
+            raise ValueError(f"The engine was started with {self.process.cmd}, it cannot render to {format!r}")
+        start = time.perf_counter()
+        try:
+            self.graph.close()
+            out, peak_rss = self.process.wait(timeout)
+        finally:
+            if stats is not None:
+                stats.add_phase("layout", time.perf_counter() - start)
+        if stats is not None:
+            self.record(stats, self.graph.bytes_written)
+            stats.peak_rss = peak_rss
+        return out
+
+    def _run_builtin(
+        self, format: str, stats: Union[RenderStats, None]
+    ) -> tuple[bytes, dict[str, tuple[float, float]]]:
+        """lay out and draw the graph in this process, returning the output and the position of each node"""
+        start = time.perf_counter()
+        try:
+            return svg.render(self.graph, format)
+        finally:
+            if stats is not None:
+                stats.add_phase("layout", time.perf_counter() - start)
+
+    def _run_pool(
+        self, source: bytes, format: str, stats: Union[RenderStats, None], timeout: Union[float, None]
+    ) -> bytes:
+        """run the layout engine in a worker of the `pool`"""
+        start = time.perf_counter()
+        try:
+            return self.pool.run(source, self.engine, format, timeout=timeout)
+        finally:
+            if stats is not None:
+                stats.add_phase("layout", time.perf_counter() - start)
+
+    def _serialize(self, stats: Union[RenderStats, None]) -> bytes:
+        """generate the graphviz source"""
+        start = time.perf_counter()
+        data = self.source.encode(self.graph.encoding)
+        if stats is not None:
+            stats.add_phase("serialize", time.perf_counter() - start)
+            self.record(stats, len(data))
+        return data
+
+    def record(self, stats: RenderStats, dot_bytes: int):
+        """record the size of this graph in a `RenderStats`"""
+        stats.nodes = self.node_count
+        stats.edges = self.edge_count
+        stats.dot_bytes = dot_bytes
+        stats.engine = self.engine
+
+    def _run(
+        self,
+        cmd: list[str],
+        input: bytes = None,
+        stats: RenderStats = None,
+        timeout: float = None,
+    ) -> bytes:
+        """run the layout engine"""
+        start = time.perf_counter()
+        try:
+            out, peak_rss = run_engine(cmd, input=input, timeout=timeout)
+        finally:
+            # a timed out run still counts towards the layout time
+            if stats is not None:
+                stats.add_phase("layout", time.perf_counter() - start)
+        if stats is not None:
+            stats.peak_rss = peak_rss
+        return out
+
+    def command(self, format: str) -> list[str]:
+        """the command line that renders the source (given on stdin) to the given format on stdout"""
+        if self.builtin:
+            raise ValueError(f"The {BUILTIN_ENGINE} engine runs in this process, it has no command line")
+        return engine_command(self.engine, format)
+
+    async def pipe_async(
+        self,
+        format: str = None,
+        timeout: float = None,
+        semaphore: asyncio.Semaphore = None,
+    ) -> bytes:
+        """
+        render the graph in an asyncio subprocess then return the rendered bytes. the source is piped in on stdin and
+        the output is read from stdout, so no files are written.
+
+        :param timeout: the number of seconds to wait for the layout engine before killing it and raising `TimeoutError`
+        :param semaphore: limits how many layout engines run at once, defaults to a shared semaphore of
+               `MAX_CONCURRENT_RENDERS` for the running event loop
+        """
+        if format is None:
+            format = self.format
+        if semaphore is None:
+            semaphore = _default_semaphore()
+        if self.builtin:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(asyncio.to_thread(self.pipe, format), timeout)
+                except asyncio.TimeoutError as e:
+                    raise TimeoutError(f"The {BUILTIN_ENGINE} engine did not finish within {timeout} seconds") from e
+        if self.pool is not None:
+            async with semaphore:
+                return await asyncio.to_thread(self.pipe, format, timeout=timeout)
+        cmd = self.command(format)
+        source = self.source.encode(self.graph.encoding)
+
+        async with semaphore:
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            except FileNotFoundError as e:
+                raise ExecutableNotFound(cmd) from e
+            try:
+                out, err = await asyncio.wait_for(proc.communicate(source), timeout)
+            except BaseException as e:
+                # timed out or cancelled, don't leave the engine running
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+                if isinstance(e, asyncio.TimeoutError):
+                    raise TimeoutError(f"{cmd} did not finish within {timeout} seconds") from e
+                raise
+
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, output=out, stderr=err)
+        return out
+
+    def node(self, label, path: str = None, **kwargs) -> str:
+        """
+        create a node then return its unique id
 
-    def node(self, label, **kwargs) -> str:
-        """create a node then return its unique id"""
-        node_id = uid()
+        :param path: a path that identifies this node in the model, used to derive a stable id
+        """
+        node_id = self.ids.new(path)
+        self.node_count += 1
+        if self.layout is not None:
+            signature = _signature(label, self._node_style, kwargs)
+            self.signatures[node_id] = signature
+            pos = self.layout.pin(node_id, signature)
+            if pos is not None:
+                kwargs["pos"] = pos
         self.graph.node(node_id, label=label, **kwargs)
         return node_id
 
     def edge(self, node_a: str, node_b: str, label=None, **kwargs):
         """this takes 2 node ids as input, which are returned by the #node method"""
+        self.edge_count += 1
         self.graph.edge(node_a, node_b, label=label, **kwargs)
 
     def node_style(self, **kwargs):
         # set the node style
+        self._node_style.update(kwargs)
         self.graph.attr("node", **kwargs)
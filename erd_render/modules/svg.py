@@ -0,0 +1,363 @@
+import html
+import math
+import os
+from html.parser import HTMLParser
+from typing import Union
+
+from graphviz.quoting import attr_list, quote, quote_edge
+
+from erd_render.modules.forcelayout import force_layout
+
+# the engine name of the layout engine in this module, e.g. `render_chen(..., engine="builtin", format="svg")`
+BUILTIN_ENGINE = "builtin"
+
+# text metrics, in points. the widths are estimated from an average character width, as no font is loaded
+FONT_FAMILY = "Times,serif"
+FONT_SIZE = 14.0
+CHAR_WIDTH = 0.55 * FONT_SIZE
+LINE_HEIGHT = 1.2 * FONT_SIZE
+# graphviz's default minimum node size
+MIN_WIDTH = 54.0
+MIN_HEIGHT = 36.0
+# the space between the outlines of nodes with peripheries=2, and between the lines of a double edge
+PERIPHERY_GAP = 4.0
+# the space around the diagram
+MARGIN = 8.0
+
+
+class Recorder:
+    """
+    a minimal stand-in for graphviz.Graph that keeps the nodes and edges in memory, for the builtin engine to lay out
+    and draw. it has the parts of the graphviz.Graph API that `ObjGraph` uses, and still generates the same DOT source,
+    so the graph can be given to a graphviz engine instead
+    """
+
+    def __init__(
+        self,
+        name: str = None,
+        engine: str = BUILTIN_ENGINE,
+        format: str = "svg",
+        graph_attr=None,
+        node_attr=None,
+        edge_attr=None,
+        encoding: str = "utf-8",
+        filename: str = None,
+        directory: str = "",
+    ):
+        self.name = name
+        self.engine = engine
+        self.format = format
+        self.graph_attr = dict(graph_attr or ())
+        self.encoding = encoding
+        self.filename = filename
+        self.directory = directory
+        # (name, label, attributes including the node style at the time)
+        self.nodes: list[tuple[str, Union[str, None], dict[str, str]]] = []
+        # (tail name, head name, label, attributes)
+        self.edges: list[tuple[str, str, Union[str, None], dict[str, str]]] = []
+        self._node_attr = dict(node_attr or ())
+        self._edge_attr = dict(edge_attr or ())
+        self._body: list[str] = []
+        if node_attr:
+            self._body.append(f"\tnode{attr_list(kwargs=dict(node_attr))}\n")
+        if edge_attr:
+            self._body.append(f"\tedge{attr_list(kwargs=dict(edge_attr))}\n")
+
+    def __repr__(self) -> str:
+        return f"Recorder({self.name!r}, <{len(self.nodes)} nodes, {len(self.edges)} edges>)"
+
+    @property
+    def filepath(self) -> str:
+        return os.path.join(self.directory or "", self.filename or f"{self.name}.gv")
+
+    @property
+    def source(self) -> str:
+        graph_attr = f"\tgraph{attr_list(kwargs=self.graph_attr)}\n" if self.graph_attr else ""
+        return f"graph {quote(self.name) + ' ' if self.name else ''}{{\n{graph_attr}{''.join(self._body)}}}\n"
+
+    def node(self, name: str, label=None, **attrs):
+        attrs = {k: v for k, v in attrs.items() if v is not None}
+        self.nodes.append((name, label, {**self._node_attr, **attrs}))
+        self._body.append(f"\t{quote(name)}{attr_list(label, kwargs=attrs)}\n")
+
+    def edge(self, tail_name: str, head_name: str, label=None, **attrs):
+        attrs = {k: v for k, v in attrs.items() if v is not None}
+        self.edges.append((tail_name, head_name, label, {**self._edge_attr, **attrs}))
+        self._body.append(f"\t{quote_edge(tail_name)} -- {quote_edge(head_name)}{attr_list(label, kwargs=attrs)}\n")
+
+    def attr(self, kw: str, **attrs):
+        if kw not in ("graph", "node", "edge"):
+            raise ValueError(f"attr statement must target graph, node, or edge: {kw!r}")
+        if kw == "node":
+            self._node_attr.update(attrs)
+        elif kw == "edge":
+            self._edge_attr.update(attrs)
+        else:
+            self.graph_attr.update(attrs)
+        if attrs:
+            self._body.append(f"\t{kw}{attr_list(kwargs=attrs)}\n")
+
+
+# labels
+
+
+class _LabelParser(HTMLParser):
+    """split an HTML-like label into lines of (text, underline, bold, italic) runs. tables become one line per row"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lines: list[list[tuple[str, bool, bool, bool]]] = [[]]
+        self._depth = {"u": 0, "b": 0, "i": 0}
+        self._cells = 0
+
+    def _new_line(self):
+        if self.lines[-1]:
+            self.lines.append([])
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._depth:
+            self._depth[tag] += 1
+        elif tag in ("br", "tr"):
+            self._new_line()
+            self._cells = 0
+        elif tag == "td":
+            # separate the cells of a row
+            if self._cells and self.lines[-1]:
+                self.lines[-1].append(("  ", False, False, False))
+            self._cells += 1
+
+    def handle_endtag(self, tag):
+        if tag in self._depth:
+            self._depth[tag] -= 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_data(self, data):
+        if data:
+            d = self._depth
+            self.lines[-1].append((data, d["u"] > 0, d["b"] > 0, d["i"] > 0))
+
+
+def parse_label(label: Union[str, None], name: str) -> list[list[tuple[str, bool, bool, bool]]]:
+    """the lines of a node label as (text, underline, bold, italic) runs. graphviz's default label is the node name"""
+    if label is None:
+        label = name
+    if label.startswith("<") and label.endswith(">"):
+        parser = _LabelParser()
+        parser.feed(label[1:-1])
+        parser.close()
+        lines = [line for line in parser.lines if line]
+        return lines or [[("", False, False, False)]]
+    return [[(line, False, False, False)] for line in label.split("\n")]
+
+
+def _text_width(line: list[tuple[str, bool, bool, bool]]) -> float:
+    return sum(len(text) for text, *_ in line) * CHAR_WIDTH
+
+
+def node_size(shape: str, lines: list, attrs: dict[str, str]) -> tuple[float, float]:
+    """the width and height of a node in points, estimated from its label"""
+    text_width = max(_text_width(line) for line in lines)
+    text_height = len(lines) * LINE_HEIGHT
+    if shape in ("ellipse", "oval", "circle"):
+        width, height = (text_width + 16) * math.sqrt(2), (text_height + 4) * math.sqrt(2)
+    elif shape == "diamond":
+        width, height = (text_width + 16) * 2, (text_height + 8) * 2
+    else:
+        width, height = text_width + 16, text_height + 8
+    if shape != "plain":
+        width, height = max(width, MIN_WIDTH), max(height, MIN_HEIGHT)
+    if attrs.get("peripheries") == "2":
+        width += 2 * PERIPHERY_GAP
+        height += 2 * PERIPHERY_GAP
+    return width, height
+
+
+# drawing
+
+
+def layout(recorder: Recorder) -> tuple[dict[str, tuple[float, float]], dict[str, tuple[float, float]]]:
+    """
+    lay out the nodes of a recorded graph with `force_layout`. the ideal edge length is the graph's `K` in inches plus
+    the average node size. nodes with a pinned position ("x,y!" in points) are kept there
+
+    :return: the centre of each node in points with y pointing up, and the size of each node
+    """
+    index = {}
+    sizes = []
+    pinned = {}
+    for name, label, attrs in recorder.nodes:
+        index[name] = len(sizes)
+        sizes.append(node_size(attrs.get("shape", "ellipse"), parse_label(label, name), attrs))
+        pos = attrs.get("pos")
+        if pos is not None and pos.endswith("!"):
+            x, y = pos.rstrip("!").split(",")
+            pinned[index[name]] = (float(x), float(y))
+    edges = [(index[tail], index[head]) for tail, head, _, _ in recorder.edges]
+
+    graph_attr = recorder.graph_attr
+    average = sum(w + h for w, h in sizes) / (2 * len(sizes)) if sizes else 0.0
+    k = 72 * float(graph_attr.get("K", "0.3")) + average
+    pos = force_layout(sizes, edges, k, float(graph_attr.get("repulsiveforce", "1.0")), pinned)
+    names = list(index)
+    return (
+        {name: (float(x), float(y)) for name, (x, y) in zip(names, pos.tolist())},
+        dict(zip(names, sizes)),
+    )
+
+
+def _style(attrs: dict[str, str], stroke: str) -> str:
+    parts = [f'stroke="{stroke}"']
+    if "dashed" in attrs.get("style", ""):
+        parts.append('stroke-dasharray="5,2"')
+    return " ".join(parts)
+
+
+def _outline(shape: str, x: float, y: float, w: float, h: float) -> str:
+    if shape in ("ellipse", "oval", "circle"):
+        return f'<ellipse cx="{x:.2f}" cy="{y:.2f}" rx="{w / 2:.2f}" ry="{h / 2:.2f}"'
+    if shape == "diamond":
+        points = f"{x:.2f},{y - h / 2:.2f} {x + w / 2:.2f},{y:.2f} {x:.2f},{y + h / 2:.2f} {x - w / 2:.2f},{y:.2f}"
+        return f'<polygon points="{points}"'
+    return f'<rect x="{x - w / 2:.2f}" y="{y - h / 2:.2f}" width="{w:.2f}" height="{h:.2f}"'
+
+
+def _text(lines: list, x: float, y: float, color: str) -> list[str]:
+    out = []
+    top = y - len(lines) * LINE_HEIGHT / 2
+    for i, line in enumerate(lines):
+        baseline = top + (i + 0.75) * LINE_HEIGHT
+        spans = []
+        for text, underline, bold, italic in line:
+            style = []
+            if underline:
+                style.append('text-decoration="underline"')
+            if bold:
+                style.append('font-weight="bold"')
+            if italic:
+                style.append('font-style="italic"')
+            text = html.escape(text, quote=False)
+            spans.append(f"<tspan {' '.join(style)}>{text}</tspan>" if style else text)
+        out.append(
+            f'<text text-anchor="middle" x="{x:.2f}" y="{baseline:.2f}" font-family="{FONT_FAMILY}" '
+            f'font-size="{FONT_SIZE:.2f}" fill="{color}" xml:space="preserve">{"".join(spans)}</text>'
+        )
+    return out
+
+
+def _clip(shape: str, w: float, h: float, ux: float, uy: float) -> float:
+    """the distance from the centre of a node to its outline, in the direction of the unit vector (ux, uy)"""
+    if shape in ("ellipse", "oval", "circle", "diamond"):
+        return 1 / math.sqrt((ux / (w / 2)) ** 2 + (uy / (h / 2)) ** 2)
+    return min(w / 2 / abs(ux) if ux else math.inf, h / 2 / abs(uy) if uy else math.inf)
+
+
+def _small_text(text: str, x: float, y: float, color: str) -> str:
+    return (
+        f'<text text-anchor="middle" x="{x:.2f}" y="{y:.2f}" font-family="{FONT_FAMILY}" '
+        f'font-size="{FONT_SIZE:.2f}" fill="{color}">{html.escape(text, quote=False)}</text>'
+    )
+
+
+def to_svg(
+    recorder: Recorder,
+    positions: dict[str, tuple[float, float]],
+    sizes: dict[str, tuple[float, float]],
+) -> str:
+    """
+    draw a laid out graph as SVG. edges are straight lines between the node outlines, drawn without arrowheads, with
+    their `label` at the middle and their `headlabel` and `taillabel` next to each end
+    """
+    if positions:
+        min_x = min(x - sizes[n][0] / 2 for n, (x, _) in positions.items())
+        max_x = max(x + sizes[n][0] / 2 for n, (x, _) in positions.items())
+        min_y = min(y - sizes[n][1] / 2 for n, (_, y) in positions.items())
+        max_y = max(y + sizes[n][1] / 2 for n, (_, y) in positions.items())
+    else:
+        min_x = max_x = min_y = max_y = 0.0
+    width = max_x - min_x + 2 * MARGIN
+    height = max_y - min_y + 2 * MARGIN
+
+    shapes = {name: attrs.get("shape", "ellipse") for name, _, attrs in recorder.nodes}
+
+    def point(name: str) -> tuple[float, float]:
+        # flip y, SVG's y points down
+        x, y = positions[name]
+        return x - min_x + MARGIN, max_y - y + MARGIN
+
+    out = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="no"?>',
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}pt" height="{height:.0f}pt" '
+        f'viewBox="0.00 0.00 {width:.2f} {height:.2f}">',
+        f'<g id="graph0" class="graph"><title>{html.escape(recorder.name or "")}</title>',
+        f'<rect fill="white" stroke="none" x="0" y="0" width="{width:.2f}" height="{height:.2f}"/>',
+    ]
+
+    # edges first, so the nodes are drawn over their ends
+    for i, (tail, head, label, attrs) in enumerate(recorder.edges):
+        if "invis" in attrs.get("style", ""):
+            continue
+        (x1, y1), (x2, y2) = point(tail), point(head)
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy) or 1.0
+        ux, uy = dx / length, dy / length
+        # "a:invis:b" is a double line
+        colors = [c for c in attrs.get("color", "black").split(":") if c != "invis"]
+        fontcolor = attrs.get("fontcolor", "black")
+        out.append(f'<g id="edge{i + 1}" class="edge"><title>{html.escape(tail)}&#45;&#45;{html.escape(head)}</title>')
+        offsets = [0.0] if len(colors) == 1 else [-PERIPHERY_GAP / 2, PERIPHERY_GAP / 2]
+        for color, offset in zip(colors, offsets):
+            ox, oy = -uy * offset, ux * offset
+            out.append(
+                f'<path fill="none" {_style(attrs, color)} '
+                f'd="M{x1 + ox:.2f},{y1 + oy:.2f} L{x2 + ox:.2f},{y2 + oy:.2f}"/>'
+            )
+        if label:
+            out.append(_small_text(label, (x1 + x2) / 2 - uy * 8, (y1 + y2) / 2 + ux * 8, fontcolor))
+        distance = 10 * float(attrs.get("labeldistance", "1"))
+        for text, name, (x, y), sign in (
+            (attrs.get("headlabel"), head, (x2, y2), -1),
+            (attrs.get("taillabel"), tail, (x1, y1), 1),
+        ):
+            if not text:
+                continue
+            w, h = sizes[name]
+            reach = _clip(shapes[name], w, h, ux, uy) + distance
+            out.append(_small_text(text, x + sign * ux * reach - uy * 8, y + sign * uy * reach + ux * 8, fontcolor))
+        out.append("</g>")
+
+    for i, (name, label, attrs) in enumerate(recorder.nodes):
+        if "invis" in attrs.get("style", ""):
+            continue
+        x, y = point(name)
+        w, h = sizes[name]
+        shape = shapes[name]
+        color = attrs.get("color", "black")
+        out.append(f'<g id="node{i + 1}" class="node"><title>{html.escape(name)}</title>')
+        lines = parse_label(label, name)
+        # the HTML-like tables of the table styles draw their own border
+        bordered = shape != "plain" or (label is not None and "<TABLE" in label)
+        if bordered:
+            out.append(f'{_outline(shape, x, y, w, h)} fill="white" {_style(attrs, color)}/>')
+            if attrs.get("peripheries") == "2":
+                inner = 2 * PERIPHERY_GAP
+                out.append(f'{_outline(shape, x, y, w - inner, h - inner)} fill="none" {_style(attrs, color)}/>')
+        out.extend(_text(lines, x, y, attrs.get("fontcolor", "black")))
+        out.append("</g>")
+
+    out.append("</g>")
+    out.append("</svg>")
+    return "\n".join(out) + "\n"
+
+
+def render(recorder: Recorder, format: str = "svg") -> tuple[bytes, dict[str, tuple[float, float]]]:
+    """
+    lay out and draw a recorded graph in this process, without graphviz
+
+    :return: the SVG bytes, and the position of each node in points like graphviz's "pos" attribute
+    """
+    if format != "svg":
+        raise ValueError(f"The {BUILTIN_ENGINE} engine can only render svg, not {format!r}")
+    positions, sizes = layout(recorder)
+    return to_svg(recorder, positions, sizes).encode("utf-8"), positions
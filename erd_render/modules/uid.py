@@ -1,12 +1,31 @@
-prefix_counter = {}
-
-
-def new(prefix=None):
-    """generate a unique string for the current session. an optional prefix can be provided."""
-    count = prefix_counter.get(prefix, 0)
-    count += 1
-    prefix_counter[prefix] = count
-    if prefix is not None:
-        return f"{prefix}-{count}"
-    else:
-        return f"{count}"
+class UidAllocator:
+    """
+    generates unique node ids for a single graph.
+
+    ids are derived from a path given by the caller (e.g. `E/Staff/name`), so the same model always produces the same
+    ids no matter what was rendered before. duplicate paths get a `~2`, `~3`, ... suffix in the order they are created.
+    """
+
+    def __init__(self):
+        self.counts: dict[str, int] = {}
+        self.used: set[str] = set()
+
+    def new(self, path: str = None) -> str:
+        """generate a unique id from the given path. without a path, the id is a running number."""
+        # ":" separates node ports in graphviz edges, so it cannot appear in an id
+        path = "" if path is None else path.replace(":", ".")
+
+        while True:
+            count = self.counts.get(path, 0) + 1
+            self.counts[path] = count
+            if not path:
+                node_id = f"{count}"
+            elif count == 1:
+                node_id = path
+            else:
+                node_id = f"{path}~{count}"
+
+            # a path may itself look like a generated id, e.g. "Staff~2"
+            if node_id not in self.used:
+                self.used.add(node_id)
+                return node_id
@@ -0,0 +1,179 @@
+import json
+import os
+import pickle
+from typing import Sequence, Union
+
+from erd_render.modules.obj import ATTR, COUNT, Attribute, Entity, EntityInfo, Relation
+
+# bump this when the format changes, files of other versions are then rejected instead of misread
+MODEL_VERSION = 1
+MODEL_FORMAT = "erd-render-model"
+
+# file extension -> serialization format
+_FORMATS = {
+    ".json": "json",
+    ".pickle": "pickle",
+    ".pkl": "pickle",
+    ".msgpack": "msgpack",
+}
+
+
+def to_dict(entities: Sequence[Entity], relations: Sequence[Relation]) -> dict:
+    """
+    convert a model to plain lists, dicts, strings and numbers, ready to be written as JSON.
+
+    every distinct attribute is stored once in a table, children before their parents, and referred to by its index.
+    attributes are immutable and often shared (e.g. by the memoized parser), so this keeps the output small and the
+    sharing survives a round trip
+
+    :param entities: the entities of the model. every entity that is part of a relation must appear here
+    """
+    attributes = []
+    attr_index: dict[Attribute, int] = {}
+
+    def add(attr: Attribute) -> int:
+        # iterative post-order, so deep composite attributes don't hit the recursion limit
+        stack = [(attr, False)]
+        while stack:
+            a, children_done = stack.pop()
+            if a in attr_index:
+                continue
+            if not children_done:
+                stack.append((a, True))
+                stack.extend((sub, False) for sub in reversed(a.subattrs) if sub not in attr_index)
+                continue
+            row = [a.name, a.type.name]
+            if a.subattrs:
+                row.append([attr_index[sub] for sub in a.subattrs])
+            attr_index[a] = len(attributes)
+            attributes.append(row)
+        return attr_index[attr]
+
+    entity_index = {}
+    entity_rows = []
+    for i, entity in enumerate(entities):
+        entity_index[entity] = i
+        entity_rows.append({"name": entity.name, "attrs": [add(a) for a in entity.attrs]})
+
+    relation_rows = []
+    for rel in relations:
+        infos = []
+        for e_info in rel.entity_infos:
+            if e_info.entity not in entity_index:
+                raise ValueError(f"Entity {e_info.entity.name!r} of relation {rel.name!r} is not in the entities")
+            infos.append([entity_index[e_info.entity], _dump_count(e_info.count), e_info.role])
+        row = {"name": rel.name, "entities": infos, "attrs": [add(a) for a in rel.attrs]}
+        if rel.is_identifying:
+            row["identifying"] = True
+        relation_rows.append(row)
+
+    return {
+        "format": MODEL_FORMAT,
+        "version": MODEL_VERSION,
+        "attributes": attributes,
+        "entities": entity_rows,
+        "relations": relation_rows,
+    }
+
+
+def from_dict(data: dict) -> tuple[list[Entity], list[Relation]]:
+    """
+    rebuild a model converted by `to_dict`
+
+    :return: the entities and relations of the model
+    """
+    if not isinstance(data, dict) or data.get("format") != MODEL_FORMAT:
+        raise ValueError("Not a serialized model")
+    if data.get("version") != MODEL_VERSION:
+        raise ValueError(f"Unsupported model version {data.get('version')!r}, expected {MODEL_VERSION}")
+
+    types = ATTR.__members__
+    attrs: list[Attribute] = []
+    for row in data["attributes"]:
+        components = [attrs[i] for i in row[2]] if len(row) > 2 else None
+        attrs.append(Attribute(row[0], type=types[row[1]], components=components))
+
+    entities = [Entity(row["name"], attributes=[attrs[i] for i in row["attrs"]]) for row in data["entities"]]
+
+    rows = []
+    for row in data["relations"]:
+        infos = [EntityInfo(entities[i], count=_load_count(count), role=role) for i, count, role in row["entities"]]
+        rows.append((infos, row["name"], row.get("identifying", False), [attrs[i] for i in row["attrs"]]))
+    return entities, Relation.from_rows(rows)
+
+
+def _dump_count(count: Union[COUNT, int, None]) -> Union[str, int, None]:
+    return count.name if isinstance(count, COUNT) else count
+
+
+def _load_count(count: Union[str, int, None]) -> Union[COUNT, int, None]:
+    return COUNT[count] if isinstance(count, str) else count
+
+
+def dumps(entities: Sequence[Entity], relations: Sequence[Relation], format="json") -> bytes:
+    """
+    serialize a model to bytes
+
+    :param format: "json", "pickle" (protocol 5) or "msgpack" (needs the `msgpack` package)
+    """
+    data = to_dict(entities, relations)
+    if format == "json":
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if format == "pickle":
+        return pickle.dumps(data, protocol=5)
+    if format == "msgpack":
+        return _msgpack().packb(data)
+    raise ValueError(f"Unknown format {format!r}")
+
+
+def loads(data: bytes, format="json") -> tuple[list[Entity], list[Relation]]:
+    """
+    deserialize a model serialized by `dumps`. only load pickles from trusted sources, unpickling can run code
+
+    :return: the entities and relations of the model
+    """
+    if format == "json":
+        return from_dict(json.loads(data))
+    if format == "pickle":
+        return from_dict(pickle.loads(data))
+    if format == "msgpack":
+        return from_dict(_msgpack().unpackb(data, strict_map_key=False))
+    raise ValueError(f"Unknown format {format!r}")
+
+
+def save(entities: Sequence[Entity], relations: Sequence[Relation], path: str, format: str = None):
+    """
+    write a model to a file
+
+    :param format: see `dumps`, defaults to the one of the file extension (.json, .pickle, .pkl or .msgpack)
+    """
+    data = dumps(entities, relations, format=format or _guess_format(path))
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def load(path: str, format: str = None) -> tuple[list[Entity], list[Relation]]:
+    """
+    read a model written by `save`
+
+    :param format: see `dumps`, defaults to the one of the file extension (.json, .pickle, .pkl or .msgpack)
+    :return: the entities and relations of the model
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    return loads(data, format=format or _guess_format(path))
+
+
+def _guess_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in _FORMATS:
+        raise ValueError(f"Cannot tell the format of {path!r}, give it explicitly")
+    return _FORMATS[ext]
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError as e:
+        raise ImportError("The msgpack format needs the `msgpack` package: pip install erd_render[msgpack]") from e
+    return msgpack
@@ -1,55 +1,61 @@
-from typing import Sequence, Union
+import asyncio
+from functools import lru_cache
+from typing import Callable, Collection, Sequence, Union
 
+from erd_render.modules.cache import RenderCache
+from erd_render.modules.layout import Layout
 from erd_render.modules.obj import Entity, Relation, COUNT, Attribute, ATTR
-from erd_render.modules.render import ObjGraph
+from erd_render.modules.pool import EnginePool
+from erd_render.modules.render import ObjGraph, RenderStats
+from erd_render.style import common
+from erd_render.style.common import (
+    attribute_path,
+    entity_path,
+    guess_total_participation,
+    new_graph,
+    relation_path,
+    select_engine,
+    walk_attributes,
+)
 
 
-def render(
+def build(
     entities: Sequence[Entity],
     relations: Sequence[Relation],
-    filename=None,
-    format="pdf",
     k=0.3,
     repulsive_force=1.0,
     overlap_scaling=-4,
     use_neato=False,
-):
+    layout: Layout = None,
+    stubs: Collection[Entity] = (),
+    engine: str = None,
+    file=None,
+) -> ObjGraph:
     """
-    render the given Entities and Relations to an ER diagram using Chan's notation, defaults to using the `sfdp` engine
+    build the graph of the given Entities and Relations using Chen's notation, without running the layout engine.
+    see `render` for a description of the parameters
 
-    :param entities: a list of Entities. all entities that are part of a relation must appear here
-    :param relations: a list of Relations
-    :param filename: the path to output the generated graphviz source and diagram
-    :param format: the output format, like "png" or "pdf"
-    :param k: spring constant for node placement: https://graphviz.org/docs/attrs/K/
-    :param repulsive_force: the repulsive force for node placement: https://graphviz.org/docs/attrs/repulsiveforce/
-    :param use_neato: use `neato` as the node placement engine instead of `sfdp`, this disables the parameters `k`
-           and `repulsive_force`
+    :param layout: the `Layout` of an earlier render, unchanged nodes are pinned to their earlier position
+    :param file: stream the source to this path, file object or `EngineProcess` as it is drawn, see `ObjGraph`
+    :return: an `ObjGraph` that is ready to be rendered
     """
-    if use_neato:
-        g = ObjGraph(
-            "graph",
-            engine="neato",
-            graph_attr=(("overlap", "false"),),
-        )
-    else:
-        g = ObjGraph(
-            "graph",
-            engine="sfdp",
-            graph_attr=(
-                ("overlap", "prism"),
-                ("overlap_scaling", str(overlap_scaling)),
-                ("K", str(k)),
-                ("repulsiveforce", str(repulsive_force)),
-            ),  # space out elements a bit
-        )
+    g = new_graph(
+        k=k,
+        repulsive_force=repulsive_force,
+        overlap_scaling=overlap_scaling,
+        use_neato=use_neato,
+        layout=layout,
+        engine=engine,
+        file=file,
+    )
     id_map = {}
+    stubs = set(stubs)
 
     # create the entities
     g.node_style(shape="box")
     for entity in entities:
         assert entity not in id_map
-        draw_entity(g, id_map, entity)
+        draw_entity(g, id_map, entity, stub=entity in stubs)
 
     # create the relations
     g.node_style(shape="diamond")
@@ -61,10 +67,210 @@ def render(
     attr_holders: Sequence[Union[Entity, Relation]] = [*entities, *relations]
     g.node_style(shape="oval")
     for obj in attr_holders:
+        if obj in stubs:
+            continue
         for attr in obj.attrs:
             draw_attribute(g, id_map, id_map[obj], attr)
 
-    g.render(filename=filename, format=format)
+    select_engine(g, engine)
+    return g
+
+
+def render(
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    filename=None,
+    format="pdf",
+    k=0.3,
+    repulsive_force=1.0,
+    overlap_scaling=-4,
+    use_neato=False,
+    cache: RenderCache = None,
+    layout_path: str = None,
+    stubs: Collection[Entity] = (),
+    stats: RenderStats = None,
+    engine: str = None,
+    time_budget: float = None,
+    streaming=False,
+    focus: Collection[Union[Entity, str]] = None,
+    depth: int = 1,
+    adjacency_index: dict[Entity, list[Relation]] = None,
+    pool: EnginePool = None,
+    check=True,
+):
+    """
+    render the given Entities and Relations to an ER diagram using Chan's notation, defaults to using the `sfdp` engine
+
+    :param entities: a list of Entities. all entities that are part of a relation must appear here
+    :param relations: a list of Relations
+    :param filename: the path to output the generated graphviz source and diagram
+    :param format: the output format, like "png" or "pdf"
+    :param k: spring constant for node placement: https://graphviz.org/docs/attrs/K/
+    :param repulsive_force: the repulsive force for node placement: https://graphviz.org/docs/attrs/repulsiveforce/
+    :param use_neato: use `neato` as the node placement engine instead of `sfdp`, this disables the parameters `k`
+           and `repulsive_force`
+    :param cache: a `RenderCache` to reuse diagrams that have been rendered before
+    :param layout_path: render incrementally, keeping the layout between renders in this file. nodes that are unchanged
+           since the last render stay in place and only new or changed nodes are placed by the engine. cannot be used
+           with `cache`
+    :param stubs: entities that are drawn compactly, with a dashed border and without their attributes. use this for
+           entities that only appear to show a relation to the rest of the schema. they must also appear in `entities`
+    :param stats: a `RenderStats` to fill in with the timings and size of this render
+    :param engine: the layout engine, overrides `use_neato`. "auto" chooses the engine and its settings from the size
+           of the graph. "builtin" lays out and draws the diagram in this process without graphviz, only to svg and
+           with `numpy` installed, see `erd_render.modules.svg`
+    :param time_budget: the number of seconds the layout may take. when it runs out, the engine is killed and the
+           diagram is laid out again with a fast `sfdp` configuration
+    :param streaming: write the source to its file as it is drawn, instead of building it in memory first. this uses
+           much less memory for very large diagrams
+    :param focus: only draw the part of the schema around these entities (or entity names), see `depth`
+    :param depth: with `focus`, the number of relations to follow from the focus entities. the entities that are
+           exactly `depth` relations away are drawn as stubs
+    :param adjacency_index: with `focus`, the `erd_render.modules.adjacency.adjacency` index of the schema. give it
+           when rendering many diagrams of the same schema, so it is not rebuilt every time
+    :param pool: an `EnginePool` of warm workers to run the layout engine in, instead of starting it for this render
+    :param check: check the model with `erd_render.validation.validate` before drawing it, raising `ModelError` with
+           every problem found. with `focus`, only the extracted neighbourhood is checked. pass False to skip the pass
+           for models that have already been checked
+    :return: the path of the rendered diagram
+    """
+    return common.render(
+        build,
+        entities,
+        relations,
+        filename=filename,
+        format=format,
+        k=k,
+        repulsive_force=repulsive_force,
+        overlap_scaling=overlap_scaling,
+        use_neato=use_neato,
+        cache=cache,
+        layout_path=layout_path,
+        stubs=stubs,
+        stats=stats,
+        engine=engine,
+        time_budget=time_budget,
+        streaming=streaming,
+        focus=focus,
+        depth=depth,
+        adjacency_index=adjacency_index,
+        pool=pool,
+        check=check,
+    )
+
+
+def pipe(
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    format="pdf",
+    k=0.3,
+    repulsive_force=1.0,
+    overlap_scaling=-4,
+    use_neato=False,
+    cache: RenderCache = None,
+    stats: RenderStats = None,
+    engine: str = None,
+    time_budget: float = None,
+    streaming=False,
+    focus: Collection[Union[Entity, str]] = None,
+    depth: int = 1,
+    adjacency_index: dict[Entity, list[Relation]] = None,
+    pool: EnginePool = None,
+    check=True,
+) -> bytes:
+    """
+    render the given Entities and Relations then return the rendered bytes. the source is piped into the layout engine,
+    so nothing is written to disk (except to the `cache`, if given). see `render` for a description of the parameters
+
+    :param streaming: write the source straight into the engine as it is drawn, instead of building it in memory first.
+           when the engine is not known up front (with `engine="auto"`), or may be run more than once (with `cache` or
+           `time_budget`), the source is streamed to a temporary file instead
+    """
+    return common.pipe(
+        build,
+        entities,
+        relations,
+        format=format,
+        k=k,
+        repulsive_force=repulsive_force,
+        overlap_scaling=overlap_scaling,
+        use_neato=use_neato,
+        cache=cache,
+        stats=stats,
+        engine=engine,
+        time_budget=time_budget,
+        streaming=streaming,
+        focus=focus,
+        depth=depth,
+        adjacency_index=adjacency_index,
+        pool=pool,
+        check=check,
+    )
+
+
+async def render_async(
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    format="pdf",
+    k=0.3,
+    repulsive_force=1.0,
+    overlap_scaling=-4,
+    use_neato=False,
+    timeout: float = None,
+    semaphore: asyncio.Semaphore = None,
+    engine: str = None,
+    pool: EnginePool = None,
+    check=True,
+) -> bytes:
+    """
+    render the given Entities and Relations without blocking the event loop, then return the rendered bytes.
+    nothing is written to disk. see `render` for a description of the other parameters
+
+    :param timeout: the number of seconds to wait for the layout engine before killing it and raising `TimeoutError`
+    :param semaphore: limits how many layout engines run at once, see `ObjGraph.pipe_async`
+    """
+    return await common.render_async(
+        build,
+        entities,
+        relations,
+        format=format,
+        k=k,
+        repulsive_force=repulsive_force,
+        overlap_scaling=overlap_scaling,
+        use_neato=use_neato,
+        timeout=timeout,
+        semaphore=semaphore,
+        engine=engine,
+        pool=pool,
+        check=check,
+    )
+
+
+# the size of the memo of weak key labels, one entry per distinct attribute name
+LABEL_CACHE_SIZE = 4096
+
+
+def _key_label(name: str) -> str:
+    # add a underline to the label
+    return f"<<U>{name}</U>>"
+
+
+@lru_cache(maxsize=LABEL_CACHE_SIZE)
+def _weak_key_label(name: str) -> str:
+    # there is no dotted underline in graphviz
+    # we can only underline every other letter
+    return "<" + "".join(f"<U>{letter}</U>" if i % 2 == 0 else letter for i, letter in enumerate(name)) + ">"
+
+
+# how each type of attribute is drawn: a function that makes the label from the name (None to use the name as is), and
+# the node attributes. the node attributes are shared, so they must not be modified
+ATTR_STYLES: dict[ATTR, tuple[Union[Callable[[str], str], None], dict[str, str]]] = {
+    ATTR.NORMAL: (None, {}),
+    ATTR.KEY_ATTRIBUTE: (_key_label, {}),
+    ATTR.WEAK_KEY_ATTRIBUTE: (_weak_key_label, {}),
+    ATTR.DERIVED: (None, {"style": "dashed"}),
+    ATTR.MULTIVALUE: (None, {"peripheries": "2"}),
+}
 
 
 def draw_attribute(
@@ -73,35 +279,20 @@ def draw_attribute(
     parent_id: str,
     attr: Attribute,
 ):
-    label = attr.name
-    kwargs = {}
-    if attr.type == ATTR.KEY_ATTRIBUTE:
-        # add a underline to the label
-        label = f"<<U>{label}</U>>"
-    elif attr.type == ATTR.WEAK_KEY_ATTRIBUTE:
-        # there is no dotted underline in graphviz
-        # we can only underline every other letter
-        is_even = True
-        label_parts = []
-        for letter in label:
-            if is_even:
-                label_parts.append(f"<U>{letter}</U>")
-            else:
-                label_parts.append(letter)
-            is_even = not is_even
-        label = "".join(label_parts)
-        label = f"<{label}>"
-    elif attr.type == ATTR.DERIVED:
-        kwargs["style"] = "dashed"
-    elif attr.type == ATTR.MULTIVALUE:
-        kwargs["peripheries"] = "2"
-
-    a_id = graph.node(label, **kwargs)
-    graph.edge(a_id, parent_id)
-    id_map[attr] = a_id
+    """draw an attribute and its subattributes, see `walk_attributes`"""
+    node = graph.node
+    edge = graph.edge
+    # the id of the node at each depth on the way down to the current attribute
+    parents = [parent_id]
+    for depth, attr in walk_attributes((attr,)):
+        del parents[depth + 1 :]
+        make_label, kwargs = ATTR_STYLES[attr.type]
+        label = attr.name if make_label is None else make_label(attr.name)
 
-    for subattr in attr.subattrs:
-        draw_attribute(graph, id_map, a_id, subattr)
+        a_id = node(label, path=attribute_path(parents[depth], attr), **kwargs)
+        edge(a_id, parents[depth])
+        id_map[attr] = a_id
+        parents.append(a_id)
 
 
 def prev_letter(letter: str):
@@ -115,13 +306,18 @@ def prev_letter(letter: str):
 
 
 def draw_relation(
-    graph: ObjGraph, id_map: dict[Union[Entity, Relation], str], rel: Relation
+    graph: ObjGraph,
+    id_map: dict[Union[Entity, Relation], str],
+    rel: Relation,
+    color: str = None,
 ):
     # always draw a diamond no matter what
+    path = relation_path(rel)
+    kwargs = {} if color is None else {"color": color, "fontcolor": color}
     if rel.is_identifying:
-        rid = graph.node(rel.name, peripheries="2")
+        rid = graph.node(rel.name, path=path, peripheries="2", **kwargs)
     else:
-        rid = graph.node(rel.name)
+        rid = graph.node(rel.name, path=path, **kwargs)
 
     # guess total participation
     total_parti_map = guess_total_participation(rel)
@@ -146,7 +342,10 @@ def draw_relation(
         # get role of this entity
         role = e_info.role
         # if total participation, then draw a double line
-        color = "black:invis:black" if total_parti_map[e_info] else None
+        if total_parti_map[e_info]:
+            edge_color = f"{color or 'black'}:invis:{color or 'black'}"
+        else:
+            edge_color = color
 
         eid = id_map[e_info.entity]
         graph.edge(
@@ -155,33 +354,25 @@ def draw_relation(
             headlabel=count,
             labeldistance="1.5",
             label=role,
-            color=color,
+            color=edge_color,
+            fontcolor=color,
         )
 
     id_map[rel] = rid
 
 
-def guess_total_participation(rel):
-    # guess which entity types require total participation
-    total_parti_map = dict((x, True) for x in rel.entity_infos)
-    for e_info in rel.entity_infos:
-        # if this entity count's min value is 0,
-        # then all other entities will be single lines (i.e. total participation = False)
-        if e_info.count not in (None, 0, COUNT.ZERO_OR_ONE, COUNT.ANY):
-            continue
-
-        for x in total_parti_map:
-            if x == e_info:
-                continue
-            total_parti_map[x] = False
-    return total_parti_map
-
-
 def draw_entity(
-    graph: ObjGraph, id_map: dict[Union[Entity, Relation], str], entity: Entity
+    graph: ObjGraph,
+    id_map: dict[Union[Entity, Relation], str],
+    entity: Entity,
+    stub=False,
+    color: str = None,
 ):
+    path = entity_path(entity)
+    kwargs = {} if color is None else {"color": color, "fontcolor": color}
     if entity.is_weak():
         # draw double boxes
-        id_map[entity] = graph.node(entity.name, peripheries="2")
-    else:
-        id_map[entity] = graph.node(entity.name)
+        kwargs["peripheries"] = "2"
+    if stub:
+        kwargs["style"] = "dashed"
+    id_map[entity] = graph.node(entity.name, path=path, **kwargs)
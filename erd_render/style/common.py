@@ -0,0 +1,414 @@
+import asyncio
+import html
+from abc import ABC, abstractmethod
+import os
+import tempfile
+from typing import Callable, Collection, Iterator, Sequence, Union
+
+from erd_render.modules.adjacency import neighbourhood
+from erd_render.modules.cache import RenderCache
+from erd_render.modules.engines import auto_engine, fast_engine, run_with_budget
+from erd_render.modules.layout import Layout
+from erd_render.modules.obj import COUNT, Attribute, Entity, EntityInfo, Relation
+from erd_render.modules.pool import EnginePool
+from erd_render.modules.render import EngineProcess, ObjGraph, RenderStats, engine_command
+from erd_render.modules.svg import BUILTIN_ENGINE
+from erd_render.validation import validate
+
+# build(entities, relations, k=..., repulsive_force=..., overlap_scaling=..., use_neato=..., layout=..., stubs=...,
+#       engine=..., file=...) -> ObjGraph
+BuildFunction = Callable[..., ObjGraph]
+
+
+def new_graph(
+    k=0.3,
+    repulsive_force=1.0,
+    overlap_scaling=-4,
+    use_neato=False,
+    layout: Layout = None,
+    engine: str = None,
+    file=None,
+) -> ObjGraph:
+    """
+    create an empty graph with the layout engine and its settings. when `engine` is "auto", call `select_engine`
+    once the graph has been drawn. see `erd_render.style.chen.render` for a description of the parameters
+    """
+    if engine is None:
+        engine = "neato" if use_neato else "sfdp"
+    # `sfdp` ignores pinned nodes, `fdp` honours them
+    pinned = layout is not None and len(layout) > 0
+    # pinned positions are in points, like graphviz's own output
+    pin_attr = (("inputscale", "72"),) if pinned else ()
+    if engine == "neato":
+        return ObjGraph(
+            "graph",
+            engine="neato",
+            graph_attr=(("overlap", "false"), *pin_attr),
+            layout=layout,
+            file=file,
+        )
+
+    if engine == "auto":
+        # chosen once the size of the graph is known
+        initial_engine = "sfdp"
+    elif engine == "sfdp" and pinned:
+        initial_engine = "fdp"
+    else:
+        initial_engine = engine
+    return ObjGraph(
+        "graph",
+        engine=initial_engine,
+        graph_attr=(
+            ("overlap", "prism"),
+            ("overlap_scaling", str(overlap_scaling)),
+            ("K", str(k)),
+            ("repulsiveforce", str(repulsive_force)),
+            *pin_attr,
+        ),  # space out elements a bit
+        layout=layout,
+        file=file,
+    )
+
+
+def _is_pinned(g: ObjGraph) -> bool:
+    return g.layout is not None and len(g.layout) > 0
+
+
+def select_engine(g: ObjGraph, engine: Union[str, None]):
+    """when `engine` is "auto", choose the layout engine of a drawn graph from its size"""
+    if engine != "auto":
+        return
+    pinned = _is_pinned(g)
+    engine, graph_attr = auto_engine(g.node_count, g.edge_count, pinned=pinned)
+    if pinned:
+        graph_attr["inputscale"] = g.graph_attr["inputscale"]
+    g.set_engine(engine, graph_attr)
+
+
+def _attempts(g: ObjGraph, time_budget: Union[float, None]) -> list[tuple[str, dict[str, str]]]:
+    """the engine configurations to try: the graph's own, then a faster one if there is a time budget"""
+    attempts = [(g.engine, dict(g.graph_attr))]
+    if time_budget is not None:
+        pinned = _is_pinned(g)
+        engine, graph_attr = fast_engine(pinned=pinned)
+        if pinned:
+            graph_attr["inputscale"] = g.graph_attr["inputscale"]
+        attempts.append((engine, graph_attr))
+    return attempts
+
+
+# ids: every node id is derived from its place in the model, so the same model always gives the same source
+
+
+def entity_path(entity: Entity) -> str:
+    return f"E/{entity.name}"
+
+
+def relation_path(rel: Relation) -> str:
+    return f"R/{rel.name or ''}"
+
+
+def attribute_path(parent_id: str, attr: Attribute) -> str:
+    return f"{parent_id}/{attr.name}"
+
+
+# walking the model
+
+
+def walk_attributes(attrs: Sequence[Attribute]) -> Iterator[tuple[int, Attribute]]:
+    """
+    yield every attribute and subattribute in pre-order, with its depth (0 for the given attributes). this uses a stack
+    instead of recursion, so attributes can be nested arbitrarily deep
+    """
+    stack = [(0, attr) for attr in reversed(attrs)]
+    while stack:
+        depth, attr = stack.pop()
+        yield depth, attr
+        # reversed, so the first subattribute comes first
+        subattrs = attr.subattrs
+        for i in range(len(subattrs) - 1, -1, -1):
+            stack.append((depth + 1, subattrs[i]))
+
+
+def guess_total_participation(rel: Relation) -> dict[EntityInfo, bool]:
+    # guess which entity types require total participation
+    total_parti_map = dict((x, True) for x in rel.entity_infos)
+    for e_info in rel.entity_infos:
+        # if this entity count's min value is 0,
+        # then all other entities will be single lines (i.e. total participation = False)
+        if e_info.count not in (None, 0, COUNT.ZERO_OR_ONE, COUNT.ANY):
+            continue
+
+        for x in total_parti_map:
+            if x == e_info:
+                continue
+            total_parti_map[x] = False
+    return total_parti_map
+
+
+def multiplicity(count: Union[COUNT, int, None]) -> Union[tuple[str, str], None]:
+    """the lower and upper bound of a count, "*" for no upper bound. None if the relation has no counts"""
+    if count is None:
+        return None
+    if count == COUNT.AT_LEAST_ONE:
+        return "1", "*"
+    if count == COUNT.ZERO_OR_ONE:
+        return "0", "1"
+    if count == COUNT.ANY:
+        return "0", "*"
+    if isinstance(count, COUNT):
+        raise NotImplementedError("Unknown COUNT value")
+    return str(count), str(count)
+
+
+def is_link(rel: Relation) -> bool:
+    """whether a relation can be drawn as a single edge: it connects 2 entities and has no attributes"""
+    return len(rel.entity_infos) == 2 and not rel.attrs
+
+
+def escape(text: Union[str, None]) -> str:
+    """escape text for an HTML-like label"""
+    return "" if text is None else html.escape(text, quote=True)
+
+
+def join_labels(*parts: Union[str, None]) -> Union[str, None]:
+    """join the parts of an edge label that are not empty with spaces, None if they are all empty"""
+    parts = [p for p in parts if p]
+    return " ".join(parts) if parts else None
+
+
+class TableStyle(ABC):
+    """
+    a notation that draws each entity as one HTML table node listing its attributes, e.g. crow's foot or UML. relations
+    between 2 entities without attributes become edges, other relations become nodes connected to their entities.
+    subclasses provide the labels and edge attributes, `build_tables` does the drawing
+    """
+
+    @abstractmethod
+    def entity_label(self, entity: Entity, stub: bool) -> str:
+        """the HTML-like label of an entity. stubs are drawn without their attributes"""
+
+    @abstractmethod
+    def relation_node(self, rel: Relation) -> tuple[str, dict[str, str]]:
+        """the label and node attributes of a relation that is not a link, see `is_link`"""
+
+    @abstractmethod
+    def link_edge(self, rel: Relation, tail: EntityInfo, head: EntityInfo) -> dict[str, str]:
+        """the attributes of the edge from `tail` to `head` of a relation that is a link"""
+
+    @abstractmethod
+    def member_edge(self, rel: Relation, e_info: EntityInfo) -> dict[str, str]:
+        """the attributes of the edge from a relation node to one of its entities"""
+
+
+def build_tables(
+    style: TableStyle,
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    k=0.3,
+    repulsive_force=1.0,
+    overlap_scaling=-4,
+    use_neato=False,
+    layout: Layout = None,
+    stubs: Collection[Entity] = (),
+    engine: str = None,
+    file=None,
+) -> ObjGraph:
+    """build the graph of a model in a `TableStyle`, see `erd_render.style.chen.build` for the parameters"""
+    g = new_graph(
+        k=k,
+        repulsive_force=repulsive_force,
+        overlap_scaling=overlap_scaling,
+        use_neato=use_neato,
+        layout=layout,
+        engine=engine,
+        file=file,
+    )
+    id_map = {}
+    stubs = set(stubs)
+
+    # the tables draw their own borders
+    g.node_style(shape="plain")
+    for entity in entities:
+        assert entity not in id_map
+        id_map[entity] = g.node(style.entity_label(entity, entity in stubs), path=entity_path(entity))
+
+    for rel in relations:
+        if is_link(rel):
+            tail, head = rel.entity_infos
+            g.edge(id_map[tail.entity], id_map[head.entity], **style.link_edge(rel, tail, head))
+            continue
+        label, kwargs = style.relation_node(rel)
+        rid = g.node(label, path=relation_path(rel), **kwargs)
+        for e_info in rel.entity_infos:
+            g.edge(rid, id_map[e_info.entity], **style.member_edge(rel, e_info))
+
+    select_engine(g, engine)
+    return g
+
+
+# the render pipeline
+
+
+def render(
+    build: BuildFunction,
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    filename=None,
+    format="pdf",
+    k=0.3,
+    repulsive_force=1.0,
+    overlap_scaling=-4,
+    use_neato=False,
+    cache: RenderCache = None,
+    layout_path: str = None,
+    stubs: Collection[Entity] = (),
+    stats: RenderStats = None,
+    engine: str = None,
+    time_budget: float = None,
+    streaming=False,
+    focus: Collection[Union[Entity, str]] = None,
+    depth: int = 1,
+    adjacency_index: dict[Entity, list[Relation]] = None,
+    pool: EnginePool = None,
+    check=True,
+) -> str:
+    """render a model with the `build` function of a style, see `erd_render.style.chen.render` for the parameters"""
+    if layout_path is not None and cache is not None:
+        raise ValueError("`cache` cannot be used with `layout_path`")
+    if stats is None:
+        stats = RenderStats()
+    if focus is not None:
+        with stats.measure("build"):
+            entities, relations, boundary = neighbourhood(entities, relations, focus, depth, index=adjacency_index)
+            stubs = [*stubs, *boundary]
+    # only the part that is drawn is checked, so a focused render of a huge model stays fast
+    if check:
+        with stats.measure("validate"):
+            validate(entities, relations)
+
+    with stats.measure("build"):
+        g = build(
+            entities,
+            relations,
+            k=k,
+            repulsive_force=repulsive_force,
+            overlap_scaling=overlap_scaling,
+            use_neato=use_neato,
+            layout=None if layout_path is None else Layout.load(layout_path),
+            stubs=stubs,
+            engine=engine,
+            # graphviz's default source path. the builtin engine keeps the graph in memory
+            file=(filename or "graph.gv") if streaming and engine != BUILTIN_ENGINE else None,
+        )
+        g.pool = pool
+
+    def attempt(engine: str, graph_attr: dict[str, str], timeout: Union[float, None]):
+        g.set_engine(engine, graph_attr)
+        if layout_path is None:
+            return g.render(filename=filename, format=format, cache=cache, stats=stats, timeout=timeout)
+        output, layout = g.render_layout(filename=filename, format=format, stats=stats, timeout=timeout)
+        layout.save(layout_path)
+        return output
+
+    return run_with_budget(_attempts(g, time_budget), time_budget, attempt)
+
+
+def pipe(
+    build: BuildFunction,
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    format="pdf",
+    k=0.3,
+    repulsive_force=1.0,
+    overlap_scaling=-4,
+    use_neato=False,
+    cache: RenderCache = None,
+    stats: RenderStats = None,
+    engine: str = None,
+    time_budget: float = None,
+    streaming=False,
+    focus: Collection[Union[Entity, str]] = None,
+    depth: int = 1,
+    adjacency_index: dict[Entity, list[Relation]] = None,
+    pool: EnginePool = None,
+    check=True,
+) -> bytes:
+    """render a model to bytes with the `build` function of a style, see `erd_render.style.chen.pipe`"""
+    if stats is None:
+        stats = RenderStats()
+    stubs = ()
+    if focus is not None:
+        with stats.measure("build"):
+            entities, relations, stubs = neighbourhood(entities, relations, focus, depth, index=adjacency_index)
+    if check:
+        with stats.measure("validate"):
+            validate(entities, relations)
+
+    def attempts(file):
+        with stats.measure("build"):
+            g = build(
+                entities,
+                relations,
+                stubs=stubs,
+                k=k,
+                repulsive_force=repulsive_force,
+                overlap_scaling=overlap_scaling,
+                use_neato=use_neato,
+                engine=engine,
+                file=file,
+            )
+            g.pool = pool
+
+        def attempt(engine: str, graph_attr: dict[str, str], timeout: Union[float, None]):
+            g.set_engine(engine, graph_attr)
+            return g.pipe(format=format, cache=cache, stats=stats, timeout=timeout)
+
+        return run_with_budget(_attempts(g, time_budget), time_budget, attempt)
+
+    if not streaming or engine == BUILTIN_ENGINE:
+        return attempts(None)
+
+    if engine != "auto" and cache is None and time_budget is None and pool is None:
+        process = EngineProcess(engine_command(engine or ("neato" if use_neato else "sfdp"), format))
+        try:
+            return attempts(process)
+        except BaseException:
+            if process.proc.returncode is None:
+                process.kill()
+            raise
+
+    with tempfile.TemporaryDirectory(prefix="erd-") as directory:
+        return attempts(os.path.join(directory, "graph.gv"))
+
+
+async def render_async(
+    build: BuildFunction,
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    format="pdf",
+    k=0.3,
+    repulsive_force=1.0,
+    overlap_scaling=-4,
+    use_neato=False,
+    timeout: float = None,
+    semaphore: asyncio.Semaphore = None,
+    engine: str = None,
+    pool: EnginePool = None,
+    check=True,
+) -> bytes:
+    """render a model without blocking the event loop, see `erd_render.style.chen.render_async`"""
+    if check:
+        validate(entities, relations)
+    g = await asyncio.to_thread(
+        build,
+        entities,
+        relations,
+        k=k,
+        repulsive_force=repulsive_force,
+        overlap_scaling=overlap_scaling,
+        use_neato=use_neato,
+        engine=engine,
+    )
+    g.pool = pool
+    return await g.pipe_async(format=format, timeout=timeout, semaphore=semaphore)
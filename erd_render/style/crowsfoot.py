@@ -0,0 +1,189 @@
+import asyncio
+from typing import Collection, Sequence, Union
+
+from erd_render.modules.cache import RenderCache
+from erd_render.modules.layout import Layout
+from erd_render.modules.obj import ATTR, Entity, EntityInfo, Relation
+from erd_render.modules.render import ObjGraph, RenderStats
+from erd_render.style import common
+from erd_render.style.common import TableStyle, build_tables, escape, join_labels, multiplicity, walk_attributes
+
+# the key column of each type of attribute
+_KEY_MARKERS = {
+    ATTR.KEY_ATTRIBUTE: "PK",
+    # part of the key, together with the key of the identifying entity
+    ATTR.WEAK_KEY_ATTRIBUTE: "(PK)",
+}
+
+
+def _attribute_name(attr) -> str:
+    name = escape(attr.name)
+    if attr.type == ATTR.MULTIVALUE:
+        return f"{name}[ ]"
+    if attr.type == ATTR.DERIVED:
+        return f"<I>{name}</I>"
+    return name
+
+
+def marker(count) -> str:
+    """
+    the crow's foot arrow shape for a count, e.g. "crowodot" for zero or more. graphviz draws the first shape of the
+    name against the node, so the maximum comes first and the minimum second
+    """
+    bounds = multiplicity(count)
+    if bounds is None:
+        return "none"
+    lower, upper = bounds
+    if upper == "0":
+        return "odot"
+    near = "tee" if upper == "1" else "crow"
+    far = "odot" if lower == "0" else "tee"
+    return near + far
+
+
+def _count_label(count) -> Union[str, None]:
+    # counts other than 0, 1 and many have no crow's foot shape, so they are written next to it
+    bounds = multiplicity(count)
+    if bounds is None or bounds[1] in ("0", "1", "*"):
+        return None
+    return bounds[1]
+
+
+class CrowsFootStyle(TableStyle):
+    """
+    crow's foot (information engineering) notation: each entity is a table of its attributes with the key attributes
+    marked "PK", weak entities have rounded corners. a relation between 2 entities is a line with the count of each
+    entity drawn at its end, solid if the relation is identifying and dashed otherwise. other relations are drawn as
+    associative entities
+    """
+
+    def entity_label(self, entity: Entity, stub: bool) -> str:
+        styles = []
+        if entity.is_weak():
+            styles.append("rounded")
+        if stub:
+            styles.append("dashed")
+        style = f' STYLE="{",".join(styles)}"' if styles else ""
+        rows = [f'<TR><TD COLSPAN="2" BGCOLOR="lightgrey"><B>{escape(entity.name)}</B></TD></TR>']
+        if not stub:
+            rows.extend(self.attribute_rows(entity.attrs))
+        return f'<<TABLE BORDER="1" CELLBORDER="0" CELLSPACING="0" CELLPADDING="4"{style}>{"".join(rows)}</TABLE>>'
+
+    def attribute_rows(self, attrs) -> list[str]:
+        rows = []
+        for depth, attr in walk_attributes(attrs):
+            key = _KEY_MARKERS.get(attr.type, "")
+            indent = "&nbsp;&nbsp;" * depth
+            rows.append(f'<TR><TD ALIGN="LEFT">{key}</TD><TD ALIGN="LEFT">{indent}{_attribute_name(attr)}</TD></TR>')
+        return rows
+
+    def relation_node(self, rel: Relation) -> tuple[str, dict[str, str]]:
+        style = "" if rel.is_identifying else ' STYLE="dashed"'
+        name = escape(rel.name or "")
+        rows = [f'<TR><TD COLSPAN="2"><I>{name}</I></TD></TR>', *self.attribute_rows(rel.attrs)]
+        return f'<<TABLE BORDER="1" CELLBORDER="0" CELLSPACING="0" CELLPADDING="4"{style}>{"".join(rows)}</TABLE>>', {}
+
+    def _line(self, rel: Relation) -> dict[str, str]:
+        return {} if rel.is_identifying else {"style": "dashed"}
+
+    def link_edge(self, rel: Relation, tail: EntityInfo, head: EntityInfo) -> dict[str, str]:
+        return {
+            "label": rel.name,
+            "dir": "both",
+            "arrowtail": marker(tail.count),
+            "arrowhead": marker(head.count),
+            "taillabel": join_labels(tail.role, _count_label(tail.count)),
+            "headlabel": join_labels(head.role, _count_label(head.count)),
+            **self._line(rel),
+        }
+
+    def member_edge(self, rel: Relation, e_info: EntityInfo) -> dict[str, str]:
+        return {
+            "arrowhead": marker(e_info.count),
+            "dir": "forward",
+            "headlabel": join_labels(e_info.role, _count_label(e_info.count)),
+            **self._line(rel),
+        }
+
+
+STYLE = CrowsFootStyle()
+
+
+def build(
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    k=0.3,
+    repulsive_force=1.0,
+    overlap_scaling=-4,
+    use_neato=False,
+    layout: Layout = None,
+    stubs: Collection[Entity] = (),
+    engine: str = None,
+    file=None,
+) -> ObjGraph:
+    """
+    build the graph of the given Entities and Relations using crow's foot notation, without running the layout engine.
+    see `erd_render.style.chen.build` for a description of the parameters
+    """
+    return build_tables(
+        STYLE,
+        entities,
+        relations,
+        k=k,
+        repulsive_force=repulsive_force,
+        overlap_scaling=overlap_scaling,
+        use_neato=use_neato,
+        layout=layout,
+        stubs=stubs,
+        engine=engine,
+        file=file,
+    )
+
+
+def render(
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    filename=None,
+    format="pdf",
+    cache: RenderCache = None,
+    stats: RenderStats = None,
+    **kwargs,
+) -> str:
+    """
+    render the given Entities and Relations to an ER diagram using crow's foot notation. each entity is a single node,
+    so this is much cheaper to lay out than Chen's notation for entities with many attributes.
+    takes the same parameters as `erd_render.style.chen.render`
+
+    :return: the path of the rendered diagram
+    """
+    return common.render(
+        build, entities, relations, filename=filename, format=format, cache=cache, stats=stats, **kwargs
+    )
+
+
+def pipe(
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    format="pdf",
+    cache: RenderCache = None,
+    stats: RenderStats = None,
+    **kwargs,
+) -> bytes:
+    """render the given Entities and Relations then return the rendered bytes, see `erd_render.style.chen.pipe`"""
+    return common.pipe(build, entities, relations, format=format, cache=cache, stats=stats, **kwargs)
+
+
+async def render_async(
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    format="pdf",
+    timeout: float = None,
+    semaphore: asyncio.Semaphore = None,
+    **kwargs,
+) -> bytes:
+    """
+    render the given Entities and Relations without blocking the event loop, see `erd_render.style.chen.render_async`
+    """
+    return await common.render_async(
+        build, entities, relations, format=format, timeout=timeout, semaphore=semaphore, **kwargs
+    )
@@ -0,0 +1,179 @@
+import asyncio
+from typing import Collection, Sequence, Union
+
+from erd_render.modules.cache import RenderCache
+from erd_render.modules.layout import Layout
+from erd_render.modules.obj import ATTR, Entity, EntityInfo, Relation
+from erd_render.modules.render import ObjGraph, RenderStats
+from erd_render.style import common
+from erd_render.style.common import TableStyle, build_tables, escape, join_labels, multiplicity, walk_attributes
+
+
+def _attribute_name(attr) -> str:
+    name = escape(attr.name)
+    if attr.type in (ATTR.KEY_ATTRIBUTE, ATTR.WEAK_KEY_ATTRIBUTE):
+        return f"{name} {{id}}"
+    if attr.type == ATTR.DERIVED:
+        return f"/{name}"
+    if attr.type == ATTR.MULTIVALUE:
+        return f"{name} [*]"
+    return name
+
+
+def range_label(count) -> Union[str, None]:
+    """the UML multiplicity of a count, e.g. "0..*" or "1" """
+    bounds = multiplicity(count)
+    if bounds is None:
+        return None
+    lower, upper = bounds
+    return lower if lower == upper else f"{lower}..{upper}"
+
+
+def _owner(rel: Relation) -> Union[EntityInfo, None]:
+    """the entity that identifies the weak entity of an identifying relation, where the composition diamond is drawn"""
+    if not rel.is_identifying:
+        return None
+    strong = [e_info for e_info in rel.entity_infos if not e_info.entity.is_weak()]
+    return strong[0] if len(strong) == 1 else None
+
+
+class UMLStyle(TableStyle):
+    """
+    UML class diagram notation: each entity is a class with its name and attributes in separate compartments, key
+    attributes are marked "{id}" and derived attributes start with "/". a relation between 2 entities is an association
+    with the multiplicity of each end, an identifying relation is a composition with the diamond at the identifying
+    entity. other relations are n-ary association diamonds, or association classes if they have attributes
+    """
+
+    def entity_label(self, entity: Entity, stub: bool) -> str:
+        name = f"<B>{escape(entity.name)}</B>"
+        if entity.is_weak():
+            name = f"&laquo;weak&raquo;<BR/>{name}"
+        style = ' STYLE="dashed"' if stub else ""
+        rows = [f"<TR><TD>{name}</TD></TR>"]
+        if not stub:
+            rows.append("<HR/>")
+            rows.append(f'<TR><TD ALIGN="LEFT" BALIGN="LEFT">{self.attribute_lines(entity.attrs)}</TD></TR>')
+        return f'<<TABLE BORDER="1" CELLBORDER="0" CELLSPACING="0" CELLPADDING="4"{style}>{"".join(rows)}</TABLE>>'
+
+    def attribute_lines(self, attrs) -> str:
+        lines = []
+        for depth, attr in walk_attributes(attrs):
+            lines.append("&nbsp;&nbsp;" * depth + _attribute_name(attr))
+        # an empty compartment still takes up a line
+        return "<BR/>".join(lines) or " "
+
+    def relation_node(self, rel: Relation) -> tuple[str, dict[str, str]]:
+        if not rel.attrs:
+            return "", {"shape": "diamond", "width": "0.3", "height": "0.3", "xlabel": rel.name}
+        rows = [
+            f"<TR><TD><B>{escape(rel.name)}</B></TD></TR>",
+            "<HR/>",
+            f'<TR><TD ALIGN="LEFT" BALIGN="LEFT">{self.attribute_lines(rel.attrs)}</TD></TR>',
+        ]
+        label = f'<<TABLE BORDER="1" CELLBORDER="0" CELLSPACING="0" CELLPADDING="4">{"".join(rows)}</TABLE>>'
+        return label, {}
+
+    def link_edge(self, rel: Relation, tail: EntityInfo, head: EntityInfo) -> dict[str, str]:
+        owner = _owner(rel)
+        return {
+            "label": rel.name,
+            "dir": "both",
+            "arrowtail": "diamond" if owner is tail else "none",
+            "arrowhead": "diamond" if owner is head else "none",
+            "taillabel": join_labels(tail.role, range_label(tail.count)),
+            "headlabel": join_labels(head.role, range_label(head.count)),
+        }
+
+    def member_edge(self, rel: Relation, e_info: EntityInfo) -> dict[str, str]:
+        owner = _owner(rel)
+        return {
+            "dir": "forward",
+            "arrowhead": "diamond" if owner is e_info else "none",
+            "headlabel": join_labels(e_info.role, range_label(e_info.count)),
+            # the line of an association class is dashed
+            "style": "dashed" if rel.attrs and len(rel.entity_infos) == 2 else None,
+        }
+
+
+STYLE = UMLStyle()
+
+
+def build(
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    k=0.3,
+    repulsive_force=1.0,
+    overlap_scaling=-4,
+    use_neato=False,
+    layout: Layout = None,
+    stubs: Collection[Entity] = (),
+    engine: str = None,
+    file=None,
+) -> ObjGraph:
+    """
+    build the graph of the given Entities and Relations as a UML class diagram, without running the layout engine.
+    see `erd_render.style.chen.build` for a description of the parameters
+    """
+    return build_tables(
+        STYLE,
+        entities,
+        relations,
+        k=k,
+        repulsive_force=repulsive_force,
+        overlap_scaling=overlap_scaling,
+        use_neato=use_neato,
+        layout=layout,
+        stubs=stubs,
+        engine=engine,
+        file=file,
+    )
+
+
+def render(
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    filename=None,
+    format="pdf",
+    cache: RenderCache = None,
+    stats: RenderStats = None,
+    **kwargs,
+) -> str:
+    """
+    render the given Entities and Relations to a UML class diagram. each entity is a single node, so this is much
+    cheaper to lay out than Chen's notation for entities with many attributes.
+    takes the same parameters as `erd_render.style.chen.render`
+
+    :return: the path of the rendered diagram
+    """
+    return common.render(
+        build, entities, relations, filename=filename, format=format, cache=cache, stats=stats, **kwargs
+    )
+
+
+def pipe(
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    format="pdf",
+    cache: RenderCache = None,
+    stats: RenderStats = None,
+    **kwargs,
+) -> bytes:
+    """render the given Entities and Relations then return the rendered bytes, see `erd_render.style.chen.pipe`"""
+    return common.pipe(build, entities, relations, format=format, cache=cache, stats=stats, **kwargs)
+
+
+async def render_async(
+    entities: Sequence[Entity],
+    relations: Sequence[Relation],
+    format="pdf",
+    timeout: float = None,
+    semaphore: asyncio.Semaphore = None,
+    **kwargs,
+) -> bytes:
+    """
+    render the given Entities and Relations without blocking the event loop, see `erd_render.style.chen.render_async`
+    """
+    return await common.render_async(
+        build, entities, relations, format=format, timeout=timeout, semaphore=semaphore, **kwargs
+    )
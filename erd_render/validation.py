@@ -0,0 +1,115 @@
+from typing import Sequence, Union
+
+from erd_render.modules.obj import COUNT, Entity, Relation
+
+
+class ModelError(ValueError):
+    """a model that cannot be rendered, `problems` lists everything that is wrong with it"""
+
+    def __init__(self, problems: Sequence[str]):
+        self.problems = list(problems)
+        super().__init__("Invalid model:\n" + "\n".join(f"- {p}" for p in self.problems))
+
+
+def _relation_label(i: int, rel: Relation) -> str:
+    return f"relation {i}" if rel.name is None else f"relation {i} ({rel.name!r})"
+
+
+def _entity_name(entity) -> str:
+    return entity.name if isinstance(entity, Entity) else repr(entity)
+
+
+def _count_problem(count) -> Union[str, None]:
+    """what is wrong with a count that is neither None nor a COUNT, if anything"""
+    # bool is an int, but True and False are never meant as counts
+    if count.__class__ is int:
+        return f"has the negative count {count}" if count < 0 else None
+    return f"has the count {count!r}, it must be a COUNT or an int"
+
+
+def problems(entities: Sequence[Entity], relations: Sequence[Relation], strict=False) -> list[str]:
+    """list everything that is wrong with a model, see `validate`"""
+    found = []
+
+    listed: set[Entity] = set()
+    # the listed entities in order, so the problems are always reported in the same order
+    ordered: list[Entity] = []
+    by_name: dict[str, int] = {}
+    for entity in entities:
+        if not isinstance(entity, Entity):
+            found.append(f"{entity!r} in `entities` is not an Entity")
+            continue
+        if entity in listed:
+            found.append(f"entity {entity.name!r} is listed more than once")
+            continue
+        listed.add(entity)
+        ordered.append(entity)
+        by_name[entity.name] = by_name.get(entity.name, 0) + 1
+    if len(by_name) < len(listed):
+        for name, count in by_name.items():
+            if count > 1:
+                found.append(f"{count} different entities are named {name!r}")
+
+    identified: set[Entity] = set()
+    for i, rel in enumerate(relations):
+        if not isinstance(rel, Relation):
+            found.append(f"{rel!r} in `relations` is not a Relation")
+            continue
+        e_infos = rel.entity_infos
+        if len(e_infos) < 2:
+            found.append(f"{_relation_label(i, rel)} has {len(e_infos)} entities, it needs at least 2")
+            if not e_infos:
+                continue
+
+        has_counts = e_infos[0].count is not None
+        mixed_counts = False
+        # a relation can refer to the same entity more than once, like a self-relation, which is reported once
+        missing = []
+        for e_info in e_infos:
+            entity = e_info.entity
+            count = e_info.count
+            if entity not in listed and entity not in missing:
+                missing.append(entity)
+                found.append(
+                    f"{_relation_label(i, rel)} refers to entity {_entity_name(entity)!r}, which is not in `entities`"
+                )
+            if count.__class__ is not COUNT and count is not None:
+                problem = _count_problem(count)
+                if problem is not None:
+                    found.append(f"{_relation_label(i, rel)}: entity {_entity_name(entity)!r} {problem}")
+            if (count is not None) != has_counts:
+                mixed_counts = True
+        if mixed_counts:
+            found.append(f"{_relation_label(i, rel)} gives a count for some of its entities but not all of them")
+        if strict and rel.is_identifying:
+            identified.update(e_info.entity for e_info in e_infos)
+
+    if not strict:
+        return found
+    for entity in ordered:
+        if entity.is_weak() and entity not in identified:
+            found.append(
+                f"entity {entity.name!r} is weak (it has no key attribute) but is not in any identifying relation"
+            )
+    return found
+
+
+def validate(entities: Sequence[Entity], relations: Sequence[Relation], strict=False):
+    """
+    check that a model can be rendered, in a single linear pass. every problem is collected and reported at once:
+
+    - entities and relations of the wrong type
+    - entities listed more than once, and different entities with the same name
+    - relations with fewer than 2 entities, or that refer to an entity missing from `entities`
+    - counts that are not a `COUNT` or a non-negative int, and relations that give a count for only some entities
+
+    the render functions call this before drawing, so a broken model fails in milliseconds instead of after a layout
+
+    :param strict: also report weak entities (without a key attribute) that are not in any identifying relation. they
+           are drawn fine, but are usually a mistake in a model written by hand
+
+    :raises ModelError: a ValueError listing every problem, also available as its `problems` attribute
+    """
+    found = problems(entities, relations, strict=strict)
+    if found:
+        raise ModelError(found)
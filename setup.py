@@ -8,6 +8,17 @@ setup(
     author="James Walker",
     author_email="james.chunho@gmail.com",
     license="MIT",
-    packages=["erd_render"],
+    packages=["erd_render", "erd_render.modules", "erd_render.style"],
+    extras_require={
+        # warm layout workers that call the graphviz library, see `EnginePool`
+        "pool": ["pygraphviz"],
+        # the builtin layout engine
+        "builtin": ["numpy"],
+        # saving models in the msgpack format
+        "msgpack": ["msgpack"],
+    },
+    entry_points={
+        "console_scripts": ["erd-render=erd_render.cli:main"],
+    },
     zip_safe=False,
 )
@@ -0,0 +1,196 @@
+import argparse
+import json
+import random
+import shutil
+import subprocess
+import sys
+import time
+from typing import Callable
+
+from erd_render.modules.helpers import clear_parse_cache, parse_attributes
+from erd_render.modules.obj import COUNT, Attribute, Entity, Relation
+from erd_render.modules.render import ObjGraph
+from erd_render.style.chen import build, draw_attribute, draw_entity, draw_relation
+
+# usage: python benchmark.py --sizes 10 100 1000 10000 --output bench.json
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+ENGINES = ("sfdp", "neato", "fdp")
+# neato is quadratic, so it is only run on small schemas
+ENGINE_LIMITS = {"sfdp": 1000, "neato": 200, "fdp": 500}
+COUNTS = (1, COUNT.ANY, COUNT.AT_LEAST_ONE, COUNT.ZERO_OR_ONE)
+# what a fresh interpreter runs for each import-time measurement. "python" is the start up cost of the interpreter
+IMPORT_STATEMENTS = {
+    "python": "pass",
+    "erd_render": "import erd_render",
+    "erd_render.Entity": "from erd_render import Entity, quick_entity",
+    "erd_render.render_chen": "from erd_render import render_chen",
+    "erd_render.cli": "import erd_render.cli",
+}
+
+
+def generate_definitions(n_entities: int, attrs_per_entity: int, rng: random.Random) -> list[list[str]]:
+    """attribute definition strings for each entity, with the repetition of a generated schema"""
+    common = ["*id", "name: first last", "created_at", "updated_at", "tags[]", "~age"]
+    definitions = []
+    for i in range(n_entities):
+        attrs = common[: min(len(common), attrs_per_entity)]
+        attrs += [f"col_{rng.randrange(50)}" for _ in range(attrs_per_entity - len(attrs))]
+        definitions.append(attrs)
+    return definitions
+
+
+def generate_attribute(name: str, depth: int, width: int) -> Attribute:
+    """a composite attribute `depth` levels deep, each level with `width` subattributes"""
+    if depth <= 0:
+        return Attribute(name)
+    return Attribute(name, components=[generate_attribute(f"{name}_{i}", depth - 1, width) for i in range(width)])
+
+
+def generate_model(
+    n_entities: int,
+    attrs_per_entity: int = 8,
+    depth: int = 1,
+    arity: int = 2,
+    seed: int = 0,
+) -> tuple[list[Entity], list[Relation]]:
+    """a random schema of `n_entities` entities with about as many relations, each connecting `arity` entities"""
+    rng = random.Random(seed)
+    entities = []
+    for i, definitions in enumerate(generate_definitions(n_entities, attrs_per_entity, rng)):
+        attrs = parse_attributes(definitions)
+        if depth > 1:
+            attrs.append(generate_attribute("address", depth, 2))
+        entities.append(Entity(f"Entity{i}", attributes=attrs))
+
+    rows = []
+    for i in range(n_entities if n_entities >= arity else 0):
+        members = rng.sample(entities, arity)
+        rows.append(([(e, rng.choice(COUNTS)) for e in members], f"rel{i}"))
+    return entities, Relation.from_rows(rows)
+
+
+def timed(fn: Callable, repeat: int):
+    """run `fn` `repeat` times, return the best wall time in seconds and the last result"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def draw_phases(entities: list[Entity], relations: list[Relation], repeat: int) -> dict[str, float]:
+    """time each group of draw_* calls that `build` makes"""
+
+    def run():
+        g = ObjGraph("graph", engine="sfdp")
+        id_map = {}
+        times = {}
+        start = time.perf_counter()
+        for entity in entities:
+            draw_entity(g, id_map, entity)
+        times["draw_entity"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for rel in relations:
+            draw_relation(g, id_map, rel)
+        times["draw_relation"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for obj in [*entities, *relations]:
+            for attr in obj.attrs:
+                draw_attribute(g, id_map, id_map[obj], attr)
+        times["draw_attribute"] = time.perf_counter() - start
+        return times
+
+    runs = [run() for _ in range(repeat)]
+    return {k: min(r[k] for r in runs) for k in runs[0]}
+
+
+def import_times(repeat: int) -> dict:
+    """
+    time each of `IMPORT_STATEMENTS` in a fresh interpreter, the cold start of a script or the command line. also
+    record which heavy modules a plain `import erd_render` loads, it should be none of them
+    """
+    timings = {}
+    for name, statement in IMPORT_STATEMENTS.items():
+        cmd = [sys.executable, "-c", statement]
+        timings[name], _ = timed(lambda: subprocess.run(cmd, check=True), repeat)
+    heavy = ("graphviz", "asyncio", "concurrent.futures", "numpy")
+    check = f"import sys, erd_render; print(','.join(m for m in {heavy!r} if m in sys.modules))"
+    loaded = subprocess.run([sys.executable, "-c", check], check=True, capture_output=True, text=True).stdout.strip()
+    return {"timings": timings, "loaded_by_import": loaded.split(",") if loaded else []}
+
+
+def benchmark(size: int, args) -> dict:
+    rng = random.Random(args.seed)
+    definitions = generate_definitions(size, args.attrs, rng)
+    flat_definitions = [d for defs in definitions for d in defs]
+
+    result = {
+        "entities": size,
+        "attributes_per_entity": args.attrs,
+        "depth": args.depth,
+        "arity": args.arity,
+        "timings": {},
+    }
+    timings = result["timings"]
+
+    # parsing is memoized, so time it with an empty memo then again with a warm one
+    clear_parse_cache()
+    timings["parse_attributes"], _ = timed(lambda: parse_attributes(flat_definitions), 1)
+    timings["parse_attributes_memoized"], _ = timed(lambda: parse_attributes(flat_definitions), args.repeat)
+    timings["model"], (entities, relations) = timed(
+        lambda: generate_model(size, args.attrs, args.depth, args.arity, args.seed), args.repeat
+    )
+    timings.update(draw_phases(entities, relations, args.repeat))
+    timings["build"], g = timed(lambda: build(entities, relations), args.repeat)
+    timings["dot_source"], source = timed(lambda: g.source, args.repeat)
+
+    result["nodes"] = g.node_count
+    result["edges"] = g.edge_count
+    result["dot_bytes"] = len(source.encode("utf-8"))
+
+    if shutil.which("dot") is None:
+        result["engines"] = "skipped, graphviz is not installed"
+        return result
+    for engine in args.engines:
+        if size > ENGINE_LIMITS.get(engine, 0) and not args.all_engines:
+            continue
+        g.graph.engine = engine
+        # the "plain" format is cheap to write, so this mostly measures the layout
+        timings[f"engine_{engine}"], _ = timed(lambda: g.pipe(format="plain"), 1)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="benchmark model construction, DOT generation and layout")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="numbers of entities")
+    parser.add_argument("--attrs", type=int, default=8, help="attributes per entity")
+    parser.add_argument("--depth", type=int, default=1, help="depth of composite attributes")
+    parser.add_argument("--arity", type=int, default=2, help="entities per relation")
+    parser.add_argument("--engines", nargs="+", default=ENGINES, help="graphviz engines to time")
+    parser.add_argument("--all-engines", action="store_true", help="run every engine on every size")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the best is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this file instead of stdout")
+    parser.add_argument("--import-only", action="store_true", help="only time the imports")
+    args = parser.parse_args(argv)
+
+    results = {
+        "python": sys.version.split()[0],
+        "import": import_times(max(args.repeat, 5)),
+        "results": [] if args.import_only else [benchmark(size, args) for size in args.sizes],
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+from erd_render.modules.helpers import quick_entity
+from erd_render.modules.obj import Relation
+
+
+def chain(names):
+    """entities related one after the other, A - B - C - ..."""
+    entities = [quick_entity(name, ["*id"]) for name in names]
+    relations = [Relation(a, b, name=f"{a.name}{b.name}") for a, b in zip(entities, entities[1:])]
+    return entities, relations
+
+
+def names(items):
+    return [item.name for item in items]
@@ -0,0 +1,53 @@
+import pytest
+
+from erd_render.modules.adjacency import adjacency, neighbourhood
+from erd_render.modules.obj import Relation
+
+from conftest import chain, names
+
+
+def test_adjacency():
+    entities, relations = chain("ABC")
+    supervises = Relation(entities[0], entities[0], name="supervises")
+    index = adjacency(entities, [*relations, supervises])
+    # a self-relation is listed once
+    assert [names(index[e]) for e in entities] == [["AB", "supervises"], ["AB", "BC"], ["BC"]]
+
+
+def test_neighbourhood():
+    entities, relations = chain("ABCDE")
+    kept, kept_relations, stubs = neighbourhood(entities, relations, ["C"], depth=1)
+    assert names(kept) == ["C", "B", "D"]
+    assert names(kept_relations) == ["BC", "CD"]
+    assert names(stubs) == ["B", "D"]
+
+    kept, kept_relations, stubs = neighbourhood(entities, relations, [entities[0]], depth=2)
+    assert names(kept) == ["A", "B", "C"]
+    assert names(kept_relations) == ["AB", "BC"]
+    assert names(stubs) == ["C"]
+
+
+def test_relations_between_stubs_are_left_out():
+    entities, relations = chain("ABC")
+    ac = Relation(entities[0], entities[2], name="AC")
+    _, kept_relations, stubs = neighbourhood(entities, [*relations, ac], ["B"], depth=1)
+    assert names(stubs) == ["A", "C"]
+    assert names(kept_relations) == ["AB", "BC"]
+
+
+def test_focus_is_never_a_stub():
+    entities, relations = chain("ABC")
+    kept, _, stubs = neighbourhood(entities, relations, ["A", "B"], depth=1, index=adjacency(entities, relations))
+    assert names(kept) == ["A", "B", "C"]
+    assert names(stubs) == ["C"]
+
+    kept, kept_relations, stubs = neighbourhood(entities, relations, ["B"], depth=0)
+    assert (names(kept), kept_relations, stubs) == (["B"], [], [])
+
+
+def test_errors():
+    entities, relations = chain("AB")
+    with pytest.raises(ValueError, match="'Z'"):
+        neighbourhood(entities, relations, ["Z"])
+    with pytest.raises(ValueError):
+        neighbourhood(entities, relations, ["A"], depth=-1)
@@ -0,0 +1,30 @@
+import pytest
+
+from erd_render import COUNT, Relation, quick_entity
+from erd_render.modules.batch import render_many
+
+pytest.importorskip("numpy")
+
+
+def test_failing_job_does_not_stop_the_others(tmp_path):
+    staff = quick_entity("Staff", ["*id", "name"])
+    project = quick_entity("Project", ["*code"])
+    rel = Relation((staff, COUNT.ANY), (project, 1), name="works on")
+    job = {"format": "svg", "engine": "builtin"}
+    jobs = [
+        {**job, "entities": [staff], "relations": [], "filename": str(tmp_path / "staff.gv")},
+        # the builtin engine only draws svg
+        {**job, "entities": [staff], "relations": [], "filename": str(tmp_path / "bad.gv"), "format": "png"},
+        {**job, "entities": [staff, project], "relations": [rel], "filename": str(tmp_path / "project.gv")},
+    ]
+    results = render_many(jobs, max_workers=2)
+
+    assert [result.job for result in results] == jobs
+    assert [result.ok() for result in results] == [True, False, True]
+    assert isinstance(results[1].error, ValueError)
+    assert results[1].path is None
+    assert results[0].path == str(tmp_path / "staff.gv.svg")
+    assert results[2].path == str(tmp_path / "project.gv.svg")
+    for result in (results[0], results[2]):
+        with open(result.path, "rb") as f:
+            assert f.read().startswith(b"<?xml")
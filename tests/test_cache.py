@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from erd_render.modules.cache import RenderCache
+from erd_render.modules.helpers import quick_entity
+from erd_render.modules.obj import Relation
+from erd_render.style.chen import build, render
+
+pytest.importorskip("numpy")
+
+
+def model(name):
+    a = quick_entity(name, ["*id", "value"])
+    b = quick_entity("Other", ["*id"])
+    return [a, b], [Relation(a, b, name="has")]
+
+
+def render_builtin(tmp_path, name, cache=None):
+    entities, relations = model(name)
+    return render(
+        entities, relations, filename=str(tmp_path / "out.gv"), format="svg", engine="builtin", cache=cache
+    )
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_miss_then_hit(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+    entities, relations = model("A")
+    g = build(entities, relations, engine="builtin")
+    key = cache.key(g, "svg")
+    assert cache.get(key, "svg") is None
+
+    output = render_builtin(tmp_path, "A", cache)
+    assert cache.get(key, "svg") is not None
+    first = read(output)
+
+    os.remove(output)
+    assert read(render_builtin(tmp_path, "A", cache)) == first
+
+
+def test_hit_is_not_linked_to_the_cache(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+    a = read(render_builtin(tmp_path, "A", cache))
+    # the second render of A is a cache hit
+    render_builtin(tmp_path, "A", cache)
+    b = read(render_builtin(tmp_path, "B"))
+    assert a != b
+
+    entities, relations = model("A")
+    key = cache.key(build(entities, relations, engine="builtin"), "svg")
+    assert read(cache.get(key, "svg")) == a
+    assert read(render_builtin(tmp_path, "A", cache)) == a
+
+
+def test_key_depends_on_engine_and_format(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+    entities, relations = model("A")
+    g = build(entities, relations)
+    key = cache.key(g, "svg")
+    assert key == cache.key(build(entities, relations), "svg")
+    assert key != cache.key(g, "png")
+    assert key != cache.key(build(entities, relations, use_neato=True), "svg")
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"), max_bytes=250)
+    for i, key in enumerate(["old", "used", "new"]):
+        path = cache.put_bytes(key, "svg", b"x" * 100)
+        os.utime(path, (i, i))
+    # "old" was evicted when "new" was added
+    assert cache.get("old", "svg") is None
+    assert cache.get("used", "svg") is not None
+    assert cache.get("new", "svg") is not None
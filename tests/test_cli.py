@@ -0,0 +1,132 @@
+import argparse
+import os
+import time
+
+import pytest
+
+from erd_render import cli, serialize
+from erd_render.modules.helpers import quick_entity
+from erd_render.modules.obj import COUNT, Relation
+
+from conftest import names
+
+MODEL = """
+from erd_render import COUNT, Relation, quick_entity
+
+staff = quick_entity("Staff", ["*id", "name"])
+project = quick_entity("Project", ["*code"])
+
+entities = [staff, project]
+relations = [Relation((staff, COUNT.ANY), (project, 1), name="works on")]
+
+if __name__ == "__main__":
+    raise AssertionError("the render of a model script is skipped")
+"""
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return str(path)
+
+
+def test_load_script(tmp_path):
+    entities, relations = cli.load_model(write(tmp_path / "model.py", MODEL))
+    assert names(entities) == ["Staff", "Project"]
+    assert [rel.name for rel in relations] == ["works on"]
+
+
+def test_load_example_scripts():
+    for script in ("dependent.py", "property.py", "vertabelo.py"):
+        entities, relations = cli.load_model(os.path.join(os.path.dirname(__file__), script))
+        assert entities and relations
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("entities = []\n", "does not define `relations`"),
+        ("relations = []\n", "does not define `entities`"),
+        ("entities = 'Staff'\nrelations = []\n", "`entities` of .* must be a list of Entity, not str"),
+        ("entities = [1]\nrelations = []\n", "`entities` of .* must only contain Entity objects, not int"),
+    ],
+)
+def test_load_script_errors(tmp_path, text, message):
+    with pytest.raises(ValueError, match=message):
+        cli.load_model(write(tmp_path / "model.py", text))
+
+
+def test_load_ddl(tmp_path):
+    path = write(tmp_path / "schema.sql", "CREATE TABLE book(id INTEGER PRIMARY KEY, title TEXT);")
+    entities, relations = cli.load_model(path)
+    assert names(entities) == ["book"]
+    assert relations == []
+
+
+def test_load_serialized(tmp_path):
+    staff = quick_entity("Staff", ["*id"])
+    project = quick_entity("Project", ["*code"])
+    path = str(tmp_path / "model.json")
+    serialize.save([staff, project], [Relation((staff, COUNT.ANY), (project, 1), name="works on")], path)
+    entities, relations = cli.load_model(path)
+    assert names(entities) == ["Staff", "Project"]
+    assert [rel.name for rel in relations] == ["works on"]
+
+
+def test_unknown_extension(tmp_path):
+    with pytest.raises(ValueError, match="Unknown kind of model file"):
+        cli.load_model(write(tmp_path / "model.txt", ""))
+
+
+def test_no_cache_by_default(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.chdir(tmp_path)
+    path = write(tmp_path / "model.py", MODEL)
+    assert cli.main([path, "-f", "svg", "--engine", "builtin", "-q"]) == 0
+    assert os.path.exists(tmp_path / "model.gv.svg")
+    assert not os.path.exists(tmp_path / ".erd-cache")
+
+    assert cli.main([path, "-f", "svg", "--engine", "builtin", "-q", "--cache", "cache"]) == 0
+    assert os.listdir(tmp_path / "cache")
+
+
+def test_errors_do_not_stop_other_models(tmp_path, capsys):
+    pytest.importorskip("numpy")
+    good = write(tmp_path / "good.py", MODEL)
+    bad = write(tmp_path / "bad.py", "entities = []\n")
+    assert cli.main([bad, good, "-f", "svg", "--engine", "builtin", "-q"]) == 1
+    assert os.path.exists(tmp_path / "good.gv.svg")
+    assert "bad.py: error: " in capsys.readouterr().err
+
+
+def test_watch(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    path = write(tmp_path / "model.py", MODEL)
+    args = argparse.Namespace(
+        output=None,
+        format="svg",
+        style="chen",
+        engine="builtin",
+        neato=False,
+        focus=None,
+        depth=1,
+        interval=0,
+        stats=False,
+        quiet=True,
+    )
+    sleeps = []
+
+    def sleep(seconds):
+        # the first poll sees the model change, the second one stops watching
+        sleeps.append(seconds)
+        if len(sleeps) == 1:
+            write(path, MODEL.replace('"name"', '"name", "email"'))
+            os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+        else:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(cli.time, "sleep", sleep)
+    cli.watch([path], args, None)
+    assert len(sleeps) == 2
+    with open(tmp_path / "model.gv.svg", encoding="utf-8") as f:
+        assert "email" in f.read()
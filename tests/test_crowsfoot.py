@@ -0,0 +1,80 @@
+import pytest
+
+from erd_render.modules.helpers import parse_attribute, quick_entity
+from erd_render.modules.obj import COUNT, Relation
+from erd_render.style.common import TableStyle
+from erd_render.style.crowsfoot import STYLE, build, marker
+
+
+@pytest.mark.parametrize(
+    "count, shape",
+    [
+        (None, "none"),
+        (COUNT.ANY, "crowodot"),
+        (COUNT.AT_LEAST_ONE, "crowtee"),
+        (COUNT.ZERO_OR_ONE, "teeodot"),
+        (1, "teetee"),
+        (0, "odot"),
+        (3, "crowtee"),
+    ],
+)
+def test_marker(count, shape):
+    assert marker(count) == shape
+
+
+def test_entity_label():
+    staff = quick_entity("Staff & Co", ["*id", "Name: first last", "phones[]", "~age"])
+    label = STYLE.entity_label(staff, stub=False)
+    assert label.startswith('<<TABLE BORDER="1" CELLBORDER="0" CELLSPACING="0" CELLPADDING="4">')
+    assert "<B>Staff &amp; Co</B>" in label
+    assert '<TD ALIGN="LEFT">PK</TD><TD ALIGN="LEFT">id</TD>' in label
+    assert '<TD ALIGN="LEFT"></TD><TD ALIGN="LEFT">&nbsp;&nbsp;first</TD>' in label
+    assert "phones[ ]" in label
+    assert "<I>age</I>" in label
+
+    stub = STYLE.entity_label(staff, stub=True)
+    assert 'STYLE="dashed"' in stub
+    assert "first" not in stub
+
+
+def test_weak_entity_label():
+    task = quick_entity("Task", ["+number", "title"])
+    label = STYLE.entity_label(task, stub=False)
+    assert 'STYLE="rounded"' in label
+    assert '<TD ALIGN="LEFT">(PK)</TD><TD ALIGN="LEFT">number</TD>' in label
+    assert 'STYLE="rounded,dashed"' in STYLE.entity_label(task, stub=True)
+
+
+def test_link_edge():
+    staff = quick_entity("Staff", ["*id"])
+    project = quick_entity("Project", ["*code"])
+    rel = Relation((staff, COUNT.ANY, "member"), (project, 3), name="works on")
+    tail, head = rel.entity_infos
+    assert STYLE.link_edge(rel, tail, head) == {
+        "label": "works on",
+        "dir": "both",
+        "arrowtail": "crowodot",
+        "arrowhead": "crowtee",
+        "taillabel": "member",
+        # 3 has no crow's foot shape of its own, so it is written next to it
+        "headlabel": "3",
+        "style": "dashed",
+    }
+    rel.is_identifying = True
+    assert "style" not in STYLE.link_edge(rel, tail, head)
+
+
+def test_relations_with_attributes_are_tables():
+    staff = quick_entity("Staff", ["*id"])
+    project = quick_entity("Project", ["*code"])
+    rel = Relation((staff, COUNT.ANY), (project, 1), name="works on", attributes=[parse_attribute("hours")])
+    source = build([staff, project], [rel]).source
+    assert "<I>works on</I>" in source
+    assert "hours" in source
+    assert source.count(" -- ") == 2
+    assert "arrowhead=teetee" in source
+
+
+def test_table_style_is_abstract():
+    with pytest.raises(TypeError):
+        TableStyle()
@@ -0,0 +1,92 @@
+from erd_render.diff import ADDED, MODIFIED, REMOVED, UNCHANGED, build_diff, diff
+from erd_render.modules.helpers import quick_entity
+from erd_render.modules.obj import COUNT, Relation
+
+
+def models():
+    staff = quick_entity("Staff", ["*id", "Name: first last", "phone"])
+    project = quick_entity("Project", ["*code"])
+    office = quick_entity("Office", ["*number"])
+    archive = quick_entity("Archive", ["*id"])
+    old = (
+        [staff, project, office, archive],
+        [
+            Relation((staff, COUNT.ANY), (project, 1), name="works on"),
+            Relation(staff, office, name="sits in"),
+            Relation(project, archive, name="archived in"),
+        ],
+    )
+
+    # Name gets a middle name, phone becomes multi-valued and Archive is replaced by Client
+    staff = quick_entity("Staff", ["*id", "Name: first middle last", "phone[]"])
+    project = quick_entity("Project", ["*code"])
+    office = quick_entity("Office", ["*number"])
+    client = quick_entity("Client", ["*id"])
+    new = (
+        [staff, project, office, client],
+        [
+            Relation((staff, COUNT.ANY), (project, COUNT.ANY), name="works on"),
+            Relation(staff, office, name="sits in"),
+            Relation(client, project, name="orders"),
+        ],
+    )
+    return old, new
+
+
+def statuses(diffs):
+    return {d.name if hasattr(d, "name") else d.relation.name: d.status for d in diffs}
+
+
+def test_entities():
+    (old_entities, old_relations), (new_entities, new_relations) = models()
+    schema_diff = diff(old_entities, old_relations, new_entities, new_relations)
+    assert statuses(schema_diff.entities) == {
+        "Staff": MODIFIED,
+        "Project": UNCHANGED,
+        "Office": UNCHANGED,
+        "Client": ADDED,
+        "Archive": REMOVED,
+    }
+    # new entities in their order, then the removed ones
+    assert [d.name for d in schema_diff.entities] == ["Staff", "Project", "Office", "Client", "Archive"]
+
+
+def test_attributes():
+    (old_entities, old_relations), (new_entities, new_relations) = models()
+    staff = diff(old_entities, old_relations, new_entities, new_relations).entities[0]
+    assert statuses(staff.attrs) == {"id": UNCHANGED, "Name": MODIFIED, "phone": MODIFIED}
+    name = staff.attrs[1]
+    assert statuses(name.subattrs) == {"first": UNCHANGED, "middle": ADDED, "last": UNCHANGED}
+
+
+def test_relations():
+    (old_entities, old_relations), (new_entities, new_relations) = models()
+    schema_diff = diff(old_entities, old_relations, new_entities, new_relations)
+    # "works on" changed the count of Project
+    assert statuses(schema_diff.relations) == {
+        "works on": MODIFIED,
+        "sits in": UNCHANGED,
+        "orders": ADDED,
+        "archived in": REMOVED,
+    }
+    assert schema_diff.summary() == {
+        "entities": {MODIFIED: 1, UNCHANGED: 2, ADDED: 1, REMOVED: 1},
+        "relations": {MODIFIED: 1, UNCHANGED: 1, ADDED: 1, REMOVED: 1},
+    }
+
+
+def test_identical_models():
+    (entities, relations), _ = models()
+    schema_diff = diff(entities, relations, entities, relations)
+    assert not schema_diff.has_changes()
+    assert {d.status for d in [*schema_diff.entities, *schema_diff.relations]} == {UNCHANGED}
+
+
+def test_collapse_leaves_out_unrelated_parts():
+    (old_entities, old_relations), (new_entities, new_relations) = models()
+    schema_diff = diff(old_entities, old_relations, new_entities, new_relations)
+    assert "number" in build_diff(schema_diff, collapse=False).source
+    # Office is only related to Staff by an unchanged relation, so it is a stub without its attributes
+    source = build_diff(schema_diff).source
+    assert "Office" in source
+    assert "number" not in source
@@ -0,0 +1,67 @@
+import io
+
+import pytest
+
+from erd_render.modules.dotwriter import DotWriter
+
+
+def draw(writer):
+    writer.node("a", label="A", shape="box")
+    writer.node("b")
+    writer.edge("a", "b", color="red")
+
+
+def test_writes_statements_in_order(tmp_path):
+    writer = DotWriter(str(tmp_path / "g.gv"), graph_attr={"overlap": "false"})
+    draw(writer)
+    assert writer.source == (
+        "graph {\n"
+        "\ta [label=A shape=box]\n"
+        "\tb\n"
+        "\ta -- b [color=red]\n"
+        "\tgraph [overlap=false]\n"
+        "}\n"
+    )
+    assert writer.bytes_written == len(writer.source.encode("utf-8"))
+
+
+def test_footer_is_rewritten_after_close(tmp_path):
+    writer = DotWriter(str(tmp_path / "g.gv"))
+    draw(writer)
+    writer.close()
+    body = writer.source
+    assert body.endswith("\ta -- b [color=red]\n}\n")
+
+    writer.graph_attr["overlap_scaling"] = "-4"
+    writer.graph_attr["K"] = "0.3"
+    writer.close()
+    assert writer.source == body[: -len("}\n")] + "\tgraph [K=0.3 overlap_scaling=-4]\n}\n"
+
+    # a shorter footer truncates the rest of the old one
+    writer.graph_attr.clear()
+    writer.close()
+    assert writer.source == body
+    assert writer.bytes_written == len(body.encode("utf-8"))
+
+
+def test_closed_writer_rejects_statements(tmp_path):
+    writer = DotWriter(str(tmp_path / "g.gv"))
+    writer.close()
+    with pytest.raises(ValueError):
+        writer.node("c")
+
+
+def test_file_object_is_flushed_not_closed():
+    buffer = io.BytesIO()
+    writer = DotWriter(buffer, graph_attr={"K": "1"})
+    draw(writer)
+    writer.close()
+    assert not buffer.closed
+    assert buffer.getvalue().endswith(b"\tgraph [K=1]\n}\n")
+
+    writer.close()
+    writer.graph_attr["K"] = "2"
+    with pytest.raises(ValueError):
+        writer.close()
+    with pytest.raises(ValueError):
+        writer.source
@@ -0,0 +1,69 @@
+import pytest
+
+from erd_render.modules.engines import NEATO_MAX_NODES, SFDP_FAST_MIN_NODES, auto_engine, fast_engine, run_with_budget
+
+
+def test_engine_by_size():
+    assert auto_engine(10, 12)[0] == "neato"
+    assert auto_engine(NEATO_MAX_NODES, NEATO_MAX_NODES)[0] == "neato"
+    engine, attrs = auto_engine(NEATO_MAX_NODES + 1, NEATO_MAX_NODES)
+    assert engine == "sfdp"
+    assert "quadtree" not in attrs
+    # pinned nodes need fdp, sfdp ignores them
+    assert auto_engine(1000, 1000, pinned=True)[0] == "fdp"
+
+
+def test_neato_stops_earlier_on_larger_graphs():
+    iterations = [int(auto_engine(n, n)[1]["maxiter"]) for n in range(1, NEATO_MAX_NODES + 1)]
+    assert max(iterations) == 200
+    assert iterations == sorted(iterations, reverse=True)
+
+
+def test_large_and_dense_graphs_use_the_fast_configuration():
+    fast = fast_engine()[1]
+    for nodes, edges in [(SFDP_FAST_MIN_NODES, SFDP_FAST_MIN_NODES), (500, 2000)]:
+        attrs = auto_engine(nodes, edges)[1]
+        assert {k: attrs[k] for k in fast} == fast
+
+
+class Runner:
+    """a stand-in for a layout engine, that takes a given number of seconds for each engine"""
+
+    def __init__(self, durations):
+        self.durations = durations
+        self.calls = []
+
+    def __call__(self, engine, attrs, timeout):
+        self.calls.append((engine, timeout))
+        if timeout is not None and self.durations[engine] > timeout:
+            raise TimeoutError(engine)
+        return engine
+
+
+ATTEMPTS = [("neato", {}), ("sfdp", {}), ("fast", {})]
+
+
+def test_first_attempt_that_fits():
+    run = Runner({"neato": 0, "sfdp": 0, "fast": 0})
+    assert run_with_budget(ATTEMPTS, 10, run) == "neato"
+    assert len(run.calls) == 1
+    assert 0 < run.calls[0][1] <= 10
+
+
+def test_falls_back_when_the_budget_runs_out():
+    run = Runner({"neato": 100, "sfdp": 100, "fast": 100})
+    assert run_with_budget(ATTEMPTS, 5, run) == "fast"
+    # the last attempt always runs to completion
+    assert [engine for engine, _ in run.calls] == ["neato", "sfdp", "fast"]
+    assert run.calls[-1][1] is None
+
+    run = Runner({"neato": 100, "sfdp": 1, "fast": 0})
+    assert run_with_budget(ATTEMPTS, 5, run) == "sfdp"
+
+
+def test_no_budget():
+    run = Runner({"neato": 100})
+    assert run_with_budget(ATTEMPTS, None, run) == "neato"
+    assert run.calls == [("neato", None)]
+    with pytest.raises(ValueError):
+        run_with_budget([], None, run)
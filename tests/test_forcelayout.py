@@ -0,0 +1,65 @@
+import pytest
+
+from erd_render.modules.forcelayout import force_layout, remove_overlaps
+
+np = pytest.importorskip("numpy")
+
+
+def overlapping_pairs(pos, sizes):
+    half = np.asarray(sizes) / 2
+    pairs = []
+    for i in range(len(pos)):
+        for j in range(i + 1, len(pos)):
+            dx, dy = np.abs(pos[i] - pos[j])
+            if dx < half[i, 0] + half[j, 0] - 1e-6 and dy < half[i, 1] + half[j, 1] - 1e-6:
+                pairs.append((i, j))
+    return pairs
+
+
+SIZES = [(60, 30)] * 12
+EDGES = [(i, i + 1) for i in range(11)] + [(0, 6), (3, 9)]
+
+
+def test_same_seed_same_layout():
+    first = force_layout(SIZES, EDGES, k=50)
+    assert np.array_equal(first, force_layout(SIZES, EDGES, k=50))
+    assert not np.array_equal(first, force_layout(SIZES, EDGES, k=50, seed=2))
+
+
+def test_pinned_nodes_stay_fixed():
+    pinned = {0: (0.0, 0.0), 5: (300.0, -120.0)}
+    pos = force_layout(SIZES, EDGES, k=50, pinned=pinned)
+    assert pos[0].tolist() == [0.0, 0.0]
+    assert pos[5].tolist() == [300.0, -120.0]
+
+
+def test_no_overlaps():
+    pos = force_layout(SIZES, EDGES, k=10)
+    assert overlapping_pairs(pos, SIZES) == []
+
+
+def test_remove_overlaps():
+    # every box on top of the others
+    sizes = [(40, 20)] * 8
+    pos = np.zeros((8, 2))
+    remove_overlaps(pos, sizes)
+    assert overlapping_pairs(pos, sizes) == []
+
+    rng = np.random.default_rng(0)
+    sizes = rng.uniform(10, 80, size=(50, 2))
+    pos = rng.uniform(0, 100, size=(50, 2))
+    remove_overlaps(pos, sizes, passes=1)
+    assert overlapping_pairs(pos, sizes) == []
+
+
+def test_remove_overlaps_keeps_pinned_nodes():
+    sizes = [(40, 20)] * 4
+    pos = np.zeros((4, 2))
+    fixed = np.array([True, False, False, False])
+    remove_overlaps(pos, sizes, fixed)
+    assert pos[0].tolist() == [0.0, 0.0]
+    assert overlapping_pairs(pos, sizes) == []
+
+
+def test_empty_graph():
+    assert force_layout([], [], k=50).shape == (0, 2)
@@ -0,0 +1,59 @@
+import pytest
+
+from erd_render.modules.helpers import clear_parse_cache, parse_attribute, parse_attributes
+from erd_render.modules.obj import ATTR
+
+
+@pytest.mark.parametrize(
+    "definition, name, type",
+    [
+        ("name", "name", ATTR.NORMAL),
+        ("*id", "id", ATTR.KEY_ATTRIBUTE),
+        ("+staff_id", "staff_id", ATTR.WEAK_KEY_ATTRIBUTE),
+        ("~age", "age", ATTR.DERIVED),
+        ("addresses[]", "addresses", ATTR.MULTIVALUE),
+        ("  * padded name  ", "padded name", ATTR.KEY_ATTRIBUTE),
+    ],
+)
+def test_attribute_types(definition, name, type):
+    attr = parse_attribute(definition)
+    assert (attr.name, attr.type) == (name, type)
+    assert not attr.is_composite()
+
+
+def test_composite():
+    attr = parse_attribute("*Name: first ~initials phones[]")
+    assert (attr.name, attr.type) == ("Name", ATTR.KEY_ATTRIBUTE)
+    assert [(a.name, a.type) for a in attr.subattrs] == [
+        ("first", ATTR.NORMAL),
+        ("initials", ATTR.DERIVED),
+        ("phones", ATTR.MULTIVALUE),
+    ]
+
+
+def test_memoized():
+    first, second = parse_attributes(["*id", "*id"])
+    assert first is second is parse_attribute("*id")
+
+
+def test_clear_parse_cache():
+    first = parse_attribute("*id")
+    clear_parse_cache()
+    second = parse_attribute("*id")
+    assert second is not first
+    assert (second.name, second.type) == (first.name, first.type)
+
+
+@pytest.mark.parametrize(
+    "definition, position",
+    [
+        ("", 0),
+        ("*", 1),
+        ("  *  : a", 5),
+        ("name: a b: c", 9),
+        ("name: a * b", 8),
+    ],
+)
+def test_error_positions(definition, position):
+    with pytest.raises(ValueError, match=rf"at position {position}\b"):
+        parse_attribute(definition)
@@ -0,0 +1,43 @@
+from erd_render.importers import from_ddl
+from erd_render.modules.obj import ATTR, COUNT
+
+DDL = """
+CREATE TABLE book(id INTEGER PRIMARY KEY, title TEXT NOT NULL);
+CREATE TABLE tag(name TEXT PRIMARY KEY);
+CREATE TABLE book_tag(
+    book_id INTEGER REFERENCES book(id),
+    tag TEXT REFERENCES tag(name),
+    PRIMARY KEY (book_id, tag)
+);
+CREATE TABLE chapter(
+    book_id INTEGER NOT NULL REFERENCES book(id),
+    number INTEGER,
+    PRIMARY KEY (book_id, number)
+);
+"""
+
+
+def test_tables_become_entities():
+    entities, _ = from_ddl(DDL)
+    by_name = {e.name: e for e in entities}
+    assert list(by_name) == ["book", "tag", "chapter"]
+    assert [(a.name, a.type) for a in by_name["book"].attrs] == [
+        ("id", ATTR.KEY_ATTRIBUTE),
+        ("title", ATTR.NORMAL),
+    ]
+    # the foreign key column is dropped and the rest of the primary key is a weak key
+    assert [(a.name, a.type) for a in by_name["chapter"].attrs] == [("number", ATTR.WEAK_KEY_ATTRIBUTE)]
+
+
+def test_junction_follows_the_ddl():
+    _, relations = from_ddl(DDL)
+    junction = next(r for r in relations if r.name == "book_tag")
+    assert [i.entity.name for i in junction.entity_infos] == ["book", "tag"]
+    assert [i.count for i in junction.entity_infos] == [COUNT.ANY, COUNT.ANY]
+
+
+def test_identifying_foreign_key():
+    _, relations = from_ddl(DDL)
+    rel = next(r for r in relations if r.name == "book_id")
+    assert rel.is_identifying
+    assert [i.entity.name for i in rel.entity_infos] == ["chapter", "book"]
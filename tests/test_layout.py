@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from erd_render import COUNT, Relation, quick_entity
+from erd_render.modules.layout import LAYOUT_VERSION, Layout
+from erd_render.style import crowsfoot
+
+pytest.importorskip("numpy")
+
+
+def model(extra=()):
+    person = quick_entity("Person", ["*id", "name", *extra])
+    car = quick_entity("Car", ["*plate", "model"])
+    city = quick_entity("City", ["*name"])
+    relations = [
+        Relation((person, COUNT.ANY), (car, COUNT.ZERO_OR_ONE), name="Owns"),
+        Relation((person, COUNT.ANY), (city, COUNT.AT_LEAST_ONE), name="Lives in"),
+    ]
+    return [person, car, city], relations
+
+
+def pinned(g) -> dict[str, str]:
+    return {name: attrs["pos"] for name, _, attrs in g.graph.nodes if "pos" in attrs}
+
+
+def test_render_layout(tmp_path):
+    g = crowsfoot.build(*model(), engine="builtin", layout=Layout())
+    output, layout = g.render_layout(str(tmp_path / "first"), format="svg")
+    with open(output, "rb") as f:
+        assert f.read().startswith(b"<?xml")
+    assert set(layout.nodes) == set(g.signatures)
+    assert pinned(g) == {}
+
+
+def test_unchanged_nodes_are_pinned(tmp_path):
+    first = crowsfoot.build(*model(), engine="builtin", layout=Layout())
+    _, layout = first.render_layout(str(tmp_path / "first"), format="svg")
+
+    # Person changes, everything else is the same
+    second = crowsfoot.build(*model(["age"]), engine="builtin", layout=layout)
+    changed = {k for k, sig in second.signatures.items() if first.signatures.get(k) != sig}
+    assert len(changed) == 1
+    assert pinned(second) == {k: f"{pos}!" for k, (pos, _) in layout.nodes.items() if k not in changed}
+
+    _, new_layout = second.render_layout(str(tmp_path / "second"), format="svg")
+    for k, (pos, _) in layout.nodes.items():
+        if k not in changed:
+            assert new_layout.nodes[k][0] == pos
+
+
+def test_layout_path(tmp_path):
+    path = str(tmp_path / "layout.json")
+    crowsfoot.render(*model(), filename=str(tmp_path / "a"), format="svg", engine="builtin", layout_path=path)
+    saved = Layout.load(path)
+    # binary relations are edges, so only the entities are nodes
+    assert len(saved) == 3
+
+    crowsfoot.render(*model(["age"]), filename=str(tmp_path / "b"), format="svg", engine="builtin", layout_path=path)
+    updated = Layout.load(path)
+    kept = [k for k, (pos, sig) in updated.nodes.items() if saved.nodes[k] == (pos, sig)]
+    assert len(kept) == 2
+
+
+def test_load(tmp_path):
+    path = str(tmp_path / "layout.json")
+    assert len(Layout.load(path)) == 0
+    Layout({"a": ("1.00,2.00", "sig")}).save(path)
+    assert Layout.load(path).pin("a", "sig") == "1.00,2.00!"
+    assert Layout.load(path).pin("a", "other") is None
+
+    with open(path, "w") as f:
+        json.dump({"version": LAYOUT_VERSION + 1, "nodes": {"a": ["1,2", "sig"]}}, f)
+    assert len(Layout.load(path)) == 0
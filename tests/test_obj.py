@@ -0,0 +1,59 @@
+import pickle
+
+import pytest
+
+from erd_render.modules.helpers import parse_attribute, quick_entity
+from erd_render.modules.obj import COUNT, Relation
+
+
+def test_attrs_is_a_mutable_list():
+    entity = quick_entity("Log", ["ts", "msg"])
+    assert entity.is_weak()
+    entity.attrs.append(parse_attribute("*id"))
+    assert not entity.is_weak()
+    del entity.attrs[-1]
+    assert entity.is_weak()
+    entity.attrs += [parse_attribute("*id")]
+    assert not entity.is_weak()
+    entity.attrs[-1] = parse_attribute("id")
+    assert entity.is_weak()
+    entity.add_attribute(parse_attribute("*key"))
+    assert not entity.is_weak()
+    entity.attrs = [parse_attribute("note")]
+    assert entity.is_weak()
+    entity.attrs.insert(0, parse_attribute("*id"))
+    assert not entity.is_weak()
+    entity.attrs.pop(0)
+    assert entity.is_weak()
+
+
+def test_pickled_entity_keeps_its_attributes():
+    entity = pickle.loads(pickle.dumps(quick_entity("Staff", ["*id", "name"])))
+    assert [a.name for a in entity.attrs] == ["id", "name"]
+    assert not entity.is_weak()
+    entity.attrs.clear()
+    assert entity.is_weak()
+
+
+def test_from_rows():
+    staff = quick_entity("Staff", ["*id"])
+    branch = quick_entity("Branch", ["*id"])
+    manages, works = Relation.from_rows(
+        [
+            ([(staff, 1), (branch, COUNT.ANY)], "manages"),
+            ([staff, branch], "works at", False, [parse_attribute("since")]),
+        ]
+    )
+    assert (manages.name, manages.is_identifying, manages.attrs) == ("manages", False, [])
+    assert [i.count for i in manages.entity_infos] == [1, COUNT.ANY]
+    assert [a.name for a in works.attrs] == ["since"]
+
+
+def test_from_rows_reports_every_bad_row():
+    staff = quick_entity("Staff", ["*id"])
+    with pytest.raises(ValueError) as info:
+        Relation.from_rows([([staff, staff],), ([staff],), (iter([staff, staff]),), 5, ([(staff, 1), staff],)])
+    lines = str(info.value).splitlines()
+    assert lines[0] == "Invalid relations:"
+    assert [line.split(":")[0] for line in lines[1:]] == ["row 1", "row 2", "row 3", "row 4"]
+    assert "must be a sequence, not list_iterator" in lines[2]
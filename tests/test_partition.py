@@ -0,0 +1,46 @@
+import pytest
+
+from erd_render.modules.obj import Relation
+from erd_render.modules.partition import partition
+
+from conftest import chain, names
+
+
+def test_small_components_are_packed_together():
+    abc, abc_relations = chain("ABC")
+    de, de_relations = chain("DE")
+    f, _ = chain("F")
+    clusters = partition([*abc, *de, *f], [*abc_relations, *de_relations], max_size=5)
+    assert [names(c.members) for c in clusters] == [["A", "B", "C", "D", "E"], ["F"]]
+    assert [names(c.relations) for c in clusters] == [["AB", "BC", "DE"], []]
+    assert [c.stubs for c in clusters] == [[], []]
+
+
+def test_large_components_are_split():
+    entities, relations = chain("ABCDEFG")
+    clusters = partition(entities, relations, max_size=3)
+    assert [names(c.members) for c in clusters] == [["A", "B", "C"], ["D", "E", "F"], ["G"]]
+    # a relation between two clusters goes to the first, the other entity is a stub of it
+    assert [names(c.relations) for c in clusters] == [["AB", "BC", "CD"], ["DE", "EF", "FG"], []]
+    assert [names(c.stubs) for c in clusters] == [["D"], ["G"], []]
+    assert names(clusters[0].entities) == ["A", "B", "C", "D"]
+
+
+def test_every_entity_and_relation_is_in_one_cluster():
+    entities, relations = chain("ABCDEFGHIJ")
+    relations.append(Relation(entities[0], entities[9], entities[5], name="AJF"))
+    clusters = partition(entities, relations, max_size=4)
+    assert all(len(c.members) <= 4 for c in clusters)
+    assert sorted(names(e for c in clusters for e in c.members)) == sorted(names(entities))
+    assert sorted(names(r for c in clusters for r in c.relations)) == sorted(names(relations))
+    for cluster in clusters:
+        drawn = set(cluster.entities)
+        assert all(e_info.entity in drawn for rel in cluster.relations for e_info in rel.entity_infos)
+
+
+def test_no_limit():
+    entities, relations = chain("ABCDEFG")
+    (cluster,) = partition(entities, relations, max_size=None)
+    assert names(cluster.members) == names(entities)
+    with pytest.raises(ValueError):
+        partition(entities, relations, max_size=0)
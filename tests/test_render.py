@@ -0,0 +1,70 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from erd_render import COUNT, Relation, quick_entity
+from erd_render.modules.render import ObjGraph
+from erd_render.style import chen
+
+pytest.importorskip("numpy")
+
+
+def model():
+    staff = quick_entity("Staff", ["*id", "name"])
+    project = quick_entity("Project", ["*code"])
+    return [staff, project], [Relation((staff, COUNT.ANY), (project, 1), name="works on")]
+
+
+def test_pipe_writes_no_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = chen.pipe(*model(), format="svg", engine="builtin")
+    assert isinstance(data, bytes)
+    assert data.startswith(b"<?xml")
+    assert os.listdir(tmp_path) == []
+
+
+def test_render_async(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = asyncio.run(chen.render_async(*model(), format="svg", engine="builtin"))
+    assert data == chen.pipe(*model(), format="svg", engine="builtin")
+    assert os.listdir(tmp_path) == []
+
+
+def test_semaphore_limits_concurrency(monkeypatch):
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+    pipe = ObjGraph.pipe
+
+    def counting_pipe(self, *args, **kwargs):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        try:
+            # hold the slot long enough for the other renders to pile up
+            time.sleep(0.05)
+            return pipe(self, *args, **kwargs)
+        finally:
+            with lock:
+                running -= 1
+
+    monkeypatch.setattr(ObjGraph, "pipe", counting_pipe)
+
+    async def main():
+        semaphore = asyncio.Semaphore(2)
+        renders = [chen.render_async(*model(), format="svg", engine="builtin", semaphore=semaphore) for _ in range(6)]
+        return await asyncio.gather(*renders)
+
+    results = asyncio.run(main())
+    assert len(results) == 6
+    assert peak == 2
+
+
+def test_async_timeout():
+    entities = [quick_entity(f"E{i}", ["*id", "a", "b", "c"]) for i in range(60)]
+    with pytest.raises(TimeoutError):
+        asyncio.run(chen.render_async(entities, [], format="svg", engine="builtin", timeout=0.0001))
@@ -0,0 +1,84 @@
+import pytest
+
+from erd_render import serialize
+from erd_render.modules.helpers import parse_attribute, quick_entity
+from erd_render.modules.obj import COUNT, Relation
+
+
+def model():
+    staff = quick_entity("Staff", ["*id", "Name: first last", "phones[]"])
+    project = quick_entity("Project", ["*code", "~cost"])
+    task = quick_entity("Task", ["+number", "Name: first last"])
+    relations = [
+        Relation((staff, COUNT.ANY), (project, 1), name="works on", attributes=[parse_attribute("since")]),
+        Relation((task, COUNT.ANY), (project, COUNT.AT_LEAST_ONE), name="part of", is_identifying=True),
+        Relation((staff, 3, "manager"), (staff, COUNT.ZERO_OR_ONE, "report"), name="manages"),
+    ]
+    return [staff, project, task], relations
+
+
+def describe_attr(attr):
+    return attr.name, attr.type, [describe_attr(sub) for sub in attr.subattrs]
+
+
+def describe(entities, relations):
+    """everything that a round trip must keep, as plain values"""
+    return (
+        [(e.name, [describe_attr(a) for a in e.attrs]) for e in entities],
+        [
+            (
+                rel.name,
+                rel.is_identifying,
+                [(i.entity.name, i.count, i.role) for i in rel.entity_infos],
+                [describe_attr(a) for a in rel.attrs],
+            )
+            for rel in relations
+        ],
+    )
+
+
+@pytest.mark.parametrize("format", ["json", "pickle", "msgpack"])
+def test_round_trip(format):
+    if format == "msgpack":
+        pytest.importorskip("msgpack")
+    entities, relations = model()
+    loaded = serialize.loads(serialize.dumps(entities, relations, format=format), format=format)
+    assert describe(*loaded) == describe(entities, relations)
+
+    # relations refer to the loaded entities themselves
+    loaded_entities, loaded_relations = loaded
+    assert loaded_relations[2].entity_infos[0].entity is loaded_entities[0]
+
+
+def test_shared_attributes_are_stored_once():
+    entities, relations = model()
+    data = serialize.to_dict(entities, relations)
+    # "Name: first last" is parsed once and shared by Staff and Task
+    assert [row[0] for row in data["attributes"]].count("Name") == 1
+    loaded_entities, _ = serialize.from_dict(data)
+    assert loaded_entities[0].attrs[1] is loaded_entities[2].attrs[1]
+
+
+def test_save_and_load_by_extension(tmp_path):
+    entities, relations = model()
+    for name in ["model.json", "model.pkl"]:
+        path = str(tmp_path / name)
+        serialize.save(entities, relations, path)
+        assert describe(*serialize.load(path)) == describe(entities, relations)
+    with pytest.raises(ValueError):
+        serialize.save(entities, relations, str(tmp_path / "model.txt"))
+
+
+def test_rejects_other_versions():
+    data = serialize.to_dict(*model())
+    data["version"] = serialize.MODEL_VERSION + 1
+    with pytest.raises(ValueError, match="Unsupported model version"):
+        serialize.from_dict(data)
+    with pytest.raises(ValueError, match="Not a serialized model"):
+        serialize.from_dict({"entities": []})
+
+
+def test_relation_to_missing_entity():
+    entities, relations = model()
+    with pytest.raises(ValueError, match="'Task'"):
+        serialize.to_dict(entities[:2], relations)
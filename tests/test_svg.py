@@ -0,0 +1,73 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from erd_render.modules.svg import Recorder, layout, node_size, parse_label, render, to_svg
+
+pytest.importorskip("numpy")
+
+
+def test_parse_label():
+    assert parse_label(None, "name") == [[("name", False, False, False)]]
+    assert parse_label("a\nb", "n") == [[("a", False, False, False)], [("b", False, False, False)]]
+    assert parse_label("<<B>a</B><BR/>x &amp; y>", "n") == [
+        [("a", False, True, False)],
+        [("x & y", False, False, False)],
+    ]
+
+
+def test_parse_label_table():
+    label = "<<TABLE><TR><TD>a</TD><TD><I>b</I></TD></TR><TR><TD><U>c</U></TD></TR></TABLE>>"
+    assert parse_label(label, "n") == [
+        [("a", False, False, False), ("  ", False, False, False), ("b", False, False, True)],
+        [("c", True, False, False)],
+    ]
+
+
+def test_node_size():
+    short = node_size("box", parse_label("a", "n"), {})
+    long = node_size("box", parse_label("a much longer label", "n"), {})
+    assert long[0] > short[0]
+    assert node_size("box", parse_label("a\nb", "n"), {})[1] >= short[1]
+    double = node_size("box", parse_label("a", "n"), {"peripheries": "2"})
+    assert double[0] > short[0] and double[1] > short[1]
+
+
+def test_layout_keeps_pinned_nodes():
+    graph = Recorder("g")
+    graph.node("a", pos="10,20!")
+    graph.node("b")
+    graph.node("c")
+    graph.edge("a", "b")
+    graph.edge("b", "c")
+    positions, sizes = layout(graph)
+    assert positions["a"] == (10.0, 20.0)
+    assert set(sizes) == {"a", "b", "c"}
+
+
+def test_to_svg_escapes_text():
+    graph = Recorder("a & b")
+    graph.node("<x>", "<<B>x &lt; y</B>>", shape="box")
+    graph.node("y", "1 & 2")
+    graph.edge("<x>", "y", label="<z>", headlabel="&")
+    positions, sizes = layout(graph)
+    svg = to_svg(graph, positions, sizes)
+    # the output is well formed XML, so every piece of text was escaped
+    root = ET.fromstring(svg)
+    texts = ["".join(el.itertext()) for el in root.iter("{http://www.w3.org/2000/svg}text")]
+    titles = [el.text for el in root.iter("{http://www.w3.org/2000/svg}title")]
+    assert {"x < y", "1 & 2", "<z>", "&"} <= set(texts)
+    assert {"a & b", "<x>", "<x>--y"} <= set(titles)
+    assert '<tspan font-weight="bold">x &lt; y</tspan>' in svg
+
+
+def test_render():
+    graph = Recorder("g")
+    graph.node("a")
+    graph.node("b")
+    graph.edge("a", "b")
+    data, positions = render(graph)
+    assert data.startswith(b"<?xml")
+    assert set(positions) == {"a", "b"}
+    with pytest.raises(ValueError):
+        render(graph, "png")
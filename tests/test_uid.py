@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from erd_render import COUNT, Relation, quick_entity
+from erd_render.modules.uid import UidAllocator
+from erd_render.style import chen
+
+
+def test_paths():
+    ids = UidAllocator()
+    assert ids.new("E/Staff") == "E/Staff"
+    assert ids.new("E/Staff") == "E/Staff~2"
+    assert ids.new("E/Staff") == "E/Staff~3"
+    assert ids.new("E/Other") == "E/Other"
+
+
+def test_path_like_a_generated_id():
+    ids = UidAllocator()
+    assert ids.new("Staff~2") == "Staff~2"
+    assert ids.new("Staff") == "Staff"
+    # "Staff~2" is taken
+    assert ids.new("Staff") == "Staff~3"
+
+
+def test_no_path():
+    ids = UidAllocator()
+    assert [ids.new(), ids.new(), ids.new(None)] == ["1", "2", "3"]
+
+
+def test_colons_are_replaced():
+    ids = UidAllocator()
+    assert ids.new("E/db:Staff") == "E/db.Staff"
+    # both paths become the same id, so the second one is still unique
+    assert ids.new("E/db.Staff") == "E/db.Staff~2"
+
+
+def model():
+    staff = quick_entity("Staff", ["*id", "name", "name"])
+    dept = quick_entity("Department", ["*code"])
+    relations = [
+        Relation((staff, COUNT.ANY), (dept, COUNT.AT_LEAST_ONE), name="Works in"),
+        Relation((staff, COUNT.ANY), (dept, COUNT.ZERO_OR_ONE), name="Works in"),
+    ]
+    return [staff, dept], relations
+
+
+def test_same_model_same_source():
+    source = chen.build(*model()).source
+    # an unrelated graph built in between does not change the ids
+    chen.build([quick_entity("Other", ["*x"])], [])
+    assert chen.build(*model()).source == source
+
+
+def test_same_source_from_threads():
+    with ThreadPoolExecutor(2) as executor:
+        sources = list(executor.map(lambda _: chen.build(*model()).source, range(8)))
+    assert sources == [chen.build(*model()).source] * 8
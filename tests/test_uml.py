@@ -0,0 +1,61 @@
+import pytest
+
+from erd_render.modules.helpers import parse_attribute, quick_entity
+from erd_render.modules.obj import COUNT, Relation
+from erd_render.style.uml import STYLE, build, range_label
+
+
+@pytest.mark.parametrize(
+    "count, label",
+    [(None, None), (COUNT.ANY, "0..*"), (COUNT.AT_LEAST_ONE, "1..*"), (COUNT.ZERO_OR_ONE, "0..1"), (2, "2")],
+)
+def test_range_label(count, label):
+    assert range_label(count) == label
+
+
+def test_entity_label():
+    staff = quick_entity("Staff", ["*id", "Name: first last", "~age", "phones[]"])
+    label = STYLE.entity_label(staff, stub=False)
+    assert "<TR><TD><B>Staff</B></TD></TR><HR/>" in label
+    assert "id {id}<BR/>Name<BR/>&nbsp;&nbsp;first<BR/>&nbsp;&nbsp;last<BR/>/age<BR/>phones [*]" in label
+
+    stub = STYLE.entity_label(staff, stub=True)
+    assert 'STYLE="dashed"' in stub
+    assert "<HR/>" not in stub
+
+
+def test_weak_entity_label():
+    task = quick_entity("Task <draft>", ["+number"])
+    label = STYLE.entity_label(task, stub=False)
+    assert "&laquo;weak&raquo;<BR/><B>Task &lt;draft&gt;</B>" in label
+    assert "number {id}" in label
+
+
+def test_composition_diamond_is_at_the_owner():
+    project = quick_entity("Project", ["*code"])
+    task = quick_entity("Task", ["+number"])
+    rel = Relation((task, COUNT.ANY), (project, 1), name="part of", is_identifying=True)
+    tail, head = rel.entity_infos
+    assert STYLE.link_edge(rel, tail, head) == {
+        "label": "part of",
+        "dir": "both",
+        "arrowtail": "none",
+        "arrowhead": "diamond",
+        "taillabel": "0..*",
+        "headlabel": "1",
+    }
+    rel.is_identifying = False
+    assert STYLE.link_edge(rel, tail, head)["arrowhead"] == "none"
+
+
+def test_association_class():
+    staff = quick_entity("Staff", ["*id"])
+    project = quick_entity("Project", ["*code"])
+    rel = Relation(staff, project, name="works on", attributes=[parse_attribute("hours")])
+    label, attrs = STYLE.relation_node(rel)
+    assert "<B>works on</B>" in label
+    assert "hours" in label
+    assert STYLE.member_edge(rel, rel.entity_infos[0])["style"] == "dashed"
+
+    source = build([staff, project], [rel]).source
+    assert source.count(" -- ") == 2
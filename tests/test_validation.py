@@ -0,0 +1,79 @@
+import pytest
+
+from erd_render.modules.helpers import quick_entity
+from erd_render.modules.obj import COUNT, Relation
+from erd_render.style.chen import pipe
+from erd_render.validation import ModelError, problems, validate
+
+
+def test_valid_model():
+    staff = quick_entity("Staff", ["*id"])
+    project = quick_entity("Project", ["*code"])
+    validate([staff, project], [Relation((staff, COUNT.ANY), (project, 1)), Relation(staff, staff, name="manages")])
+
+
+def test_weak_entities_only_fail_strict_checks():
+    log = quick_entity("Log", ["ts", "msg"])
+    validate([log], [])
+    with pytest.raises(ModelError, match="entity 'Log' is weak"):
+        validate([log], [], strict=True)
+
+    staff = quick_entity("Staff", ["*id"])
+    validate([staff, log], [Relation(staff, log, is_identifying=True)], strict=True)
+
+
+def test_reports_every_problem():
+    a = quick_entity("A", ["*id"])
+    b = quick_entity("B", ["*id"])
+    other_a = quick_entity("A", ["*key"])
+    missing = quick_entity("Missing", ["*id"])
+    counts = Relation((a, 1), (b, 1), name="counts")
+    counts.entity_infos[0].count = -1
+    counts.entity_infos[1].count = True
+    mixed = Relation((a, 1), (b, 1))
+    mixed.entity_infos[1].count = None
+
+    with pytest.raises(ModelError) as info:
+        validate([a, b, a, other_a, "C"], [Relation(a, missing), counts, mixed, "R"])
+    assert info.value.problems == [
+        "entity 'A' is listed more than once",
+        "'C' in `entities` is not an Entity",
+        "2 different entities are named 'A'",
+        "relation 0 refers to entity 'Missing', which is not in `entities`",
+        "relation 1 ('counts'): entity 'A' has the negative count -1",
+        "relation 1 ('counts'): entity 'B' has the count True, it must be a COUNT or an int",
+        "relation 2 gives a count for some of its entities but not all of them",
+        "'R' in `relations` is not a Relation",
+    ]
+    assert isinstance(info.value, ValueError)
+    assert str(info.value).startswith("Invalid model:\n- entity 'A' is listed more than once\n- ")
+
+
+def test_missing_entity_is_reported_once_per_relation():
+    staff = quick_entity("Staff", ["*id"])
+    supervises = Relation(staff, staff, name="supervises")
+    assert problems([], [supervises]) == [
+        "relation 0 ('supervises') refers to entity 'Staff', which is not in `entities`"
+    ]
+
+
+def test_relation_with_one_entity():
+    a = quick_entity("A", ["*id"])
+    b = quick_entity("B", ["*id"])
+    rel = Relation(a, b)
+    del rel.entity_infos[1]
+    assert problems([a, b], [rel]) == ["relation 0 has 1 entities, it needs at least 2"]
+
+
+def test_render_checks_the_drawn_part():
+    pytest.importorskip("numpy")
+    staff = quick_entity("Staff", ["*id"])
+    log = quick_entity("Log", ["ts", "msg"])
+    missing = quick_entity("Missing", ["*id"])
+    assert pipe([log], [], format="svg", engine="builtin").startswith(b"<?xml")
+
+    broken = [Relation(staff, log), Relation(log, missing)]
+    with pytest.raises(ModelError):
+        pipe([staff, log], broken, format="svg", engine="builtin")
+    # only the neighbourhood of Staff is drawn, and it is fine
+    pipe([staff, log], broken, format="svg", engine="builtin", focus=["Staff"], depth=1)
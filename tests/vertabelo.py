@@ -52,10 +52,14 @@ contains = Relation(
     is_identifying=True,
 )
 
+entities = [prod, student, book, chapter]
+
+relations = [contains]
+
 if __name__ == "__main__":
     render(
-        [prod, student, book, chapter],
-        [contains],
+        entities,
+        relations,
         filename="vertabelo.gv",
         use_neato=True
     )